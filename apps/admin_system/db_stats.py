@@ -0,0 +1,200 @@
+"""
+Database and storage statistics for the System Monitoring page
+
+Row counts come from the database's own statistics instead of COUNT(*) on
+every table:
+- PostgreSQL: pg_stat_user_tables.n_live_tup, falling back to pg_class.reltuples
+- SQLite: sqlite_stat1 (maintained by ANALYZE / PRAGMA optimize); tables without
+  statistics are counted exactly, but only in the background refresh
+- Other backends: COUNT(*) per table, also only in the background refresh
+
+The collected snapshot is cached and refreshed in a background thread, so the
+page itself only ever reads the cache.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DB_STATS_CACHE_KEY = "admin_system:db_stats"
+DB_STATS_LOCK_KEY = "admin_system:db_stats:refreshing"
+DB_STATS_MAX_AGE = 10 * 60  # Refresh snapshots older than 10 minutes
+DB_STATS_CACHE_TIMEOUT = 24 * 60 * 60  # Keep serving a stale snapshot for a day
+DB_STATS_LOCK_TIMEOUT = 5 * 60
+
+_refresh_thread_lock = threading.Lock()
+
+
+def _quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _postgresql_row_counts() -> Tuple[Dict[str, int], bool]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname,
+                   COALESCE(NULLIF(s.n_live_tup, 0), GREATEST(c.reltuples, 0))::bigint
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE c.relkind IN ('r', 'p') AND n.nspname = current_schema()
+            ORDER BY c.relname
+            """
+        )
+        return {name: int(rows) for name, rows in cursor.fetchall()}, True
+
+
+def _sqlite_row_counts() -> Tuple[Dict[str, int], bool]:
+    tables = connection.introspection.table_names()
+    counts = {}
+    estimated = False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'")
+        if cursor.fetchone():
+            # The first integer of each stat entry is the row count of the
+            # table (or of a full index on it)
+            cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+            for table_name, stat in cursor.fetchall():
+                try:
+                    rows = int(str(stat).split()[0])
+                except (ValueError, IndexError):
+                    continue
+                counts[table_name] = max(rows, counts.get(table_name, 0))
+            estimated = bool(counts)
+
+        for table_name in tables:
+            if table_name not in counts:
+                cursor.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}")
+                counts[table_name] = cursor.fetchone()[0]
+
+    return {name: counts[name] for name in sorted(tables)}, estimated
+
+
+def _exact_row_counts() -> Tuple[Dict[str, int], bool]:
+    counts = {}
+    with connection.cursor() as cursor:
+        for table_name in sorted(connection.introspection.table_names()):
+            cursor.execute(f"SELECT COUNT(*) FROM {_quote(table_name)}")
+            counts[table_name] = cursor.fetchone()[0]
+    return counts, False
+
+
+def _database_size() -> Optional[int]:
+    """Size of the database in bytes, or None if it cannot be determined"""
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_database_size(current_database())")
+                return int(cursor.fetchone()[0])
+            if connection.vendor == "sqlite":
+                cursor.execute("PRAGMA page_count")
+                page_count = cursor.fetchone()[0]
+                cursor.execute("PRAGMA page_size")
+                return int(page_count * cursor.fetchone()[0])
+    except Exception as e:
+        logger.warning(f"Could not determine database size: {e}")
+    return None
+
+
+def _directory_size(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def _disk_usage(path: Path) -> Optional[Dict]:
+    try:
+        usage = shutil.disk_usage(path)
+    except OSError:
+        return None
+    return {
+        "total": usage.total,
+        "used": usage.used,
+        "free": usage.free,
+        "percent": round(usage.used / usage.total * 100, 1) if usage.total else 0,
+    }
+
+
+def collect_db_stats() -> Dict:
+    """Collect a fresh statistics snapshot. Potentially slow; run in the background."""
+    if connection.vendor == "postgresql":
+        row_counts, estimated = _postgresql_row_counts()
+    elif connection.vendor == "sqlite":
+        row_counts, estimated = _sqlite_row_counts()
+    else:
+        row_counts, estimated = _exact_row_counts()
+
+    media_root = Path(settings.MEDIA_ROOT)
+
+    return {
+        "vendor": connection.vendor,
+        "tables": row_counts,
+        "row_counts_estimated": estimated,
+        "database_size": _database_size(),
+        "media_size": _directory_size(media_root) if media_root.exists() else 0,
+        "disk": _disk_usage(Path(settings.BASE_DIR)),
+        "collected_at": timezone.now(),
+    }
+
+
+def refresh_db_stats() -> Dict:
+    """Collect statistics synchronously and store them in the cache"""
+    snapshot = collect_db_stats()
+    cache.set(DB_STATS_CACHE_KEY, snapshot, DB_STATS_CACHE_TIMEOUT)
+    return snapshot
+
+
+def _refresh_in_background() -> None:
+    try:
+        refresh_db_stats()
+    except Exception as e:
+        logger.error(f"Database statistics refresh failed: {e}")
+    finally:
+        cache.delete(DB_STATS_LOCK_KEY)
+        connection.close()
+
+
+def schedule_db_stats_refresh() -> bool:
+    """
+    Start a background refresh unless one is already running (in this or any
+    other worker process). Returns True if a refresh was started.
+    """
+    with _refresh_thread_lock:
+        if not cache.add(DB_STATS_LOCK_KEY, True, DB_STATS_LOCK_TIMEOUT):
+            return False
+        threading.Thread(
+            target=_refresh_in_background, name="db-stats-refresh", daemon=True
+        ).start()
+    return True
+
+
+def get_db_stats_snapshot() -> Optional[Dict]:
+    """
+    Return the cached statistics snapshot (None if none has been collected
+    yet) and schedule a background refresh when it is missing or stale.
+    """
+    snapshot = cache.get(DB_STATS_CACHE_KEY)
+    is_stale = (
+        snapshot is None
+        or (timezone.now() - snapshot["collected_at"]).total_seconds() > DB_STATS_MAX_AGE
+    )
+    if is_stale:
+        schedule_db_stats_refresh()
+    return snapshot
@@ -0,0 +1,58 @@
+"""
+Management command to take an online snapshot of the SQLite database.
+
+Uses the SQLite backup API, so the copy is consistent while the server is
+running and includes commits still held in the WAL (db.sqlite3-wal). The
+snapshot is zipped into the backup directory (backup_config.json, default
+backups/) where Backup Management lists it and the restore script picks it up.
+
+    python manage.py backup_database
+    python manage.py backup_database --output-dir D:/avicast-backups
+"""
+
+import json
+import tempfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.common.utils.sqlite_profile import snapshot_database
+
+
+def _backup_dir() -> Path:
+    # Same lookup as the Backup Management views
+    config_file = Path('backup_config.json')
+    if config_file.exists():
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return Path(json.load(f).get('backup_location', 'backups'))
+        except Exception:
+            pass
+    return Path('backups')
+
+
+class Command(BaseCommand):
+    help = 'Snapshot the live SQLite database (WAL-consistent) into a backup zip'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None, help='Backup directory (default from backup_config.json)')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'backup_database only supports SQLite (database is {connection.vendor}); use pg_dump')
+
+        backup_dir = Path(options['output_dir']) if options['output_dir'] else _backup_dir()
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        archive = backup_dir / f'avicast_database_{timestamp}.zip'
+
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot = snapshot_database(Path(directory) / f'database_{timestamp}.sqlite3')
+            with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(snapshot, snapshot.name)
+
+        size_mb = archive.stat().st_size / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(f'Database snapshot written to {archive} ({size_mb:.1f} MB)'))
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from apps.admin_system import db_stats
+from apps.fauna.models import Species
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class DatabaseStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_collect_reports_row_counts_and_sizes(self):
+        Species.objects.create(name="Little Egret", scientific_name="Egretta garzetta")
+
+        snapshot = db_stats.collect_db_stats()
+
+        self.assertEqual(snapshot["vendor"], connection.vendor)
+        self.assertEqual(snapshot["tables"][Species._meta.db_table], 1)
+        self.assertIn("collected_at", snapshot)
+        self.assertIsNotNone(snapshot["disk"])
+
+    def test_sqlite_uses_sqlite_stat1_when_available(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+        Species.objects.create(name="Little Egret", scientific_name="Egretta garzetta")
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        counts, estimated = db_stats._sqlite_row_counts()
+
+        self.assertTrue(estimated)
+        self.assertEqual(counts[Species._meta.db_table], 1)
+
+    def test_snapshot_is_read_from_cache(self):
+        db_stats.refresh_db_stats()
+
+        with mock.patch.object(db_stats, "collect_db_stats") as collect, \
+                mock.patch.object(db_stats, "schedule_db_stats_refresh") as schedule:
+            snapshot = db_stats.get_db_stats_snapshot()
+
+        self.assertIsNotNone(snapshot)
+        collect.assert_not_called()
+        schedule.assert_not_called()
+
+    def test_missing_snapshot_schedules_refresh(self):
+        with mock.patch.object(db_stats, "schedule_db_stats_refresh") as schedule:
+            self.assertIsNone(db_stats.get_db_stats_snapshot())
+        schedule.assert_called_once()
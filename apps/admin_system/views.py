@@ -13,14 +13,17 @@ from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 from django.contrib.auth import get_user_model
-from django.db import connection
 from django.utils import timezone
 import json
 
 from apps.fauna.models import Species
 from apps.locations.models import Site, Census
-from apps.image_processing.models import ImageUpload, ProcessingResult
+from apps.image_processing.inference_daemon import get_admission_stats
+from apps.image_processing.pipeline_timing import pipeline_histograms
+from apps.image_processing.stage_counters import get_stage_counts
 from apps.users.models import UserActivity
+from apps.common.services.audit_sink import get_audit_sink
+from .db_stats import get_db_stats_snapshot
 from .models import AdminActivity, SystemConfiguration, AdminNotification, RolePermission, UserPermission
 from .forms import UserCreateForm, UserEditForm, UserPasswordChangeForm
 
@@ -57,16 +60,21 @@ def admin_dashboard(request):
     """
     Beautiful admin dashboard with statistics and quick actions
     """
-    # Get system statistics
+    # Get system statistics (image counts share the cached GTD stage counters)
+    user_counts = User.objects.filter(is_active=True).aggregate(
+        total=Count('id'),
+        admins=Count('id', filter=Q(role__in=['ADMIN', 'SUPERADMIN'])),
+    )
+    image_counts = get_stage_counts()
     stats = {
-        'total_users': User.objects.filter(is_active=True).count(),
+        'total_users': user_counts['total'],
         'total_species': Species.objects.filter(is_archived=False).count(),
         'total_sites': Site.objects.filter(is_archived=False).count(),
         'total_census': Census.objects.count(),
-        'total_images': ImageUpload.objects.count(),
-        'processed_images': ProcessingResult.objects.count(),
-        'pending_images': ImageUpload.objects.filter(upload_status='CAPTURED').count(),
-        'active_admins': User.objects.filter(role__in=['ADMIN', 'SUPERADMIN'], is_active=True).count(),
+        'total_images': image_counts['all'],
+        'processed_images': image_counts['processed'],
+        'pending_images': image_counts['captured'],
+        'active_admins': user_counts['admins'],
     }
     
     # Get recent activities
@@ -80,10 +88,15 @@ def admin_dashboard(request):
     # Get recent user registrations
     recent_users = User.objects.filter(is_active=True).order_by('-date_joined')[:5]
     
-    # Get system health metrics
+    # Get system health metrics (disk usage from the cached statistics snapshot)
+    db_snapshot = get_db_stats_snapshot()
+    disk = db_snapshot.get('disk') if db_snapshot else None
     system_health = {
         'database_status': 'healthy',
-        'disk_usage': '75%',  # This would be calculated from actual system metrics
+        'disk_usage': f"{disk['percent']}%" if disk else 'N/A',
+        'disk_usage_percent': disk['percent'] if disk else 0,
+        'database_size': db_snapshot.get('database_size') if db_snapshot else None,
+        'media_size': db_snapshot.get('media_size') if db_snapshot else None,
         'memory_usage': '60%',
         'last_backup': timezone.now() - timezone.timedelta(days=1),
     }
@@ -302,17 +315,10 @@ def system_monitoring(request):
     """
     System monitoring and health dashboard
     """
-    # Database statistics with pagination
-    with connection.cursor() as cursor:
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
-        db_stats = {}
-        for table in tables:
-            table_name = table[0]
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-            count = cursor.fetchone()[0]
-            db_stats[table_name] = count
+    # Database statistics come from a cached snapshot refreshed in the
+    # background (see db_stats.py), never from COUNT(*) in the request
+    db_snapshot = get_db_stats_snapshot()
+    db_stats = db_snapshot['tables'] if db_snapshot else {}
     
     # Convert to list of tuples for pagination
     db_stats_list = [(table_name, count) for table_name, count in db_stats.items()]
@@ -337,6 +343,13 @@ def system_monitoring(request):
     # System configuration
     configurations = SystemConfiguration.objects.all().order_by('key')
     
+    # Audit log writer health (queue depth, dropped events)
+    audit_sink_stats = get_audit_sink().stats()
+
+    # Detection pipeline stage timings over the most recent results
+    pipeline_timing = pipeline_histograms()
+    inference_admission = get_admission_stats()
+    
     context = {
         'db_stats': db_stats,  # Keep original for total count
         'db_stats_page': db_stats_page,  # Paginated data
@@ -345,6 +358,10 @@ def system_monitoring(request):
         'recent_activities': recent_activities,
         'error_activities': error_activities,
         'configurations': configurations,
+        'audit_sink_stats': audit_sink_stats,
+        'pipeline_timing': pipeline_timing,
+        'inference_admission': inference_admission,
+        'db_snapshot': db_snapshot,
         'page_title': 'System Monitoring',
     }
     
@@ -65,19 +65,17 @@ class SpeciesAnalytics(models.Model):
 
         # Calculate totals
         self.total_count = observations.aggregate(total=Sum('count'))['total'] or 0
-        self.sites_with_presence = observations.values('census__month__year__site').distinct().count()
+        self.sites_with_presence = observations.values('site').distinct().count()
 
         # Get most recent observation
-        recent_obs = observations.order_by('-census__census_date').first()
+        recent_obs = observations.order_by('-census_date').only('census_date').first()
         if recent_obs:
-            self.last_observation_date = recent_obs.census.census_date
+            self.last_observation_date = recent_obs.census_date
 
         # Calculate site distribution
-        site_data = {}
-        for obs in observations:
-            site_name = obs.census.month.year.site.name
-            site_data[site_name] = site_data.get(site_name, 0) + obs.count
-        self.site_distribution = site_data
+        self.site_distribution = dict(
+            observations.values_list('site__name').annotate(total=Sum('count')).order_by()
+        )
 
         self.save()
 
@@ -294,15 +292,15 @@ class PopulationTrend(models.Model):
         # Get species observations within the period
         observations = CensusObservation.objects.filter(
             species=self.species_analytics.species,
-            census__census_date__gte=self.period_start,
-            census__census_date__lte=self.period_end
+            census_date__gte=self.period_start,
+            census_date__lte=self.period_end
         )
 
         if not observations.exists():
             return False
 
         # Calculate basic statistics
-        counts = [obs.count for obs in observations]
+        counts = list(observations.order_by('census_date').values_list('count', flat=True))
         self.sample_size = len(counts)
         self.average_count = sum(counts) / len(counts)
         self.peak_count = max(counts)
@@ -55,14 +55,14 @@ def dashboard_view(request):
         })
 
     # Get top sites by bird count
-    site_counts = CensusObservation.objects.values('census__month__year__site').annotate(
+    site_counts = CensusObservation.objects.values('site').annotate(
         total_birds=Sum('count'),
         species_count=Count('species', distinct=True)
     ).order_by('-total_birds')[:5]
 
     top_sites = []
     for site_count in site_counts:
-        site = Site.objects.get(id=site_count['census__month__year__site'])
+        site = Site.objects.get(id=site_count['site'])
         top_sites.append({
             'site': site,
             'total_birds': site_count['total_birds'],
@@ -107,11 +107,11 @@ def species_analytics_view(request):
         if observations.exists():
             # Calculate statistics
             total_count = observations.aggregate(total=Sum('count'))['total'] or 0
-            sites_with_presence = observations.values('census__month__year__site').distinct().count()
+            sites_with_presence = observations.values('site').distinct().count()
             avg_count = observations.aggregate(avg=Avg('count'))['avg'] or 0
 
             # Get most recent observation
-            recent_obs = observations.order_by('-census__census_date').first()
+            recent_obs = observations.order_by('-census_date').first()
 
             # Create analytics-like object structure for template compatibility
             class AnalyticsObj:
@@ -147,34 +147,44 @@ def site_analytics_view(request):
     """Site-specific analytics reading from operational data"""
 
     from apps.locations.models import Site, Census, CensusObservation
-    from django.db.models import Sum, Count
+    from django.db.models import Sum, Count, Max
 
     # Get active sites with census data
     sites = Site.objects.filter(is_archived=False)
 
+    # Census counts and latest census date of every site, one grouped query
+    census_by_site = {
+        row['month__year__site']: row
+        for row in Census.objects.values('month__year__site').annotate(
+            total_census=Count('id'), latest_date=Max('census_date')
+        ).order_by()
+    }
+
+    # Species composition of every site, one grouped query on the stored site key
+    composition = {}
+    for row in CensusObservation.objects.values(
+        'site', 'species', 'species__name', 'species_name'
+    ).annotate(total=Sum('count')).order_by('site', 'species_name'):
+        composition.setdefault(row['site'], []).append(row)
+
     # Add analytics data for each site
     sites_with_data = []
     for site in sites:
-        # Get census records for this site
-        census_records = Census.objects.filter(month__year__site=site)
+        census_stats = census_by_site.get(site.pk)
 
-        if census_records.exists():
-            # Get all observations for this site
-            observations = CensusObservation.objects.filter(census__month__year__site=site)
+        if census_stats:
+            rows = composition.get(site.pk, [])
 
             # Calculate statistics
-            total_birds = observations.aggregate(total=Sum('count'))['total'] or 0
-            species_diversity = observations.values('species').distinct().count()
-            total_census = census_records.count()
-
-            # Get most recent census
-            recent_census = census_records.order_by('-census_date').first()
+            total_birds = sum(row['total'] for row in rows)
+            species_diversity = len({row['species'] for row in rows})
+            total_census = census_stats['total_census']
 
             # Get species composition
             species_data = {}
-            for obs in observations:
-                species_name = obs.species.name if obs.species else obs.species_name
-                species_data[species_name] = species_data.get(species_name, 0) + obs.count
+            for row in rows:
+                species_name = row['species__name'] or row['species_name']
+                species_data[species_name] = species_data.get(species_name, 0) + row['total']
 
             dominant_species = max(species_data.items(), key=lambda x: x[1])[0] if species_data else "None"
 
@@ -189,10 +199,10 @@ def site_analytics_view(request):
                     'target_species_present': list(species_data.keys()) if species_data else [],
                 },
                 'recent_census': [{
-                    'census_date': recent_census.census_date,
+                    'census_date': census_stats['latest_date'],
                     'total_birds': total_birds,
                     'is_verified': True,  # Mark as verified since it's operational data
-                }] if recent_census else [],
+                }],
             })
 
     # Sort by total birds descending
@@ -210,6 +220,7 @@ def site_analytics_view(request):
 def census_records_view(request):
     """View census observations with analytics"""
 
+    from django.db.models import Prefetch
     from apps.locations.models import Census, CensusObservation, Site
 
     # Filter options
@@ -240,17 +251,19 @@ def census_records_view(request):
             observations__species__name__icontains=species_filter
         ).distinct()
 
-    records = records.order_by('-census_date')
+    # Observations of every listed census in one prefetch query
+    records = records.order_by('-census_date').prefetch_related(
+        Prefetch('observations', queryset=CensusObservation.objects.select_related('species'))
+    )
 
     # Enhance records with analytics data
     enhanced_records = []
     for census in records:
-        # Get observations for this census
-        observations = CensusObservation.objects.filter(census=census)
+        observations = census.observations.all()
 
         # Calculate analytics
-        total_birds = observations.aggregate(total=Sum('count'))['total'] or 0
-        species_richness = observations.values('species').distinct().count()
+        total_birds = sum(obs.count for obs in observations)
+        species_richness = len({obs.species_id for obs in observations})
 
         # Get species breakdown
         species_breakdown = {}
@@ -377,13 +390,13 @@ def generate_comprehensive_report(config, user):
         for species in target_species:
             observations = CensusObservation.objects.filter(
                 species=species,
-                census__census_date__gte=start_date,
-                census__census_date__lte=end_date
+                census_date__gte=start_date,
+                census_date__lte=end_date
             )
 
             if observations.exists():
                 total_count = observations.aggregate(total=Sum('count'))['total'] or 0
-                sites_with_presence = observations.values('census__month__year__site').distinct().count()
+                sites_with_presence = observations.values('site').distinct().count()
 
                 species_data.append({
                     'name': species.name,
@@ -409,7 +422,7 @@ def generate_comprehensive_report(config, user):
             )
 
             if census_records.exists():
-                observations = CensusObservation.objects.filter(census__month__year__site=site)
+                observations = CensusObservation.objects.filter(site=site)
                 total_birds = observations.aggregate(total=Sum('count'))['total'] or 0
                 species_diversity = observations.values('species').distinct().count()
 
@@ -714,8 +727,7 @@ def annual_trends_report_view(request):
     """
     from apps.locations.models import CensusObservation, Census
     from apps.fauna.models import Species
-    from django.db.models import Sum, Count
-    from django.db.models.functions import ExtractYear
+    from django.db.models import F, Sum, Count
     import json
     
     # Get year filter from request (optional)
@@ -732,9 +744,7 @@ def annual_trends_report_view(request):
     
     # ========== 2. YEAR-OVER-YEAR TRENDS (2020-2022) ==========
     # Get observations grouped by year
-    yearly_data_raw = CensusObservation.objects.annotate(
-        year=ExtractYear('census__census_date')
-    ).values('year').annotate(
+    yearly_data_raw = CensusObservation.objects.values('year').annotate(
         total_birds=Sum('count'),
         species_count=Count('species', distinct=True),
         census_count=Count('census', distinct=True)
@@ -769,8 +779,6 @@ def annual_trends_report_view(request):
     for species_name in top_3_species_names:
         yearly_counts = CensusObservation.objects.filter(
             species__name=species_name
-        ).annotate(
-            year=ExtractYear('census__census_date')
         ).values('year').annotate(
             count=Sum('count')
         ).order_by('year')
@@ -780,9 +788,7 @@ def annual_trends_report_view(request):
         }
     
     # ========== 4. SPECIES DIVERSITY TRENDS ==========
-    diversity_by_year = CensusObservation.objects.annotate(
-        year=ExtractYear('census__census_date')
-    ).values('year').annotate(
+    diversity_by_year = CensusObservation.objects.values('year').annotate(
         unique_species=Count('species', distinct=True)
     ).order_by('year')
     
@@ -805,7 +811,7 @@ def annual_trends_report_view(request):
     all_species_observations = CensusObservation.objects.values(
         'species__name'
     ).annotate(
-        first_year=ExtractYear('census__census_date')
+        first_year=F('year')
     ).order_by('first_year')
     
     # Group by year to see new species per year
@@ -848,7 +854,7 @@ def annual_trends_report_view(request):
     latest_year_data = None
     if latest_year:
         latest_year_data = CensusObservation.objects.filter(
-            census__census_date__year=latest_year
+            year=latest_year
         ).aggregate(
             total_birds=Sum('count'),
             species_count=Count('species', distinct=True)
@@ -6,3 +6,10 @@ class CommonConfig(AppConfig):
     name = "apps.common"
     label = "common"
     verbose_name = "Common"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from apps.common.utils.sqlite_profile import apply_sqlite_profile
+
+        connection_created.connect(apply_sqlite_profile, dispatch_uid="common.apply_sqlite_profile")
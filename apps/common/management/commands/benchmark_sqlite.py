@@ -0,0 +1,170 @@
+"""
+Django management command to benchmark concurrent SQLite throughput with and
+without the SQLite performance profile (settings.SQLITE_PROFILE)
+Usage: python manage.py benchmark_sqlite --seconds=10 --readers=4 --writers=2
+
+Runs on a scratch database in a temporary directory (never the live one): reader
+threads aggregate census-like rows while writer threads insert and update them in
+short transactions, first with SQLite's defaults (rollback journal) and then with
+the profile's pragmas applied to every connection.
+"""
+
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.common.utils.sqlite_profile import apply_pragmas, get_sqlite_profile_config
+
+SEED_ROWS = 20000
+SITES = 20
+SPECIES = 60
+
+
+def _connect(path, profile):
+    # Same connection setup as Django's SQLite backend: autocommit, explicit BEGIN
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    if profile:
+        apply_pragmas(conn.cursor(), profile)
+    return conn
+
+
+def _seed(path, profile):
+    conn = _connect(path, profile)
+    conn.executescript(
+        """
+        CREATE TABLE observation (
+            id INTEGER PRIMARY KEY,
+            site INTEGER NOT NULL,
+            species INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            note TEXT NOT NULL
+        );
+        CREATE INDEX observation_site_species ON observation (site, species);
+        """
+    )
+    conn.execute("BEGIN")
+    conn.executemany(
+        "INSERT INTO observation (site, species, count, note) VALUES (?, ?, ?, ?)",
+        [(i % SITES, i % SPECIES, i % 97, "seed") for i in range(SEED_ROWS)],
+    )
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def _run(path, profile, seconds, readers, writers):
+    stop = threading.Event()
+    lock = threading.Lock()
+    totals = {"reads": 0, "writes": 0, "lock_errors": 0}
+    write_latencies = []
+
+    def reader():
+        conn = _connect(path, profile)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                conn.execute(
+                    "SELECT species, SUM(count) FROM observation WHERE site = ? GROUP BY species",
+                    (random.randrange(SITES),),
+                ).fetchall()
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        conn.close()
+        with lock:
+            totals["reads"] += done
+            totals["lock_errors"] += errors
+
+    def writer():
+        conn = _connect(path, profile)
+        done = errors = 0
+        latencies = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT INTO observation (site, species, count, note) VALUES (?, ?, ?, ?)",
+                    (random.randrange(SITES), random.randrange(SPECIES), random.randrange(100), "bench"),
+                )
+                conn.execute(
+                    "UPDATE observation SET count = count + 1 WHERE id = ?",
+                    (random.randrange(1, SEED_ROWS),),
+                )
+                conn.execute("COMMIT")
+                done += 1
+                latencies.append(time.perf_counter() - start)
+            except sqlite3.OperationalError:
+                errors += 1
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+        conn.close()
+        with lock:
+            totals["writes"] += done
+            totals["lock_errors"] += errors
+            write_latencies.extend(latencies)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    p95 = statistics.quantiles(write_latencies, n=20)[-1] if len(write_latencies) >= 2 else None
+    return {
+        "reads_per_second": round(totals["reads"] / seconds, 1),
+        "writes_per_second": round(totals["writes"] / seconds, 1),
+        "lock_errors": totals["lock_errors"],
+        "write_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent SQLite reads/writes with SQLite defaults vs the SQLITE_PROFILE pragmas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0, help="Duration of each run")
+        parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+        parser.add_argument("--writers", type=int, default=2, help="Concurrent writer threads")
+        parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+
+    def handle(self, *args, **options):
+        profile = get_sqlite_profile_config()
+        runs = {}
+        for label, pragmas in (("defaults", None), ("profile", profile)):
+            with tempfile.TemporaryDirectory() as directory:
+                path = str(Path(directory) / "benchmark.sqlite3")
+                _seed(path, pragmas)
+                runs[label] = _run(path, pragmas, options["seconds"], options["readers"], options["writers"])
+
+        self.stdout.write(
+            f"{options['readers']} reader(s), {options['writers']} writer(s), "
+            f"{options['seconds']:g}s per run, SQLite {sqlite3.sqlite_version}"
+        )
+        self.stdout.write(f"{'':10} {'reads/s':>10} {'writes/s':>10} {'p95 write ms':>13} {'lock errors':>12}")
+        for label, result in runs.items():
+            self.stdout.write(
+                f"{label:10} {result['reads_per_second']:>10} {result['writes_per_second']:>10} "
+                f"{str(result['write_p95_ms']):>13} {result['lock_errors']:>12}"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as f:
+                json.dump({
+                    "sqlite_version": sqlite3.sqlite_version,
+                    "readers": options["readers"],
+                    "writers": options["writers"],
+                    "seconds": options["seconds"],
+                    "profile": {key: value for key, value in profile.items() if key != "ENABLED"},
+                    "runs": runs,
+                }, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['json_path']}"))
@@ -11,7 +11,7 @@ from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import resolve
 from django.conf import settings
 
-from apps.users.models import UserActivity
+from apps.common.services.audit_sink import get_audit_sink
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -93,13 +93,16 @@ class AuditLoggingMiddleware:
             # Determine severity
             severity = self._determine_severity(request, response)
             
-            # Create audit log entry (only if user is authenticated)
+            client_ip = self._get_client_ip(request)
+            
+            # Queue audit log entry (only if user is authenticated); the sink
+            # writes it in batches outside the response path
             if user_id:
-                UserActivity.objects.create(
+                get_audit_sink().submit(
                     user_id=user_id,
                     activity_type=activity_type,
                     description=self._create_description(request, response),
-                    ip_address=self._get_client_ip(request),
+                    ip_address=client_ip,
                     user_agent=request.META.get('HTTP_USER_AGENT', '')[:200],
                     severity=severity,
                     metadata=self._extract_metadata(request, response),
@@ -110,7 +113,7 @@ class AuditLoggingMiddleware:
             logger.info(
                 f"AUDIT: {activity_type} | User: {user_id} | Role: {user_role} | "
                 f"Path: {request.path} | Method: {request.method} | Status: {response.status_code} | "
-                f"IP: {self._get_client_ip(request)}"
+                f"IP: {client_ip}"
             )
             
         except Exception as e:
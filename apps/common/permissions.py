@@ -17,9 +17,16 @@ def get_user_effective_permissions(user):
     """
     Get effective permissions for a user, considering both role permissions and user overrides
     Returns a dictionary of permission_name: boolean
+
+    The result is memoized on the user object, which lives for one request
+    (request.user), so decorators and the context processor share two queries.
     """
     if not user.is_authenticated:
         return {}
+
+    cached = getattr(user, '_effective_permissions', None)
+    if cached is not None:
+        return dict(cached)
     
     # Get role permission
     try:
@@ -51,7 +58,8 @@ def get_user_effective_permissions(user):
     except UserPermission.DoesNotExist:
         pass  # No user-specific overrides
     
-    return effective_permissions
+    user._effective_permissions = effective_permissions
+    return dict(effective_permissions)
 
 
 def has_permission(user, permission_name):
@@ -200,15 +208,12 @@ def user_permissions(request):
     Add user permissions to template context
     """
     if request.user.is_authenticated:
-        return {
-            'user_permissions': get_user_effective_permissions(request.user),
-            'can_generate_reports': has_permission(request.user, 'can_generate_reports'),
-            'can_modify_species': has_permission(request.user, 'can_modify_species'),
-            'can_add_sites': has_permission(request.user, 'can_add_sites'),
-            'can_add_birds': has_permission(request.user, 'can_add_birds'),
-            'can_process_images': has_permission(request.user, 'can_process_images'),
-            'can_access_weather': has_permission(request.user, 'can_access_weather'),
-            'can_access_analytics': has_permission(request.user, 'can_access_analytics'),
-            'can_manage_users': has_permission(request.user, 'can_manage_users'),
-        }
+        effective_permissions = get_user_effective_permissions(request.user)
+        context = {'user_permissions': effective_permissions}
+        for permission_name in effective_permissions:
+            # Same answers as has_permission(), without re-querying per flag
+            context[permission_name] = (
+                request.user.role == User.Role.SUPERADMIN or effective_permissions[permission_name]
+            )
+        return context
     return {}
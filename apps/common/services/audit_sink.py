@@ -0,0 +1,234 @@
+"""
+Audit Event Sink
+Buffers audit log events in process and writes them to UserActivity in batches
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Default sink configuration, overridable through settings.AUDIT_LOG_SINK
+DEFAULT_AUDIT_SINK_CONFIG = {
+    "ASYNC": True,  # False writes every event synchronously (tests, debugging)
+    "BATCH_SIZE": 100,  # Flush as soon as this many events are queued
+    "FLUSH_INTERVAL": 2.0,  # Seconds between time-based flushes
+    "MAX_QUEUE_SIZE": 10000,  # Events beyond this are dropped and counted
+}
+
+
+class SynchronousAuditSink:
+    """
+    Writes each audit event immediately with UserActivity.objects.create.
+    Used when buffering is disabled and in tests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, **fields) -> bool:
+        from apps.users.models import UserActivity
+
+        try:
+            UserActivity.objects.create(**fields)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.error(f"Audit logging error: {str(e)}")
+            return False
+
+        with self._lock:
+            self.written += 1
+        return True
+
+    def flush(self) -> int:
+        return 0
+
+    def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict:
+        return {
+            "mode": "sync",
+            "queue_depth": 0,
+            "dropped": 0,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": 0,
+        }
+
+
+class BufferedAuditSink:
+    """
+    Collects audit events in a bounded in-process queue and persists them with
+    bulk_create from a background thread, either when BATCH_SIZE events are
+    waiting or every FLUSH_INTERVAL seconds. Remaining events are flushed on
+    interpreter shutdown. When the queue is full new events are dropped rather
+    than blocking the request, and counted in ``dropped``.
+    """
+
+    def __init__(self, batch_size=100, flush_interval=2.0, max_queue_size=10000):
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def _ensure_worker(self) -> None:
+        """Start the writer thread lazily, and again in forked worker processes"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-log-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, **fields) -> bool:
+        """Queue an event for writing. Returns False if it had to be dropped."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(fields)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _drain(self) -> List[Dict]:
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def flush(self) -> int:
+        """Write everything currently queued. Returns the number of rows written."""
+        from apps.users.models import UserActivity
+
+        total = 0
+        with self._flush_lock:
+            while True:
+                events = self._drain()
+                if not events:
+                    break
+                try:
+                    with transaction.atomic():
+                        UserActivity.objects.bulk_create(
+                            [UserActivity(**fields) for fields in events],
+                            batch_size=self.batch_size,
+                        )
+                    total += len(events)
+                except Exception as e:
+                    # One bad row (e.g. a user deleted since the event was
+                    # queued) must not lose the whole batch
+                    logger.warning(f"Audit logging: batch write failed, retrying row by row: {str(e)}")
+                    total += self._write_individually(UserActivity, events)
+
+            if total:
+                with self._lock:
+                    self.written += total
+                    self.flushes += 1
+        return total
+
+    def _write_individually(self, model, events: List[Dict]) -> int:
+        written = 0
+        for fields in events:
+            try:
+                with transaction.atomic():
+                    model.objects.create(**fields)
+                written += 1
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.error(f"Audit logging error: {str(e)}")
+        return written
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._queue.empty():
+                continue
+            # The writer thread owns its own DB connection; drop it if stale
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+    def stop(self, timeout=5.0) -> None:
+        """Stop the writer thread and flush whatever is left in the queue"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "mode": "async",
+                "queue_depth": self._queue.qsize(),
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+                "flushes": self.flushes,
+            }
+
+
+_audit_sink = None
+_audit_sink_lock = threading.Lock()
+
+
+def get_audit_sink():
+    """Return the process-wide audit sink configured from settings.AUDIT_LOG_SINK"""
+    global _audit_sink
+    if _audit_sink is None:
+        with _audit_sink_lock:
+            if _audit_sink is None:
+                config = {**DEFAULT_AUDIT_SINK_CONFIG, **getattr(settings, "AUDIT_LOG_SINK", {})}
+                if config["ASYNC"]:
+                    _audit_sink = BufferedAuditSink(
+                        batch_size=config["BATCH_SIZE"],
+                        flush_interval=config["FLUSH_INTERVAL"],
+                        max_queue_size=config["MAX_QUEUE_SIZE"],
+                    )
+                    atexit.register(_audit_sink.stop)
+                else:
+                    _audit_sink = SynchronousAuditSink()
+    return _audit_sink
+
+
+def reset_audit_sink() -> None:
+    """Flush and discard the current sink so the next call re-reads settings"""
+    global _audit_sink
+    with _audit_sink_lock:
+        if _audit_sink is not None:
+            _audit_sink.stop()
+        _audit_sink = None
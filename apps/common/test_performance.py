@@ -0,0 +1,197 @@
+"""
+Query-count and query-plan regression tests for the heaviest views
+
+Each view is measured on a small and a larger synthetic dataset: the query count
+must not grow with the data (no N+1), stay within its budget and finish under a
+wall-clock ceiling (scaled by PERFORMANCE_SUITE["TIME_FACTOR"]). Key census
+queries are EXPLAINed and must not scan whole tables.
+
+Run tests with:
+    python manage.py test apps.common.test_performance
+    DATABASE_URL=postgresql://... PERF_REPORT_DIR=perf-reports python manage.py test apps.common.test_performance
+"""
+
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from openpyxl import Workbook
+
+from apps.common.permissions import user_permissions
+from apps.common.utils.performance import (
+    PerformanceReport,
+    explain_plan,
+    full_scans,
+    get_performance_config,
+    measure,
+    seed_allocation_queue,
+    seed_census_dataset,
+)
+from apps.fauna.models import BirdFamily, Species
+from apps.locations.models import CensusObservation, Site
+from apps.locations.utils.excel_handler import CensusExcelHandler
+
+User = get_user_model()
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Small and larger dataset per view: (sites, years, months, species)
+SMALL = (1, 1, 2, 3)
+LARGE = (4, 2, 3, 8)
+
+# Wall-clock ceilings in seconds on the larger dataset, before TIME_FACTOR
+CEILINGS = {
+    "site_analytics": 2.0,
+    "census_records": 2.0,
+    "allocate": 2.0,
+    "import_from_excel": 5.0,
+    "user_permissions": 0.5,
+}
+
+report = PerformanceReport("query-budgets")
+
+
+def tearDownModule():
+    report.write()  # No-op unless PERFORMANCE_SUITE["REPORT_DIR"] is set
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueryBudgetTests(TestCase):
+    """Query counts are constant in the dataset size and within budget"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            employee_id="PERF001", username="perfadmin", password="pass12345", role="ADMIN"
+        )
+        self.client.force_login(self.user)
+
+    def assertBudget(self, name, run, budget):
+        """Run on SMALL then on LARGE (added on top): same query count, within budget and ceiling"""
+        run()  # Warm-up: first-use rows (role permission defaults) are not part of the budget
+        samples = []
+        for label, size in (("small", SMALL), ("large", LARGE)):
+            sites, years, months, species = size
+            seed_census_dataset(self.user, sites, years, months, species, prefix=f"{name}-{label}")
+            with measure() as sample:
+                run()
+            report.record(name, label, sample)
+            samples.append(sample)
+        small, large = samples
+        self.assertEqual(
+            small.queries, large.queries,
+            f"{name}: query count grows with the data ({small.queries} -> {large.queries}):\n"
+            + "\n".join(large.sql),
+        )
+        self.assertLessEqual(large.queries, budget, f"{name}: over budget:\n" + "\n".join(large.sql))
+        ceiling = CEILINGS[name] * get_performance_config()["TIME_FACTOR"]
+        self.assertLess(large.seconds, ceiling, f"{name}: {large.seconds:.2f}s over {ceiling:.2f}s")
+
+    def test_site_analytics_view(self):
+        url = reverse("analytics_new:site_analytics")
+        self.assertBudget("site_analytics", lambda: self.client.get(url), budget=12)
+
+    def test_census_records_view(self):
+        url = reverse("analytics_new:census_records")
+        self.assertBudget("census_records", lambda: self.client.get(url), budget=14)
+
+    def test_allocate_results_view(self):
+        url = reverse("image_processing:allocate")
+
+        # The queue grows between the two runs; only the page itself is counted
+        self.client.get(url)  # Warm-up
+        samples = []
+        for label, count in (("small", 2), ("large", 8)):
+            seed_allocation_queue(self.user, count=count)
+            with measure() as sample:
+                self.client.get(url)
+            report.record("allocate", label, sample)
+            samples.append(sample)
+        self.assertEqual(samples[0].queries, samples[1].queries, "\n".join(samples[1].sql))
+        self.assertLessEqual(samples[1].queries, 14)
+        ceiling = CEILINGS["allocate"] * get_performance_config()["TIME_FACTOR"]
+        self.assertLess(samples[1].seconds, ceiling)
+
+    def test_import_from_excel(self):
+        Site.objects.create(name="DAGA", site_type="WETLAND", status="active", created_by=self.user)
+        family = BirdFamily.objects.create(
+            name="HERONS AND EGRETS", display_name="Herons And Egrets", category="WATER_BIRDS"
+        )
+        species = Species.objects.bulk_create([
+            Species(name=f"Import Egret {index}", scientific_name=f"Egretta importata {index}",
+                    iucn_status="LC", family=family)
+            for index in range(20)
+        ])
+
+        def workbook(rows):
+            wb = Workbook()
+            ws = wb.active
+            ws.append(["Site", "Family", "Species Name"] + [f"M{month}" for month in range(1, 13)])
+            for bird in species[:rows]:
+                ws.append(["DAGA", family.name, bird.name] + [5, 3, 0] + [None] * 9)
+            output = BytesIO()
+            wb.save(output)
+            output.seek(0)
+            return output
+
+        samples = []
+        for label, rows in (("small", 5), ("large", 20)):
+            excel_file = workbook(rows)
+            with measure() as sample:
+                results = CensusExcelHandler.import_from_excel(excel_file, self.user, import_year=2023 + len(samples))
+            self.assertEqual(results["created_observations"], rows * 2)
+            report.record("import_from_excel", label, sample)
+            samples.append(sample)
+        self.assertEqual(samples[0].queries, samples[1].queries, "\n".join(samples[1].sql))
+        # Constant in the number of rows: lookups are cached, observations bulk-written
+        # and each of the two census months is rolled up once
+        self.assertLessEqual(samples[1].queries, 60)
+        ceiling = CEILINGS["import_from_excel"] * get_performance_config()["TIME_FACTOR"]
+        self.assertLess(samples[1].seconds, ceiling)
+
+        totals = CensusObservation.objects.filter(year=2024).aggregate(total=Sum("count"))
+        self.assertEqual(totals["total"], 20 * 8)
+
+    def test_user_permissions_context_processor(self):
+        worker = User.objects.create_user(
+            employee_id="PERF002", username="perfworker", password="pass12345", role="FIELD_WORKER"
+        )
+        request = RequestFactory().get("/")
+        request.user = worker
+        user_permissions(request)  # Warm-up: creates the role permission defaults
+        request.user = User.objects.get(pk=worker.pk)  # Fresh instance, nothing memoized
+        with measure() as sample:
+            context = user_permissions(request)
+        report.record("user_permissions", "field_worker", sample)
+        self.assertIn("user_permissions", context)
+        self.assertLessEqual(sample.queries, 2, "\n".join(sample.sql))
+        self.assertLess(sample.seconds, CEILINGS["user_permissions"] * get_performance_config()["TIME_FACTOR"])
+
+
+class QueryPlanTests(TestCase):
+    """Key census queries are answered from an index, not a full table scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user(employee_id="PERF003", username="planner", password="pass12345")
+        cls.dataset = seed_census_dataset(user, *LARGE, prefix="Plan")
+
+    def assertIndexed(self, name, queryset):
+        plan = explain_plan(queryset)
+        report.record_plan(name, plan)
+        self.assertEqual(full_scans(plan), [], f"{name} reads whole tables:\n{plan}")
+
+    def test_site_species_date_totals_use_index(self):
+        site = self.dataset["sites"][0]
+        queryset = CensusObservation.objects.filter(
+            site=site, census_date__year__gte=2020
+        ).values("species").annotate(total=Sum("count")).order_by()
+        self.assertIndexed("site_species_totals", queryset)
+
+    def test_species_date_range_uses_index(self):
+        bird = self.dataset["species"][0]
+        queryset = CensusObservation.objects.filter(
+            species=bird, census_date__range=("2020-01-01", "2021-12-31")
+        ).values("census_date").annotate(total=Sum("count")).order_by("census_date")
+        self.assertIndexed("species_date_series", queryset)
@@ -0,0 +1,119 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.users.models import UserActivity
+
+from apps.common.services.audit_sink import BufferedAuditSink, SynchronousAuditSink
+from apps.common.utils.sqlite_profile import (
+    DEFAULT_SQLITE_PROFILE_CONFIG,
+    apply_pragmas,
+    remove_database_files,
+    sidecar_files,
+    snapshot_database,
+)
+
+User = get_user_model()
+
+
+class AuditSinkTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            employee_id="AUD001", username="auditor", password="testpass123"
+        )
+
+    def _event(self, description="GET /admin-system/"):
+        return {
+            "user_id": self.user.id,
+            "activity_type": UserActivity.ActivityType.ADMIN_ACTION,
+            "description": description,
+            "severity": UserActivity.Severity.MEDIUM,
+        }
+
+    def _buffered_sink(self, **kwargs):
+        # Long interval so the background writer never fires during the test;
+        # flushing is driven explicitly from the test thread
+        sink = BufferedAuditSink(flush_interval=3600, batch_size=50, **kwargs)
+        self.addCleanup(sink.stop)
+        return sink
+
+    def test_synchronous_sink_writes_immediately(self):
+        sink = SynchronousAuditSink()
+        self.assertTrue(sink.submit(**self._event()))
+        self.assertEqual(UserActivity.objects.count(), 1)
+        self.assertEqual(sink.stats()["written"], 1)
+
+    def test_buffered_sink_writes_on_flush(self):
+        sink = self._buffered_sink()
+        for i in range(5):
+            sink.submit(**self._event(f"event {i}"))
+
+        self.assertEqual(UserActivity.objects.count(), 0)
+        self.assertEqual(sink.stats()["queue_depth"], 5)
+
+        self.assertEqual(sink.flush(), 5)
+        self.assertEqual(UserActivity.objects.count(), 5)
+        stats = sink.stats()
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertEqual(stats["written"], 5)
+
+    def test_buffered_sink_drops_when_full(self):
+        sink = self._buffered_sink(max_queue_size=2)
+        results = [sink.submit(**self._event()) for _ in range(4)]
+
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(sink.stats()["dropped"], 2)
+
+    def test_buffered_sink_keeps_good_rows_when_batch_fails(self):
+        sink = self._buffered_sink()
+        sink.submit(**self._event("good"))
+        sink.submit(**{**self._event("bad"), "description": None})
+
+        self.assertEqual(sink.flush(), 1)
+        self.assertEqual(list(UserActivity.objects.values_list("description", flat=True)), ["good"])
+        self.assertEqual(sink.stats()["failed"], 1)
+
+
+class SqliteProfileTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def test_pragmas_switch_to_wal_and_tune_connection(self):
+        conn = sqlite3.connect(self.directory / "profile.sqlite3")
+        self.addCleanup(conn.close)
+        apply_pragmas(conn.cursor(), DEFAULT_SQLITE_PROFILE_CONFIG)
+
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 5000)
+        self.assertEqual(conn.execute("PRAGMA temp_store").fetchone()[0], 2)  # MEMORY
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -64 * 1024)
+
+    def test_snapshot_contains_live_rows(self):
+        User.objects.create_user(employee_id="SNAP001", username="snapshot", password="testpass123")
+        snapshot = snapshot_database(self.directory / "snapshot.sqlite3")
+
+        conn = sqlite3.connect(snapshot)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT username FROM users_user").fetchall(), [("snapshot",)])
+
+    def test_remove_database_files_drops_wal_sidecars(self):
+        db_path = self.directory / "live.sqlite3"
+        conn = sqlite3.connect(db_path)
+        apply_pragmas(conn.cursor(), DEFAULT_SQLITE_PROFILE_CONFIG)
+        conn.execute("PRAGMA wal_autocheckpoint=0")  # Keep the commit in the WAL
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.commit()
+        self.assertTrue(all(path.exists() for path in sidecar_files(db_path)))
+        conn.close()
+
+        db_path.touch()
+        for path in sidecar_files(db_path):
+            path.touch()
+        remove_database_files(db_path)
+        self.assertFalse(any(path.exists() for path in [db_path] + sidecar_files(db_path)))
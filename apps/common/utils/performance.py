@@ -0,0 +1,204 @@
+"""
+Query budget and query plan helpers for the performance regression suite
+(apps/common/test_performance.py)
+
+Seeds a synthetic census dataset (sites x years x months x species), measures the
+query count and wall-clock time of a call, captures EXPLAIN plans of key queries
+and writes one JSON report per run so SQLite and PostgreSQL runs can be compared.
+"""
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+# Default suite configuration, overridable through settings.PERFORMANCE_SUITE
+DEFAULT_PERFORMANCE_CONFIG = {
+    "REPORT_DIR": None,  # Directory for the JSON run reports (None: no report written)
+    "TIME_FACTOR": 1.0,  # Multiplies every wall-clock ceiling (slow CI runners)
+}
+
+# Plan lines that read a whole table: SQLite "SCAN <table>" without an index,
+# PostgreSQL "Seq Scan on <table>"
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)")
+POSTGRES_FULL_SCAN = re.compile(r"\bSeq Scan on (\w+)")
+
+
+def get_performance_config() -> Dict:
+    config = DEFAULT_PERFORMANCE_CONFIG.copy()
+    config.update(getattr(settings, "PERFORMANCE_SUITE", {}))
+    return config
+
+
+def seed_census_dataset(user, sites=2, years=1, months=3, species=5, prefix="Perf") -> Dict:
+    """
+    Create sites x years x months census records with one observation per species.
+
+    Rows are bulk-inserted (no save() rollups) with the denormalized site/date keys
+    already set, so seeding a large grid stays fast. Returns the created objects.
+    """
+    from apps.fauna.models import Species
+    from apps.locations.models import Census, CensusMonth, CensusObservation, CensusYear, Site
+
+    species_rows = Species.objects.bulk_create([
+        Species(
+            name=f"{prefix} Species {index}",
+            scientific_name=f"{prefix} scientificus {index}",
+            iucn_status="LC",
+        )
+        for index in range(species)
+    ])
+    site_rows = Site.objects.bulk_create([
+        Site(name=f"{prefix} Site {index}", site_type="WETLAND", status="active", created_by=user)
+        for index in range(sites)
+    ])
+    year_rows = CensusYear.objects.bulk_create([
+        CensusYear(site=site, year=2020 + offset) for site in site_rows for offset in range(years)
+    ])
+    month_rows = CensusMonth.objects.bulk_create([
+        CensusMonth(year=census_year, month=month) for census_year in year_rows for month in range(1, months + 1)
+    ])
+    census_rows = Census.objects.bulk_create([
+        Census(month=census_month, census_date=date(census_month.year.year, census_month.month, 15), lead_observer=user)
+        for census_month in month_rows
+    ])
+    observations = CensusObservation.objects.bulk_create([
+        CensusObservation(
+            census=census,
+            species=bird,
+            species_name=bird.name,
+            count=10 + index,
+            **census.observation_keys(),
+        )
+        for census in census_rows
+        for index, bird in enumerate(species_rows)
+    ])
+    return {
+        "sites": site_rows,
+        "species": species_rows,
+        "census": census_rows,
+        "observations": len(observations),
+    }
+
+
+def seed_allocation_queue(user, count=5) -> List:
+    """Create approved, not yet allocated processing results owned by user"""
+    from apps.image_processing.models import ImageUpload, ProcessingResult, ReviewDecision
+
+    results = []
+    for index in range(count):
+        upload = ImageUpload.objects.create(
+            title=f"Perf upload {index}",
+            image_file="egret_images/test.jpg",
+            uploaded_by=user,
+            file_size=1024,
+            original_filename="test.jpg",
+            upload_status="REFLECTED",
+        )
+        results.append(ProcessingResult.objects.create(
+            image_upload=upload,
+            detected_species="Little_Egret",
+            confidence_score=0.9,
+            bounding_box=[[0, 0, 10, 10]],
+            total_detections=1,
+            all_detections=[{"species": "Little_Egret", "confidence": 0.9, "bounding_box": [0, 0, 10, 10]}],
+            review_decision=ReviewDecision.APPROVED,
+            reviewed_by=user,
+        ))
+    return results
+
+
+class Measurement:
+    """Query count, SQL and wall-clock time of one measured block"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql: List[str] = []
+        self.seconds = 0.0
+
+    def as_dict(self) -> Dict:
+        return {"queries": self.queries, "ms": round(self.seconds * 1000, 2)}
+
+
+@contextmanager
+def measure():
+    """Count the queries and time the block: ``with measure() as sample: ...``"""
+    sample = Measurement()
+    with CaptureQueriesContext(connection) as captured:
+        start = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            sample.seconds = time.perf_counter() - start
+    sample.queries = len(captured.captured_queries)
+    sample.sql = [query["sql"] for query in captured.captured_queries]
+
+
+def explain_plan(queryset) -> str:
+    """
+    EXPLAIN output of a queryset on the current database.
+
+    A small test table makes PostgreSQL prefer sequential scans whatever the
+    indexes, so sequential scans are disabled while planning: the plan then
+    shows whether a usable index exists at all.
+    """
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with connection.cursor() as cursor:
+        cursor.execute("SET enable_seqscan = off")
+    try:
+        return queryset.explain()
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+
+def full_scans(plan: str) -> List[str]:
+    """Tables the plan reads without an index (empty when every access is indexed)"""
+    pattern = POSTGRES_FULL_SCAN if connection.vendor == "postgresql" else SQLITE_FULL_SCAN
+    return sorted({match.group(1) for match in pattern.finditer(plan)})
+
+
+class PerformanceReport:
+    """Per-run JSON report: vendor, dataset sizes, per-view queries and ms, query plans"""
+
+    def __init__(self, suite: str):
+        self.suite = suite
+        self.created_at = timezone.now()
+        self.views: Dict[str, Dict] = {}
+        self.plans: Dict[str, Dict] = {}
+
+    def record(self, name: str, dataset: str, sample: Measurement) -> None:
+        self.views.setdefault(name, {})[dataset] = sample.as_dict()
+
+    def record_plan(self, name: str, plan: str) -> None:
+        self.plans[name] = {"plan": plan.splitlines(), "full_scans": full_scans(plan)}
+
+    def as_dict(self) -> Dict:
+        return {
+            "suite": self.suite,
+            "vendor": connection.vendor,
+            "created_at": self.created_at.isoformat(),
+            "views": self.views,
+            "plans": self.plans,
+        }
+
+    def write(self, directory: Optional[str] = None) -> Optional[str]:
+        """Write the report to REPORT_DIR; returns the path, or None when disabled"""
+        directory = directory or get_performance_config()["REPORT_DIR"]
+        if not directory:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.created_at.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(directory, f"{self.suite}-{connection.vendor}-{stamp}.json")
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        return path
@@ -0,0 +1,56 @@
+"""
+Content hashing for uploaded files
+
+The upload handlers below hash every uploaded file while Django streams it in
+from the request (to memory or to the temporary file on disk), so callers get
+the SHA-256 of the content without reading the file a second time:
+
+    uploaded_file.sha256  # hex digest, set by the handlers
+
+They are installed through settings.FILE_UPLOAD_HANDLERS. file_sha256()
+falls back to hashing the chunks for files that did not pass through them.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self._sha256.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    """MemoryFileUploadHandler that records the SHA-256 of small uploads"""
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler that records the SHA-256 while writing to disk"""
+
+
+def file_sha256(file) -> str:
+    """SHA-256 hex digest of a Django File / UploadedFile"""
+    digest = getattr(file, "sha256", None)
+    if digest:
+        return digest
+
+    sha256 = hashlib.sha256()
+    if hasattr(file, "seek"):
+        file.seek(0)
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return sha256.hexdigest()
@@ -0,0 +1,257 @@
+"""
+Batched census allocation engine (ENGAGE stage)
+
+Allocating a batch of reviewed results used to resolve every detection
+through a chain of Species lookups and write each species with its own
+CensusObservation.get_or_create/save, firing the census -> month -> year
+rollup cascade on every save. The engine instead:
+
+1. Reads the detected species counts of all results from the Detection
+   table in one grouped query (JSON fields for results not yet backfilled)
+2. Resolves all detected species names of the batch against one cached
+   name-to-species map (same matching rules as before: name / scientific name
+   substring, then the egret common-name fallbacks)
+3. Groups bird counts per (census, species)
+4. Upserts the observations with one bulk_update / bulk_create inside a single
+   transaction and marks all results as allocated in bulk
+5. Runs the rollups once per touched census
+"""
+
+import logging
+from collections import OrderedDict, namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .detections import species_counts_by_result
+from .models import ImageUpload, ProcessingResult, ProcessingStatus
+from .stage_counters import invalidate_stage_counts
+
+logger = logging.getLogger(__name__)
+
+SPECIES_MAP_CACHE_KEY = "image_processing:species_map"
+SPECIES_MAP_TTL = 60 * 60
+
+DEFAULT_OBSERVATION_FAMILY = "Ardeidae"  # Heron/egret family
+
+# Common-name fallbacks, tried in order when no species name contains the
+# detected name. Each rule lists name fragments that must all appear; the
+# first rule that matches a species wins.
+EGRET_FALLBACKS = [
+    ("chinese egret", [("CHINESE", "EGRET"), ("CHINESE",)]),
+    ("little egret", [("LITTLE EGRET",)]),
+    ("great egret", [("GREAT EGRET",)]),
+    ("intermediate egret", [("INTERMEDIATE EGRET",)]),
+    ("cattle egret", [("CATTLE EGRET",)]),
+]
+
+SpeciesEntry = namedtuple("SpeciesEntry", ["pk", "name", "scientific_name"])
+
+
+class AllocationError(Exception):
+    """Raised when a batch cannot be allocated; nothing has been written"""
+
+
+class UnregisteredSpeciesError(AllocationError):
+    def __init__(self, species_names):
+        self.species_names = sorted(species_names)
+        super().__init__(
+            f"Species not registered in the fauna management system: {', '.join(self.species_names)}"
+        )
+
+
+def invalidate_species_map():
+    cache.delete(SPECIES_MAP_CACHE_KEY)
+
+
+def _load_species_entries():
+    from apps.fauna.models import Species
+
+    entries = cache.get(SPECIES_MAP_CACHE_KEY)
+    if entries is None:
+        entries = [
+            (pk, name or "", scientific_name or "")
+            for pk, name, scientific_name in Species.objects.values_list("pk", "name", "scientific_name")
+        ]
+        # QuerySet.first() on the unordered Species table orders by primary key
+        entries.sort(key=lambda entry: str(entry[0]))
+        cache.set(SPECIES_MAP_CACHE_KEY, entries, SPECIES_MAP_TTL)
+    return [SpeciesEntry(*entry) for entry in entries]
+
+
+class SpeciesResolver:
+    """Resolve detected species names to Species rows without per-name queries"""
+
+    def __init__(self, entries=None):
+        self.entries = _load_species_entries() if entries is None else entries
+        self._resolved = {}
+
+    def resolve(self, detected_name):
+        """Return the matching SpeciesEntry, or None if the species is not registered"""
+        if detected_name not in self._resolved:
+            self._resolved[detected_name] = self._match(detected_name)
+        return self._resolved[detected_name]
+
+    def _match(self, detected_name):
+        needle = detected_name.lower()
+        for entry in self.entries:
+            if needle in entry.name.lower() or needle in entry.scientific_name.lower():
+                return entry
+
+        for phrase, rules in EGRET_FALLBACKS:
+            if phrase not in needle:
+                continue
+            for fragments in rules:
+                for entry in self.entries:
+                    name = entry.name.lower()
+                    if all(fragment.lower() in name for fragment in fragments):
+                        return entry
+            return None
+        return None
+
+
+def detected_species_counts(result):
+    """
+    Bird counts per detected species name for one result from its JSON
+    fields: one bird per entry of all_detections, or the legacy single-species
+    detected_species/total. Used for results without Detection rows.
+    """
+    counts = OrderedDict()
+    if result.all_detections:
+        for detection in result.all_detections:
+            counts[detection["species"]] = counts.get(detection["species"], 0) + 1
+    elif result.detected_species and result.detected_species != "UNKNOWN":
+        counts[result.detected_species] = result.total_detections
+    return counts
+
+
+class AllocationSummary:
+    """What an allocation run wrote, per result and per census"""
+
+    def __init__(self):
+        self.allocated = []  # (ProcessingResult, Census) pairs
+        self.skipped = []  # Already allocated (ENGAGED) results
+        self.species_per_result = {}  # result pk -> {species name: count}
+        self.observations_created = 0
+        self.observations_updated = 0
+        self.censuses = []
+
+    @property
+    def total_birds(self):
+        return sum(sum(counts.values()) for counts in self.species_per_result.values())
+
+
+def allocate_batch(assignments, allocated_by=None, resolver=None):
+    """
+    Allocate ``(ProcessingResult, Census)`` pairs in one transaction.
+
+    Results whose image is already ENGAGED are skipped. If any detected
+    species is not registered, UnregisteredSpeciesError is raised before
+    anything is written.
+    """
+    from apps.locations.models import CensusObservation
+
+    resolver = resolver or SpeciesResolver()
+    summary = AllocationSummary()
+    assignments = list(assignments)
+    # Species counts straight from the Detection table, one grouped query
+    table_counts = species_counts_by_result([result.pk for result, _ in assignments])
+
+    # (census pk, species name) -> [census, species entry, count]
+    grouped = OrderedDict()
+    censuses = OrderedDict()
+    unregistered = set()
+
+    for result, census in assignments:
+        if result.image_upload.upload_status == ProcessingStatus.ENGAGED:
+            summary.skipped.append(result)
+            continue
+
+        species_counts = OrderedDict()
+        result_counts = table_counts.get(result.pk) or detected_species_counts(result)
+        for detected_name, count in result_counts.items():
+            entry = resolver.resolve(detected_name)
+            if entry is None:
+                unregistered.add(detected_name)
+                continue
+            species_counts[entry.name] = species_counts.get(entry.name, 0) + count
+            key = (census.pk, entry.name)
+            if key not in grouped:
+                grouped[key] = [census, entry, 0]
+            grouped[key][2] += count
+
+        summary.allocated.append((result, census))
+        summary.species_per_result[result.pk] = species_counts
+        censuses[census.pk] = census
+
+    if unregistered:
+        raise UnregisteredSpeciesError(unregistered)
+    if not summary.allocated:
+        return summary
+
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {}
+        for observation in CensusObservation.objects.filter(
+            census_id__in=list(censuses),
+            species_name__in={species_name for _, species_name in grouped},
+        ).order_by("created_at"):
+            existing.setdefault((observation.census_id, observation.species_name), observation)
+
+        to_create, to_update = [], []
+        for key, (census, entry, count) in grouped.items():
+            observation = existing.get(key)
+            if observation is None:
+                to_create.append(
+                    CensusObservation(
+                        census=census,
+                        species_id=entry.pk,
+                        species_name=entry.name,
+                        family=DEFAULT_OBSERVATION_FAMILY,
+                        count=count,
+                        **census.observation_keys(),  # bulk_create skips save()
+                    )
+                )
+            else:
+                observation.count += count
+                observation.updated_at = now
+                to_update.append(observation)
+
+        if to_create:
+            CensusObservation.objects.bulk_create(to_create)
+        if to_update:
+            CensusObservation.objects.bulk_update(to_update, ["count", "updated_at"])
+
+        results = []
+        for result, census in summary.allocated:
+            result.allocated_to_site_id = census.month.year.site_id
+            result.allocated_to_census = census
+            result.allocated_at = now
+            if allocated_by:
+                result.allocated_by = allocated_by
+            result.image_upload.upload_status = ProcessingStatus.ENGAGED
+            results.append(result)
+
+        ProcessingResult.objects.bulk_update(
+            results, ["allocated_to_site", "allocated_to_census", "allocated_at", "allocated_by"]
+        )
+        ImageUpload.objects.filter(pk__in=[r.image_upload_id for r in results]).update(
+            upload_status=ProcessingStatus.ENGAGED
+        )
+
+        # bulk writes bypass save() and the rollup signals: roll up once per
+        # census (Census.save cascades to the month and year summaries)
+        for census in censuses.values():
+            census.update_totals()
+
+    invalidate_stage_counts()
+
+    summary.observations_created = len(to_create)
+    summary.observations_updated = len(to_update)
+    summary.censuses = list(censuses.values())
+    logger.info(
+        f"Allocated {len(results)} results to {len(censuses)} census records "
+        f"({summary.observations_created} observations created, {summary.observations_updated} updated)"
+    )
+    return summary
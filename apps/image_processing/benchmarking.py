@@ -0,0 +1,332 @@
+"""
+Model benchmarking on a fixed local fixture set
+
+benchmark_model() measures one model file and backend:
+
+- cold load: model load plus the first inference (run in a fresh process by the
+  benchmark_models command, so imports and caches of earlier runs don't help)
+- warm latency p50/p95/p99 of single-image calls
+- throughput (images/sec) at each configured batch size
+- peak resident set size of the process
+
+Fixtures are the images in BIRD_MODEL_BENCHMARK["FIXTURE_DIR"], decoded and
+fitted to the model input size once up front, so the numbers compare the
+models and backends rather than JPEG decoding. Results are stored as
+ModelBenchmarkRun rows and shown on the Model Benchmarking page.
+
+benchmark_concurrency_split() runs several replica processes with a given
+number of threads each side by side, to find the replica x thread split with
+the best throughput on a host (see inference_concurrency.py).
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from django.conf import settings
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BENCHMARK_CONFIG = {
+    "FIXTURE_DIR": None,  # defaults to BASE_DIR / "benchmark_fixtures"
+    "MAX_FIXTURES": 32,
+    "BATCH_SIZES": [1, 4, 8, 16],
+    "WARM_ITERATIONS": 50,  # single-image calls for the latency percentiles
+    "THROUGHPUT_IMAGES": 64,  # images pushed through per batch size
+    "IMAGE_SIZE": 640,
+}
+
+FIXTURE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MODEL_EXTENSIONS = {".pt": "pytorch", ".onnx": "onnx"}
+
+
+def get_benchmark_config() -> Dict:
+    config = dict(DEFAULT_BENCHMARK_CONFIG)
+    config.update(getattr(settings, "BIRD_MODEL_BENCHMARK", {}))
+    if not config["FIXTURE_DIR"]:
+        config["FIXTURE_DIR"] = str(Path(settings.BASE_DIR) / "benchmark_fixtures")
+    return config
+
+
+# Inputs --------------------------------------------------------------------------
+
+def discover_models(base_dir=None) -> List[Dict]:
+    """
+    Model files that can be benchmarked: every .pt/.onnx file in the model
+    directories under models/ plus the default egret_500_model weights
+    """
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    candidates = []
+    models_dir = base_dir / "models"
+    if models_dir.is_dir():
+        for model_dir in sorted(p for p in models_dir.iterdir() if p.is_dir()):
+            for model_file in sorted(model_dir.iterdir()):
+                candidates.append((model_dir.name, model_file))
+    default_weights = base_dir / "egret_500_model" / "weights"
+    if default_weights.is_dir():
+        for model_file in sorted(default_weights.iterdir()):
+            candidates.append(("egret_500_model", model_file))
+
+    return [
+        {"name": name, "path": str(path), "backend": MODEL_EXTENSIONS[path.suffix.lower()]}
+        for name, path in candidates
+        if path.suffix.lower() in MODEL_EXTENSIONS
+    ]
+
+
+def model_entry(path: str, name: Optional[str] = None) -> Dict:
+    """Benchmark entry for a model file given on the command line"""
+    model_path = Path(path)
+    backend = MODEL_EXTENSIONS.get(model_path.suffix.lower())
+    if backend is None:
+        raise ValueError(f"Unsupported model file {path} (expected .pt or .onnx)")
+    if not name:
+        name = model_path.parent.parent.name if model_path.parent.name == "weights" else model_path.parent.name
+    return {"name": name, "path": str(model_path), "backend": backend}
+
+
+def load_fixtures(fixture_dir: str, image_size: int = 640, limit: Optional[int] = None) -> List:
+    """Fixture images as RGB arrays fitted to the model input size"""
+    import numpy as np
+
+    files = sorted(
+        p for p in Path(fixture_dir).iterdir()
+        if p.is_file() and p.suffix.lower() in FIXTURE_EXTENSIONS
+    ) if Path(fixture_dir).is_dir() else []
+    arrays = []
+    for path in files[:limit] if limit else files:
+        with Image.open(path) as image:
+            fitted = ImageOps.fit(image.convert("RGB"), (image_size, image_size), Image.Resampling.LANCZOS)
+            arrays.append(np.asarray(fitted))
+    return arrays
+
+
+# Measurement ---------------------------------------------------------------------
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (0-100) of a non-empty sequence"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, None where unsupported"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def ultralytics_benchmark_loader(path: str, backend: str, device: str):
+    """Load a model the way inference does; ultralytics picks the runtime from the file type"""
+    from ultralytics import YOLO
+
+    return YOLO(path, task="detect")
+
+
+def environment_info() -> Dict:
+    info = {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+    for module_name in ("torch", "ultralytics", "onnxruntime"):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            info[module_name] = getattr(module, "__version__", "unknown")
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        info["torch_threads"] = torch.get_num_threads()
+    return info
+
+
+def benchmark_model(
+    path: str,
+    backend: str,
+    fixtures: List,
+    device: str = "cpu",
+    batch_sizes: Sequence[int] = (1, 4, 8, 16),
+    warm_iterations: int = 50,
+    throughput_images: int = 64,
+    loader: Optional[Callable] = None,
+) -> Dict:
+    """
+    Benchmark one model over the fixtures. Returns the fields of a
+    ModelBenchmarkRun (without the model name).
+    """
+    if not fixtures:
+        raise ValueError("No benchmark fixtures to run the model on")
+    loader = loader or ultralytics_benchmark_loader
+    started = time.perf_counter()
+
+    def run(batch):
+        return model(batch, device=device, verbose=False)
+
+    # Cold load: load plus the first inference
+    model = loader(path, backend, device)
+    run([fixtures[0]])
+    cold_load_seconds = time.perf_counter() - started
+
+    latencies = []
+    for i in range(warm_iterations):
+        call_started = time.perf_counter()
+        run([fixtures[i % len(fixtures)]])
+        latencies.append((time.perf_counter() - call_started) * 1000)
+
+    throughput = {}
+    for batch_size in batch_sizes:
+        batches = [
+            [fixtures[(start + j) % len(fixtures)] for j in range(batch_size)]
+            for start in range(0, max(throughput_images, batch_size), batch_size)
+        ]
+        run(batches[0])  # First call at a new batch shape may allocate
+        batch_started = time.perf_counter()
+        for batch in batches:
+            run(batch)
+        elapsed = time.perf_counter() - batch_started
+        throughput[str(batch_size)] = round(sum(len(b) for b in batches) / elapsed, 2) if elapsed else None
+
+    return {
+        "model_path": str(path),
+        "backend": backend,
+        "device": device,
+        "fixture_count": len(fixtures),
+        "cold_load_seconds": round(cold_load_seconds, 4),
+        "latency_p50_ms": round(percentile(latencies, 50), 3) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 95), 3) if latencies else None,
+        "latency_p99_ms": round(percentile(latencies, 99), 3) if latencies else None,
+        "throughput": throughput,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "environment": environment_info(),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def save_benchmark_run(name: str, measurements: Dict):
+    """Store a successful measurement as a ModelBenchmarkRun"""
+    from .models import ModelBenchmarkRun
+
+    return ModelBenchmarkRun.objects.create(model_name=name, status=ModelBenchmarkRun.Status.SUCCESS, **measurements)
+
+
+def save_failed_run(entry: Dict, device: str, error: str):
+    from .models import ModelBenchmarkRun
+
+    return ModelBenchmarkRun.objects.create(
+        model_name=entry["name"],
+        model_path=entry["path"],
+        backend=entry["backend"],
+        device=device,
+        status=ModelBenchmarkRun.Status.FAILED,
+        error=error[:5000],
+        environment=environment_info(),
+    )
+
+
+def parse_worker_output(output: str) -> Dict:
+    """The JSON result line printed by a ``benchmark_models --worker`` process"""
+    for line in reversed(output.strip().splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise ValueError("Benchmark worker produced no result")
+
+
+# Replica x thread splits ---------------------------------------------------------
+
+def default_splits(cores: int) -> List[tuple]:
+    """(replicas, threads) splits that use every core: 1 x cores, 2 x cores/2, ..."""
+    splits = []
+    replicas = 1
+    while replicas <= cores:
+        splits.append((replicas, cores // replicas))
+        replicas *= 2
+    return splits
+
+
+def _replica_worker(path, backend, device, threads, fixture_dir, image_size, limit, images, barrier, results):
+    """One replica process of a concurrency benchmark (spawned; needs no Django setup)"""
+    from .inference_concurrency import apply_thread_limits
+
+    try:
+        apply_thread_limits(threads)
+        fixtures = load_fixtures(fixture_dir, image_size, limit)
+        model = ultralytics_benchmark_loader(path, backend, device)
+        model([fixtures[0]], device=device, verbose=False)
+        barrier.wait()  # All replicas start measuring together
+
+        latencies = []
+        started = time.perf_counter()
+        for i in range(images):
+            call_started = time.perf_counter()
+            model([fixtures[i % len(fixtures)]], device=device, verbose=False)
+            latencies.append((time.perf_counter() - call_started) * 1000)
+        results.put({"latencies": latencies, "elapsed": time.perf_counter() - started})
+    except Exception as e:
+        barrier.abort()
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def benchmark_concurrency_split(
+    path: str,
+    backend: str,
+    replicas: int,
+    threads: int,
+    fixture_dir: str,
+    images: int = 32,
+    device: str = "cpu",
+    image_size: int = 640,
+    limit: int = 32,
+    timeout: float = 1800,
+) -> Dict:
+    """Throughput and latency of ``replicas`` model processes with ``threads`` threads each"""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(replicas)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_replica_worker,
+            args=(path, backend, device, threads, fixture_dir, image_size, limit, images, barrier, results),
+            daemon=True,
+        )
+        for _ in range(replicas)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        outcomes = [results.get(timeout=timeout) for _ in processes]
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    errors = [o["error"] for o in outcomes if "error" in o]
+    if errors:
+        raise RuntimeError(errors[0])
+
+    latencies = [ms for outcome in outcomes for ms in outcome["latencies"]]
+    elapsed = max(outcome["elapsed"] for outcome in outcomes)
+    return {
+        "replicas": replicas,
+        "threads": threads,
+        "images": len(latencies),
+        "images_per_second": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p95_ms": round(percentile(latencies, 95), 3),
+    }
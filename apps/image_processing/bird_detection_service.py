@@ -7,6 +7,8 @@ import io
 import logging
 import os
 import gc
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -15,7 +17,13 @@ import numpy as np
 import torch
 from django.conf import settings
 from PIL import Image, ImageOps
-from ultralytics import YOLO
+
+from .inference_concurrency import InferenceQueueFull, configure_inference_threads, get_inference_admission
+from .model_registry import get_model_registry, get_registry_config, get_selected_model_path
+from .pipeline_timing import StageTimer
+from .quantization import runtime_model_path
+from .rethreshold import raw_confidence_floor
+from .tiling import extract_tiles, get_tiling_config, shift_detections, should_tile, tile_grid, to_rgb_array
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +42,16 @@ class BirdDetectionService:
             confidence_threshold: Minimum confidence score for detections
         """
         self.confidence_threshold = confidence_threshold
+        # The model runs down to this floor so raw detections can be stored for re-thresholding
+        self.raw_confidence_floor = raw_confidence_floor(confidence_threshold)
+        self.nms_iou = 0.45
         self.device = self._get_optimal_device()
         self.model = None
         self.model_path = self._get_model_path(model_path)
-        self.model_cache = {}  # Cache for loaded models
+        self.backend = get_registry_config()["BACKEND"]
+        # Weights actually run: a validated INT8 variant on CPU when enabled (see quantization.py)
+        self.weights_path = runtime_model_path(self.model_path, self.device)
+        self.precision = "int8" if self.weights_path != self.model_path else "fp32"
 
         # Enhanced species mapping with confidence weighting
         self.species_display_names = {
@@ -51,10 +65,11 @@ class BirdDetectionService:
 
         # Performance optimization settings
         self.enable_half_precision = False  # Disable FP16 to avoid dtype issues
-        self.enable_model_warmup = True     # Warm up model for better performance
         self.max_batch_size = 4             # Process multiple images together
         self.image_size = (640, 640)        # Optimal input size
 
+        # Size the PyTorch/OpenCV thread pools for this replica before loading
+        configure_inference_threads()
         self._load_model()
 
     def _get_optimal_device(self) -> str:
@@ -115,53 +130,16 @@ class BirdDetectionService:
         raise FileNotFoundError("No YOLO model found. Please ensure a model file (.pt) is available.")
 
     def _load_model(self):
-        """Load and optimize the YOLO model"""
+        """Fetch the model from the process-wide registry (loaded and warmed once per process)"""
         try:
-            logger.info(f"Loading optimized YOLO model from: {self.model_path}")
-
-            # Check cache first
-            cache_key = f"{self.model_path}_{self.device}"
-            if cache_key in self.model_cache:
-                self.model = self.model_cache[cache_key]
-                logger.info("Using cached model")
-                return
+            logger.info(f"Loading optimized YOLO model from: {self.weights_path} ({self.precision.upper()})")
 
-            # Load model with optimizations
-            self.model = YOLO(self.model_path)
+            entry = get_model_registry().get(self.weights_path, self.backend, self.device)
+            self.model = entry.model
 
-            # Move to optimal device
-            if self.device.startswith('cuda'):
-                # Enable CUDA optimizations
-                torch.cuda.empty_cache()
-
-            # Disable half precision to avoid dtype issues
-            if self.enable_half_precision and self.device.startswith('cuda'):
-                try:
-                    # Check if model supports half precision
-                    if hasattr(self.model.model, 'half'):
-                        self.model = self.model.half()  # Convert to FP16
-                        logger.info("Enabled half precision (FP16) for faster inference")
-                    else:
-                        logger.warning("Model does not support half precision")
-                except Exception as e:
-                    logger.warning(f"Half precision not available: {e}")
-            else:
-                logger.info("Using full precision (FP32) for better accuracy")
-
-            # Warm up model for better performance
-            if self.enable_model_warmup:
-                try:
-                    # Create a dummy image for warmup
-                    dummy_image = np.zeros((640, 640, 3), dtype=np.uint8)
-                    _ = self.model(dummy_image, verbose=False)
-                    logger.info("Model warmup completed")
-                except Exception as e:
-                    logger.warning(f"Model warmup failed: {e}")
-
-            # Cache the loaded model
-            self.model_cache[cache_key] = self.model
-
-            logger.info(f"Model loaded and optimized on device: {self.device}")
+            # Half precision is requested per inference call (see detect_birds_batch)
+            logger.info("Using full precision (FP32) for better accuracy")
+            logger.info(f"Model ready on device: {self.device} (loaded in {entry.load_seconds:.2f}s)")
 
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
@@ -225,6 +203,11 @@ class BirdDetectionService:
         elif len(image_array.shape) == 2:  # Grayscale
             image_array = cv2.cvtColor(image_array, cv2.COLOR_GRAY2RGB)
 
+        return self._enhance_contrast(image_array), scaling_info
+
+    @staticmethod
+    def _enhance_contrast(image_array: np.ndarray) -> np.ndarray:
+        """Slight contrast enhancement applied to every model input"""
         # Normalize pixel values for better model performance
         image_array = image_array.astype(np.float32) / 255.0
 
@@ -232,9 +215,7 @@ class BirdDetectionService:
         image_array = np.clip(image_array * 1.1, 0, 1)  # Increase contrast by 10%
 
         # Convert back to uint8 for YOLO model
-        image_array = (image_array * 255).astype(np.uint8)
-
-        return image_array, scaling_info
+        return (image_array * 255).astype(np.uint8)
 
     def _transform_coordinates_to_original(self, detections: List[Dict], scaling_info: Dict) -> List[Dict]:
         """
@@ -326,21 +307,22 @@ class BirdDetectionService:
         Returns:
             Filtered and improved detections with coordinates in original image space
         """
-        # Filter by confidence threshold
-        logger.info(f"Filtering {len(detections)} detections by confidence threshold {self.confidence_threshold}")
-        for i, det in enumerate(detections):
-            logger.info(f"  Detection {i}: {det['species']} confidence {det['confidence']:.3f} {'PASS' if det['confidence'] >= self.confidence_threshold else 'FILTERED'}")
-        
+        # Filter by confidence threshold (per-detection tracing with DEBUG logging)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Filtering {len(detections)} detections by confidence threshold {self.confidence_threshold}")
+            for i, det in enumerate(detections):
+                logger.debug(f"  Detection {i}: {det['species']} confidence {det['confidence']:.3f} {'PASS' if det['confidence'] >= self.confidence_threshold else 'FILTERED'}")
+
         filtered_detections = [
             d for d in detections
             if d["confidence"] >= self.confidence_threshold
         ]
-        
-        logger.info(f"After confidence filtering: {len(filtered_detections)} detections remain")
+
+        logger.debug(f"After confidence filtering: {len(filtered_detections)} detections remain")
 
         # Apply Non-Maximum Suppression (NMS) for overlapping boxes
         if len(filtered_detections) > 1:
-            filtered_detections = self._apply_nms(filtered_detections)
+            filtered_detections = self._apply_nms(filtered_detections, self.nms_iou)
 
         # Transform coordinates from model space to original image space
         transformed_detections = self._transform_coordinates_to_original(filtered_detections, scaling_info)
@@ -361,7 +343,7 @@ class BirdDetectionService:
         if len(detections) <= 1:
             return detections
 
-        logger.info(f"Applying NMS to {len(detections)} detections with IoU threshold {iou_threshold}")
+        logger.debug(f"Applying NMS to {len(detections)} detections with IoU threshold {iou_threshold}")
 
         # Sort by confidence (highest first)
         detections_sorted = sorted(detections, key=lambda x: x["confidence"], reverse=True)
@@ -377,15 +359,14 @@ class BirdDetectionService:
             remaining = []
             for other in detections_sorted:
                 iou = self._calculate_iou(current["bounding_box"], other["bounding_box"])
-                logger.debug(f"IoU between {current['species']} and {other['species']}: {iou:.3f}")
                 if iou <= iou_threshold:
                     remaining.append(other)
                 else:
-                    logger.info(f"Suppressing {other['species']} due to high IoU ({iou:.3f} > {iou_threshold})")
+                    logger.debug(f"Suppressing {other['species']} due to high IoU ({iou:.3f} > {iou_threshold})")
 
             detections_sorted = remaining
 
-        logger.info(f"NMS result: {len(keep)} detections kept from {len(detections)} original")
+        logger.debug(f"NMS result: {len(keep)} detections kept from {len(detections)} original")
         return keep
 
     def _calculate_iou(self, box1: Dict, box2: Dict) -> float:
@@ -438,122 +419,239 @@ class BirdDetectionService:
         Returns:
             Detection results dictionary
         """
+        return self.detect_birds_batch([(image_data, filename)])[0]
+
+    def detect_birds_batch(self, images: List[Tuple[bytes, str]]) -> List[Dict]:
+        """
+        Detect birds in several images with batched model calls
+
+        Images are decoded and preprocessed one by one, then sent through the
+        model in batches of up to ``max_batch_size``. A failure only affects
+        the images involved; every image gets its own detect_birds() result.
+        With tiling enabled (see tiling.py), images that need it get a second,
+        sliced pass at native resolution. Each result carries per-stage
+        ``timings`` in ms (see pipeline_timing.py).
+
+        The whole batch runs under an inference slot (inference_concurrency.py);
+        when the queue for slots is full every image gets an error result.
+
+        Args:
+            images: List of (raw image bytes, filename) tuples
+
+        Returns:
+            Detection results dictionaries, in the order of ``images``
+        """
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_data))
-
-            # Enhanced preprocessing with scaling information
-            image_array, scaling_info = self._preprocess_image(image)
-
-            # Clear GPU cache before inference
-            if self.device.startswith('cuda'):
-                torch.cuda.empty_cache()
-
-            # Run optimized inference
-            results = self.model(
-                image_array,
-                conf=self.confidence_threshold,
-                device=self.device,
-                half=self.enable_half_precision and self.device.startswith('cuda'),
-                verbose=False  # Reduce logging noise
-            )
-
-            # Process results
-            detections = []
-            total_detections = 0
-            egret_detections = 0
-
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for i, box in enumerate(boxes):
-                        # Get bounding box coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-
-                        # Get class name
-                        class_name = self.model.names[class_id]
-
-                        # Map to display name if available
-                        display_name = self.species_display_names.get(class_name, class_name)
-
-                        # Only count egret species for total_detections
-                        if display_name in self.species_display_names.values():
-                            egret_detections += 1
-
-                        detection = {
-                            "id": i,
-                            "species": display_name,
-                            "confidence": confidence,
-                            "bounding_box": {
-                                "x": int(x1),
-                                "y": int(y1),
-                                "width": int(x2 - x1),
-                                "height": int(y2 - y1)
-                            }
-                        }
-                        detections.append(detection)
-
-            # Apply enhanced post-processing with coordinate transformation
-            logger.info(f"BEFORE post-processing: {len(detections)} detections found")
-            for i, det in enumerate(detections):
-                logger.info(f"  Detection {i}: {det['species']} (conf: {det['confidence']:.3f}) at {det['bounding_box']}")
-            
-            detections = self._postprocess_detections(detections, scaling_info)
+            with get_inference_admission().slot() as queue_ms:
+                return self._detect_batch(images, queue_ms)
+        except InferenceQueueFull as e:
+            return [self._detection_error(filename, e) for _, filename in images]
+
+    def _detect_batch(self, images: List[Tuple[bytes, str]], queue_ms: float = 0.0) -> List[Dict]:
+        results: List[Optional[Dict]] = [None] * len(images)
+        prepared = []
+        tiling = get_tiling_config()
+
+        for index, (image_data, filename) in enumerate(images):
+            timer = StageTimer({"queue": queue_ms})
+            try:
+                # Convert bytes to PIL Image and apply enhanced preprocessing
+                with timer.span("decode"):
+                    image = Image.open(io.BytesIO(image_data))
+                    image.load()
+                with timer.span("preprocess"):
+                    image_array, scaling_info = self._preprocess_image(image)
+                prepared.append((index, image_array, scaling_info, filename, image, timer))
+            except Exception as e:
+                results[index] = self._detection_error(filename, e)
+
+        for start in range(0, len(prepared), self.max_batch_size):
+            chunk = prepared[start:start + self.max_batch_size]
+            try:
+                # Clear GPU cache before inference
+                if self.device.startswith('cuda'):
+                    torch.cuda.empty_cache()
+
+                # Run optimized inference on the whole chunk
+                inference_started = time.perf_counter()
+                model_results = self._run_model([item[1] for item in chunk])
+                inference_ms = (time.perf_counter() - inference_started) * 1000 / len(chunk)
+            except Exception as e:
+                for index, _, _, filename, _, _ in chunk:
+                    results[index] = self._detection_error(filename, e)
+                continue
+
+            for (index, _, scaling_info, filename, image, timer), model_result in zip(chunk, model_results):
+                timer.add("inference", inference_ms)
+                try:
+                    with timer.span("postprocess"):
+                        raw = self._parse_boxes(model_result)
+                        coarse = [d for d in raw if d["confidence"] >= self.confidence_threshold]
+
+                        # Apply enhanced post-processing with coordinate transformation
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"BEFORE post-processing: {len(coarse)} detections found")
+                            for i, det in enumerate(coarse):
+                                logger.debug(f"  Detection {i}: {det['species']} (conf: {det['confidence']:.3f}) at {det['bounding_box']}")
+
+                        detections = self._postprocess_detections(coarse, scaling_info)
+                        raw_detections = None
+                        if self.raw_confidence_floor is not None:
+                            raw_detections = self._transform_coordinates_to_original(raw, scaling_info)
+                        tiles = 0
+                        if should_tile(tiling, image.size, coarse):
+                            detections, tiles = self._detect_tiled(image, detections, tiling, timer, raw_detections)
+                        result = self._build_detection_result(detections, filename, tiles, raw_detections)
+                    result["timings"] = timer.as_dict()
+                    result["processing_time"] = round(timer.total_ms / 1000, 4)
+                    results[index] = result
+                except Exception as e:
+                    results[index] = self._detection_error(filename, e)
+
+        # Memory cleanup
+        if self.device.startswith('cuda'):
+            torch.cuda.empty_cache()
+        gc.collect()
+
+        return results
+
+    def _run_model(self, image_arrays: List[np.ndarray]):
+        return self.model(
+            image_arrays,
+            conf=self.confidence_threshold if self.raw_confidence_floor is None else self.raw_confidence_floor,
+            device=self.device,
+            half=self.enable_half_precision and self.device.startswith('cuda'),
+            verbose=False  # Reduce logging noise
+        )
+
+    def _parse_boxes(self, result) -> List[Dict]:
+        """Detections of one model result, in the coordinates of the model input"""
+        detections = []
+
+        boxes = result.boxes
+        if boxes is not None:
+            for i, box in enumerate(boxes):
+                # Get bounding box coordinates
+                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+                confidence = float(box.conf[0].cpu().numpy())
+                class_id = int(box.cls[0].cpu().numpy())
+
+                # Get class name
+                class_name = self.model.names[class_id]
+
+                # Map to display name if available
+                display_name = self.species_display_names.get(class_name, class_name)
+
+                detection = {
+                    "id": i,
+                    "species": display_name,
+                    "confidence": confidence,
+                    "bounding_box": {
+                        "x": int(x1),
+                        "y": int(y1),
+                        "width": int(x2 - x1),
+                        "height": int(y2 - y1)
+                    }
+                }
+                detections.append(detection)
+
+        return detections
+
+    def _detect_tiled(
+        self, image: Image.Image, coarse_detections: List[Dict], tiling: Dict, timer: Optional[StageTimer] = None,
+        raw_detections: Optional[List[Dict]] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Sliced pass at native resolution: all tiles of the image go through the
+        model as one batch, tile boxes are shifted into image coordinates and
+        merged with the coarse detections by cross-tile NMS. Unfiltered tile
+        boxes are appended to ``raw_detections`` when given.
 
-            logger.info(f"AFTER post-processing: {len(detections)} detections remaining")
+        Returns:
+            Tuple of (merged detections in original image space, number of tiles)
+        """
+        image_array = self._enhance_contrast(to_rgb_array(image))
+        height, width = image_array.shape[:2]
+        grid = tile_grid(width, height, tiling["TILE_SIZE"], tiling["OVERLAP"], tiling["MAX_TILES"])
+
+        inference_started = time.perf_counter()
+        model_results = self._run_model(extract_tiles(image_array, grid))
+        if timer is not None:
+            # Counted as inference, not post-processing (the caller's span includes it)
+            inference_ms = (time.perf_counter() - inference_started) * 1000
+            timer.add("inference", inference_ms)
+            timer.add("postprocess", -inference_ms)
+
+        merged = list(coarse_detections)
+        for tile, model_result in zip(grid, model_results):
+            tile_raw = self._parse_boxes(model_result)
+            if raw_detections is not None:
+                raw_detections.extend(shift_detections(tile_raw, tile))
+            tile_detections = [d for d in tile_raw if d["confidence"] >= self.confidence_threshold]
+            merged.extend(shift_detections(tile_detections, tile))
+
+        merged = self._apply_nms(merged, iou_threshold=tiling["NMS_IOU"])
+        for i, detection in enumerate(merged):
+            detection["id"] = i
+
+        logger.info(f"Tiled pass: {len(grid)} tiles, {len(merged)} detections after cross-tile NMS")
+        return merged, len(grid)
+
+    def _build_detection_result(
+        self, detections: List[Dict], filename: str, tiles: int = 0, raw_detections: Optional[List[Dict]] = None
+    ) -> Dict:
+        """Summarize post-processed detections into the detect_birds() result dictionary"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"AFTER post-processing: {len(detections)} detections remaining")
             for i, det in enumerate(detections):
-                logger.info(f"  Detection {i}: {det['species']} (conf: {det['confidence']:.3f}) at {det['bounding_box']}")
-
-            # Recount egret detections after filtering
-            egret_detections = sum(1 for d in detections if d["species"] in self.species_display_names.values())
-
-            # Determine primary species (highest confidence egret detection)
-            primary_species = None
-            primary_confidence = 0.0
-
-            egret_detections_list = [d for d in detections if d["species"] in self.species_display_names.values()]
-            for detection in egret_detections_list:
-                if detection["confidence"] > primary_confidence:
-                    primary_species = detection["species"]
-                    primary_confidence = detection["confidence"]
-
-            # Memory cleanup
-            if self.device.startswith('cuda'):
-                torch.cuda.empty_cache()
-            gc.collect()
-
-            logger.info(f"Detection completed for {filename}: {len(detections)} total, {egret_detections} egrets")
-
-            return {
-                "success": True,
-                "detections": detections,
-                "total_detections": egret_detections,
-                "primary_species": primary_species,
-                "primary_confidence": primary_confidence,
-                "model_used": Path(self.model_path).name,
-                "device_used": self.device,
-                "processing_time": 0,  # Could measure if needed
-            }
+                logger.debug(f"  Detection {i}: {det['species']} (conf: {det['confidence']:.3f}) at {det['bounding_box']}")
 
-        except Exception as e:
-            logger.error(f"Detection failed for {filename}: {e}")
-            # Memory cleanup on error
-            if self.device.startswith('cuda'):
-                torch.cuda.empty_cache()
-            gc.collect()
-
-            return {
-                "success": False,
-                "error": str(e),
-                "detections": [],
-                "total_detections": 0,
-                "primary_species": None,
-                "primary_confidence": 0.0,
-                "model_used": "ERROR",
-                "device_used": self.device,
-            }
+        # Only count egret species for total_detections
+        egret_detections_list = [d for d in detections if d["species"] in self.species_display_names.values()]
+        egret_detections = len(egret_detections_list)
+
+        # Determine primary species (highest confidence egret detection)
+        primary_species = None
+        primary_confidence = 0.0
+        for detection in egret_detections_list:
+            if detection["confidence"] > primary_confidence:
+                primary_species = detection["species"]
+                primary_confidence = detection["confidence"]
+
+        logger.info(f"Detection completed for {filename}: {len(detections)} total, {egret_detections} egrets")
+
+        return {
+            "success": True,
+            "detections": detections,
+            "total_detections": egret_detections,
+            "primary_species": primary_species,
+            "primary_confidence": primary_confidence,
+            "model_used": Path(self.weights_path).name,
+            "device_used": self.device,
+            "processing_time": 0,  # Set with the stage timings by detect_birds_batch()
+            "timings": {},
+            "tiled": tiles > 0,
+            "tiles": tiles,
+            "confidence_threshold": self.confidence_threshold,
+            "nms_iou": self.nms_iou,
+            # Every box above the raw floor, before threshold and NMS (see rethreshold.py)
+            "raw_confidence_floor": self.raw_confidence_floor if raw_detections is not None else None,
+            "raw_detections": raw_detections or [],
+        }
+
+    def _detection_error(self, filename: str, error: Exception) -> Dict:
+        """detect_birds() result for an image that could not be processed"""
+        logger.error(f"Detection failed for {filename}: {error}")
+        return {
+            "success": False,
+            "error": str(error),
+            "detections": [],
+            "total_detections": 0,
+            "primary_species": None,
+            "primary_confidence": 0.0,
+            "model_used": "ERROR",
+            "device_used": self.device,
+        }
 
     def get_model_info(self) -> Dict:
         """Get information about the loaded model"""
@@ -562,6 +660,8 @@ class BirdDetectionService:
 
         return {
             "model_path": self.model_path,
+            "weights_path": self.weights_path,
+            "precision": self.precision,
             "device": self.device,
             "confidence_threshold": self.confidence_threshold,
             "class_names": self.species_display_names,
@@ -571,12 +671,17 @@ class BirdDetectionService:
 
 # Singleton instance
 _bird_detection_service = None
+_bird_detection_service_lock = threading.Lock()
 
 
 def get_bird_detection_service(model_path: Optional[str] = None) -> BirdDetectionService:
     """
     Get or create the bird detection service instance
 
+    Without ``model_path`` the model selected on the Model Management page is
+    used. A newly selected model is warmed in the background while the current
+    one keeps serving, then swapped in on the first request after it is ready.
+
     Args:
         model_path: Optional custom model path
 
@@ -585,10 +690,27 @@ def get_bird_detection_service(model_path: Optional[str] = None) -> BirdDetectio
     """
     global _bird_detection_service
 
-    if _bird_detection_service is None or (model_path and model_path != _bird_detection_service.model_path):
-        _bird_detection_service = BirdDetectionService(model_path)
+    with _bird_detection_service_lock:
+        service = _bird_detection_service
+        registry = get_model_registry()
+
+        if model_path is None:
+            selected = get_selected_model_path()
+            if service is None:
+                model_path = selected
+            elif selected and selected != service.model_path:
+                weights = runtime_model_path(selected, service.device)
+                if registry.is_loaded(weights, service.backend, service.device):
+                    model_path = selected
+                else:
+                    registry.activate(weights, service.backend, service.device, background=True)
+
+        if service is None or (model_path and model_path != service.model_path):
+            service = BirdDetectionService(model_path)
+            registry.activate(service.weights_path, service.backend, service.device, background=False)
+            _bird_detection_service = service
 
-    return _bird_detection_service
+        return service
 
 
 def reset_bird_detection_service():
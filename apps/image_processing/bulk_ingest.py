@@ -0,0 +1,262 @@
+"""
+Bulk ingest of many images (or ZIP archives of images) in one request
+
+After a survey a field team has hundreds of photos; uploading them one form
+post at a time makes HTTP round trips the bottleneck. ingest_files() takes
+every file of a request:
+
+- ZIP archives are read member by member from the uploaded (temporary) file,
+  so the archive is never held in memory
+- each image is copied to storage in chunks while its SHA-256 and size are
+  computed and its leading bytes are checked for a JPEG/PNG signature, so
+  nothing is read twice
+- the ImageUpload rows are created with one bulk_create and grouped into a
+  ProcessingBatch
+
+Rejected files (wrong type, too large, unreadable) are reported back instead
+of failing the whole request. enqueue_batch() runs Clarify for a batch in a
+background thread, or leaves it QUEUED for ``python manage.py
+process_batches`` when BULK_UPLOAD["PROCESS_IN_BACKGROUND"] is off.
+"""
+
+import hashlib
+import logging
+import threading
+import zipfile
+from pathlib import PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .detection_cache import difference_hash, get_detection_cache_config
+from .models import ImageUpload, ProcessingBatch, ProcessingStatus
+from .stage_counters import invalidate_stage_counts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BULK_UPLOAD_CONFIG = {
+    "MAX_FILES": 1000,  # images per request, archive members included
+    "MAX_FILE_SIZE": 50 * 1024 * 1024,
+    "CHUNK_SIZE": 1024 * 1024,
+    "PROCESS_IN_BACKGROUND": True,
+}
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+ARCHIVE_EXTENSIONS = (".zip",)
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n")
+
+
+class BulkUploadError(Exception):
+    """A file or archive member was rejected"""
+
+
+def get_bulk_upload_config() -> Dict:
+    config = dict(DEFAULT_BULK_UPLOAD_CONFIG)
+    config.update(getattr(settings, "BULK_UPLOAD", {}))
+    return config
+
+
+class _HashingReader:
+    """Read-through stream that hashes, counts and validates what storage copies"""
+
+    def __init__(self, stream, max_size: int):
+        self._stream = stream
+        self.max_size = max_size
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        if data and not self.size and not data.startswith(IMAGE_SIGNATURES):
+            raise BulkUploadError("not a JPEG or PNG image")
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise BulkUploadError(f"larger than {self.max_size // (1024 * 1024)}MB")
+        self.sha256.update(data)
+        return data
+
+
+class _ChunkedFile(File):
+    def chunks(self, chunk_size=None):
+        return super().chunks(chunk_size or get_bulk_upload_config()["CHUNK_SIZE"])
+
+
+def _is_image_name(name: str) -> bool:
+    return PurePosixPath(name).suffix.lower() in IMAGE_EXTENSIONS
+
+
+def _archive_members(uploaded_file) -> Iterator[Tuple[str, Optional[int], object]]:
+    """(name, declared size, opener) of the image members of a ZIP archive"""
+    with zipfile.ZipFile(uploaded_file) as archive:
+        for info in archive.infolist():
+            path = PurePosixPath(info.filename)
+            if info.is_dir() or "__MACOSX" in path.parts or path.name.startswith("."):
+                continue
+            yield path.name, info.file_size, lambda info=info: archive.open(info)
+
+
+def iter_images(files) -> Iterator[Tuple[str, Optional[int], object]]:
+    """
+    (name, declared size, opener) for every file in the upload, expanding ZIP
+    archives. Openers return a readable binary stream; archives that cannot
+    be read yield ``opener=None``.
+    """
+    for uploaded_file in files:
+        suffix = PurePosixPath(uploaded_file.name).suffix.lower()
+        if suffix in ARCHIVE_EXTENSIONS:
+            try:
+                yield from _archive_members(uploaded_file)
+            except zipfile.BadZipFile:
+                yield uploaded_file.name, None, None
+        else:
+            yield uploaded_file.name, uploaded_file.size, lambda f=uploaded_file: f.open("rb")
+
+
+def store_image(name: str, stream, max_size: int) -> Tuple[str, str, int]:
+    """
+    Copy an image stream to the ImageUpload storage location. Returns the
+    stored name, SHA-256 and size; nothing is left behind on rejection.
+    """
+    field = ImageUpload._meta.get_field("image_file")
+    storage = field.storage
+    target = storage.get_available_name(field.generate_filename(None, PurePosixPath(name).name))
+    reader = _HashingReader(stream, max_size)
+    try:
+        stored_name = storage.save(target, _ChunkedFile(reader, name=target))
+    except Exception:
+        if storage.exists(target):
+            storage.delete(target)
+        raise
+    if not reader.size:
+        storage.delete(stored_name)
+        raise BulkUploadError("empty file")
+    return stored_name, reader.sha256.hexdigest(), reader.size
+
+
+def _title(name: str, prefix: str) -> str:
+    stem = PurePosixPath(name).stem
+    return (f"{prefix} - {stem}" if prefix else stem)[:200]
+
+
+def ingest_files(files, user, site_hint: str = "", title_prefix: str = "",
+                 batch_name: str = "") -> Dict:
+    """
+    Store every image in ``files`` and create their ImageUpload rows and one
+    ProcessingBatch. Returns ``{"batch", "uploads", "rejected"}`` where
+    rejected is a list of (filename, reason); batch is None when nothing was
+    accepted.
+    """
+    config = get_bulk_upload_config()
+    perceptual = get_detection_cache_config()["PERCEPTUAL_HASH"]
+    uploads: List[ImageUpload] = []
+    rejected: List[Tuple[str, str]] = []
+
+    for name, size, opener in iter_images(files):
+        if opener is None:
+            rejected.append((name, "not a valid ZIP archive"))
+            continue
+        if not _is_image_name(name):
+            rejected.append((name, "not a JPG, JPEG or PNG file"))
+            continue
+        if len(uploads) >= config["MAX_FILES"]:
+            rejected.append((name, f"more than {config['MAX_FILES']} images in one upload"))
+            continue
+        if size is not None and size > config["MAX_FILE_SIZE"]:
+            rejected.append((name, f"larger than {config['MAX_FILE_SIZE'] // (1024 * 1024)}MB"))
+            continue
+        try:
+            with opener() as stream:
+                stored_name, sha256, file_size = store_image(name, stream, config["MAX_FILE_SIZE"])
+        except (BulkUploadError, zipfile.BadZipFile, OSError) as e:
+            rejected.append((name, str(e)))
+            continue
+
+        upload = ImageUpload(
+            title=_title(name, title_prefix),
+            image_file=stored_name,
+            uploaded_by=user,
+            file_size=file_size,
+            original_filename=PurePosixPath(name).name[:255],
+            content_sha256=sha256,
+            site_hint=site_hint,
+        )
+        if perceptual:
+            try:
+                with upload.image_file.open("rb") as f:
+                    upload.perceptual_hash = difference_hash(f)
+            except Exception as e:
+                logger.warning(f"Could not compute perceptual hash for {name}: {e}")
+        uploads.append(upload)
+
+    if not uploads:
+        return {"batch": None, "uploads": [], "rejected": rejected}
+
+    try:
+        with transaction.atomic():
+            ImageUpload.objects.bulk_create(uploads, batch_size=500)
+            batch = ProcessingBatch.objects.create(
+                name=batch_name or f"Bulk upload {timezone.localtime():%Y-%m-%d %H:%M}",
+                created_by=user,
+                total_images=len(uploads),
+            )
+            batch.images.add(*uploads)
+    except Exception:
+        for upload in uploads:
+            upload.image_file.storage.delete(upload.image_file.name)
+        raise
+
+    # bulk_create sends no post_save signals
+    invalidate_stage_counts()
+    logger.info(f"Bulk upload by {user}: {len(uploads)} image(s) in batch {batch.pk}, {len(rejected)} rejected")
+    return {"batch": batch, "uploads": uploads, "rejected": rejected}
+
+
+# Processing -------------------------------------------------------------------
+
+def process_batch(batch: ProcessingBatch) -> ProcessingBatch:
+    """Run Clarify for every captured image of a batch, keeping its counters current"""
+    from .views import process_image_with_ai
+
+    batch.start_processing()
+    processed = failed = 0
+    for image in batch.images.filter(upload_status=ProcessingStatus.CAPTURED).order_by("uploaded_at"):
+        try:
+            image.start_processing()
+            process_image_with_ai(image)
+            processed += 1
+        except Exception as e:
+            logger.error(f"Batch {batch.pk}: processing failed for {image.original_filename}: {e}")
+            failed += 1
+        ProcessingBatch.objects.filter(pk=batch.pk).update(processed_images=processed, failed_images=failed)
+
+    batch.processed_images, batch.failed_images = processed, failed
+    if failed and not processed:
+        batch.mark_failed()
+    else:
+        batch.complete_processing()
+    return batch
+
+
+def _process_in_background(batch_id) -> None:
+    try:
+        process_batch(ProcessingBatch.objects.get(pk=batch_id))
+    except Exception as e:
+        logger.error(f"Background processing of batch {batch_id} failed: {e}")
+    finally:
+        connection.close()
+
+
+def enqueue_batch(batch: ProcessingBatch) -> bool:
+    """
+    Queue a batch for detection. Returns True if processing started in the
+    background; otherwise the batch stays QUEUED for the process_batches command.
+    """
+    if not get_bulk_upload_config()["PROCESS_IN_BACKGROUND"]:
+        return False
+    transaction.on_commit(lambda: threading.Thread(
+        target=_process_in_background, args=(batch.pk,), name=f"batch-{batch.pk}", daemon=True
+    ).start())
+    return True
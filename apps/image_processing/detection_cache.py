@@ -0,0 +1,197 @@
+"""
+Content-hash detection result cache
+
+Field teams often upload the same photo twice (phone and laptop sync) or re-run
+Clarify after a failure. Detection output is stored in DetectionCacheEntry,
+keyed by:
+
+- SHA-256 of the image bytes (computed while the upload streams to disk, see
+  apps/common/utils/upload_hashing.py)
+- model identity (file name, size and modification time of the weights run,
+  so an INT8 variant gets its own entries)
+- confidence threshold
+- preprocessing version (bump PREPROCESSING_VERSION whenever preprocessing or
+  post-processing changes detections; the tiling mode is part of it)
+
+so Clarify reuses the detections of identical content instantly. With
+PERCEPTUAL_HASH enabled, uploads also get a 64-bit difference hash and
+near-duplicates (re-encoded or resized copies) are flagged at upload time.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+from apps.common.utils.upload_hashing import file_sha256
+
+from .models import DetectionCacheEntry, ImageUpload
+from .pipeline_timing import StageTimer
+from .tiling import get_tiling_config
+
+logger = logging.getLogger(__name__)
+
+PREPROCESSING_VERSION = "1"
+
+DEFAULT_DETECTION_CACHE_CONFIG = {
+    "ENABLED": True,
+    "PERCEPTUAL_HASH": False,
+    "NEAR_DUPLICATE_DISTANCE": 6,  # max differing bits of the 64-bit hash
+    "NEAR_DUPLICATE_SCAN_LIMIT": 5000,  # most recent hashed uploads compared
+}
+
+
+def get_detection_cache_config() -> Dict:
+    config = dict(DEFAULT_DETECTION_CACHE_CONFIG)
+    config.update(getattr(settings, "DETECTION_CACHE", {}))
+    return config
+
+
+def preprocessing_version() -> str:
+    return f"{PREPROCESSING_VERSION}:tiling={get_tiling_config()['MODE']}"
+
+
+def model_identity(model_path: Optional[str]) -> str:
+    """Identify a model file by name, size and modification time"""
+    if not model_path:
+        return "unknown"
+    try:
+        stat = os.stat(model_path)
+    except OSError:
+        return Path(model_path).name
+    return f"{Path(model_path).name}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def image_sha256(image_upload: ImageUpload) -> str:
+    """Content hash of an upload, computed (and stored) on first use for older rows"""
+    if not image_upload.content_sha256:
+        with image_upload.image_file.open("rb") as f:
+            image_upload.content_sha256 = file_sha256(f)
+        ImageUpload.objects.filter(pk=image_upload.pk).update(content_sha256=image_upload.content_sha256)
+    return image_upload.content_sha256
+
+
+def _cache_key(image_upload: ImageUpload, service) -> Dict:
+    return {
+        "content_sha256": image_sha256(image_upload),
+        "model_identity": model_identity(getattr(service, "weights_path", None) or getattr(service, "model_path", None)),
+        "confidence_threshold": float(getattr(service, "confidence_threshold", 0.0)),
+        "preprocessing_version": preprocessing_version(),
+    }
+
+
+def get_cached_detection(image_upload: ImageUpload, service) -> Optional[Dict]:
+    """Cached detect_birds() result for this content/model/threshold, or None"""
+    if not get_detection_cache_config()["ENABLED"]:
+        return None
+    entry = DetectionCacheEntry.objects.filter(**_cache_key(image_upload, service)).only("pk", "result").first()
+    if entry is None:
+        return None
+    DetectionCacheEntry.objects.filter(pk=entry.pk).update(hit_count=F("hit_count") + 1, last_hit_at=timezone.now())
+    result = dict(entry.result)
+    result["cache_hit"] = True
+    result["timings"] = {}  # Nothing was read, decoded or inferred this time
+    result["processing_time"] = 0
+    return result
+
+
+def store_detection(image_upload: ImageUpload, service, result: Dict) -> None:
+    """Remember a successful detection result"""
+    if not get_detection_cache_config()["ENABLED"] or not result.get("success"):
+        return
+    try:
+        with transaction.atomic():
+            DetectionCacheEntry.objects.create(
+                result=result,
+                perceptual_hash=image_upload.perceptual_hash,
+                **_cache_key(image_upload, service),
+            )
+    except IntegrityError:
+        pass  # Stored concurrently by another worker
+
+
+def detect_with_cache(image_upload: ImageUpload, service) -> Dict:
+    """detect_birds() for an upload, served from the cache when possible"""
+    cached = get_cached_detection(image_upload, service)
+    if cached is not None:
+        logger.info(f"Detection cache hit for {image_upload.original_filename}")
+        return cached
+
+    timer = StageTimer()
+    with timer.span("read"):
+        with image_upload.image_file.open("rb") as f:
+            image_data = f.read()
+    result = service.detect_birds(image_data, image_upload.original_filename)
+    store_detection(image_upload, service, {k: v for k, v in result.items() if k != "timings"})
+    timer.timings.update(result.get("timings") or {})
+    result["timings"] = timer.as_dict()
+    return result
+
+
+# Perceptual hashing ----------------------------------------------------------
+
+def difference_hash(file) -> str:
+    """64-bit dHash (hex) of an image file: robust to re-encoding and resizing"""
+    if hasattr(file, "seek"):
+        file.seek(0)
+    with Image.open(file) as image:
+        image.draft("L", (64, 64))  # Fast JPEG decode at reduced size
+        pixels = list(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming_distance(hash1: str, hash2: str) -> int:
+    return bin(int(hash1, 16) ^ int(hash2, 16)).count("1")
+
+
+def find_duplicates(image_upload: ImageUpload) -> Dict[str, List[ImageUpload]]:
+    """
+    Other uploads with identical content (``exact``) and, when perceptual
+    hashing is enabled, visually near-identical ones (``near``)
+    """
+    config = get_detection_cache_config()
+    others = ImageUpload.objects.exclude(pk=image_upload.pk)
+
+    exact = []
+    if image_upload.content_sha256:
+        exact = list(others.filter(content_sha256=image_upload.content_sha256).order_by("-uploaded_at")[:10])
+
+    near = []
+    if config["PERCEPTUAL_HASH"] and image_upload.perceptual_hash:
+        exact_ids = {u.pk for u in exact}
+        candidates = (
+            others.exclude(perceptual_hash="")
+            .order_by("-uploaded_at")
+            .values_list("pk", "perceptual_hash")[: config["NEAR_DUPLICATE_SCAN_LIMIT"]]
+        )
+        near_ids = [
+            pk for pk, phash in candidates
+            if pk not in exact_ids
+            and hamming_distance(phash, image_upload.perceptual_hash) <= config["NEAR_DUPLICATE_DISTANCE"]
+        ]
+        near = list(ImageUpload.objects.filter(pk__in=near_ids[:10]).order_by("-uploaded_at"))
+
+    return {"exact": exact, "near": near}
+
+
+def fingerprint_upload(image_upload: ImageUpload, uploaded_file) -> None:
+    """Set content (and optionally perceptual) hashes on an unsaved upload"""
+    image_upload.content_sha256 = file_sha256(uploaded_file)
+    if get_detection_cache_config()["PERCEPTUAL_HASH"]:
+        try:
+            image_upload.perceptual_hash = difference_hash(uploaded_file)
+        except Exception as e:
+            logger.warning(f"Could not compute perceptual hash for {uploaded_file.name}: {e}")
@@ -0,0 +1,138 @@
+"""
+Normalized detection rows
+
+Every detection of a ProcessingResult is stored as a Detection row (species,
+confidence, integer box), indexed on species and confidence, so questions like
+"all Chinese Egret detections above 0.6 in March" are plain SQL:
+
+    Detection.objects.filter(species="Chinese Egret", confidence__gte=0.6,
+                             is_raw=False, result__created_at__month=3)
+
+ProcessingResult.bounding_box and all_detections are still written for the
+templates and exports, but they are derived from the same detection list;
+allocation and the bounding box renderer read the table. Results stored
+before the table existed are converted by ``python manage.py
+backfill_detections``; until then readers fall back to the JSON lists.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+from django.db.models import Count, Exists, Min, OuterRef, Q
+
+from .models import Detection, ProcessingResult
+
+logger = logging.getLogger(__name__)
+
+
+def _box_ints(bounding_box) -> Dict[str, int]:
+    """x/y/width/height of a stored box (dict, or [x, y, width, height] list) as non-negative ints"""
+    if isinstance(bounding_box, dict):
+        values = [bounding_box.get(key, 0) for key in ("x", "y", "width", "height")]
+    elif isinstance(bounding_box, (list, tuple)) and len(bounding_box) == 4:
+        values = list(bounding_box)
+    else:
+        values = [0, 0, 0, 0]
+    try:
+        x, y, width, height = (max(0, int(round(float(v or 0)))) for v in values)
+    except (TypeError, ValueError):
+        x = y = width = height = 0
+    return {"x": x, "y": y, "width": width, "height": height}
+
+
+def detection_rows(result: ProcessingResult, detections: Iterable[Dict], raw: bool = False) -> List[Detection]:
+    """Unsaved Detection rows for detect_birds()-style detection dicts"""
+    return [
+        Detection(
+            result=result,
+            position=position,
+            species=str(detection.get("species") or "UNKNOWN")[:100],
+            confidence=float(detection.get("confidence") or 0.0),
+            is_raw=raw,
+            **_box_ints(detection.get("bounding_box")),
+        )
+        for position, detection in enumerate(detections)
+    ]
+
+
+def save_detections(result: ProcessingResult, detections: Iterable[Dict], raw: bool = False) -> List[Detection]:
+    """Replace the result's (raw or filtered) detection rows with one bulk insert"""
+    rows = detection_rows(result, detections, raw)
+    with transaction.atomic():
+        Detection.objects.filter(result=result, is_raw=raw).delete()
+        Detection.objects.bulk_create(rows)
+    return rows
+
+
+def json_detections(result: ProcessingResult) -> List[Dict]:
+    """
+    Detections from the legacy JSON fields: all_detections, or for the oldest
+    results one box per bounding_box entry labelled with detected_species.
+    Boxes are returned as x/y/width/height int dicts.
+    """
+    if result.all_detections:
+        return [
+            dict(detection, bounding_box=_box_ints(detection.get("bounding_box")))
+            for detection in result.all_detections
+        ]
+    if not result.total_detections or result.detected_species in ("UNKNOWN", "PROCESSING_ERROR"):
+        return []
+    boxes = result.bounding_box if isinstance(result.bounding_box, list) else [result.bounding_box]
+    return [
+        {"id": i, "species": result.detected_species, "confidence": float(result.confidence_score), "bounding_box": box}
+        for i, box in enumerate(_box_ints(box) for box in boxes)
+        if box["width"] and box["height"]
+    ]
+
+
+def result_detections(result: ProcessingResult) -> List[Dict]:
+    """Filtered detections of a result: from the table, or the JSON fields for results not yet backfilled"""
+    rows = [row for row in result.detections.all() if not row.is_raw]
+    if rows:
+        return [row.as_dict() for row in sorted(rows, key=lambda row: row.position)]
+    return json_detections(result)
+
+
+def species_counts_by_result(result_ids: Iterable) -> Dict:
+    """{result pk: {species: count}} of the filtered detections, in one grouped query"""
+    counts = {}
+    rows = (
+        Detection.objects.filter(result_id__in=list(result_ids), is_raw=False)
+        .values("result_id", "species")
+        .annotate(count=Count("id"), first=Min("position"))
+        .order_by("result_id", "first")
+    )
+    for row in rows:
+        counts.setdefault(row["result_id"], OrderedDict())[row["species"]] = row["count"]
+    return counts
+
+
+def results_missing_detections():
+    """Results with detections in their JSON fields but no filtered Detection rows"""
+    return (
+        ProcessingResult.objects.filter(Q(total_detections__gt=0) | ~Q(all_detections=[]))
+        .exclude(detected_species="PROCESSING_ERROR")
+        .annotate(has_rows=Exists(Detection.objects.filter(result=OuterRef("pk"), is_raw=False)))
+        .filter(has_rows=False)
+    )
+
+
+def backfill_detections(batch_size: int = 500) -> int:
+    """Create Detection rows from the JSON fields of older results; returns the rows created"""
+    created = 0
+    last_pk = None
+    pending = results_missing_detections().only(
+        "id", "all_detections", "bounding_box", "detected_species", "confidence_score", "total_detections"
+    ).order_by("pk")
+    while True:
+        batch = pending.filter(pk__gt=last_pk) if last_pk else pending
+        results = list(batch[:batch_size])
+        if not results:
+            return created
+        last_pk = results[-1].pk
+        rows = [row for result in results for row in detection_rows(result, json_detections(result))]
+        Detection.objects.bulk_create(rows, batch_size=batch_size)
+        created += len(rows)
+        logger.info(f"Backfilled {created} detection rows")
@@ -36,6 +36,54 @@ class ImageUploadForm(forms.ModelForm):
         self.fields["site_hint"].help_text = "This helps with the Engage stage when allocating to census data"
 
 
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class BulkUploadForm(forms.Form):
+    """
+    CAPTURE Stage: Form for uploading many images or ZIP archives at once
+    (the files themselves are read from request.FILES.getlist("files"))
+    """
+    files = forms.FileField(
+        required=False,
+        widget=MultipleFileInput(attrs={
+            "class": "form-control",
+            "accept": "image/jpeg,image/jpg,image/png,.zip,application/zip"
+        }),
+    )
+    title_prefix = forms.CharField(
+        max_length=100,
+        required=False,
+        widget=forms.TextInput(attrs={
+            "class": "form-control",
+            "placeholder": "Optional: prefix for the image titles (file names are used otherwise)"
+        }),
+    )
+    site_hint = forms.CharField(
+        max_length=200,
+        required=False,
+        widget=forms.TextInput(attrs={
+            "class": "form-control",
+            "placeholder": "Optional: Site location for easier allocation"
+        }),
+    )
+    batch_name = forms.CharField(
+        max_length=200,
+        required=False,
+        widget=forms.TextInput(attrs={
+            "class": "form-control",
+            "placeholder": "Optional: name of the processing batch"
+        }),
+    )
+    process_now = forms.BooleanField(
+        required=False,
+        initial=True,
+        widget=forms.CheckboxInput(attrs={"class": "form-check-input"}),
+        help_text="Queue the images for AI detection right away",
+    )
+
+
 class ProcessingResultReviewForm(forms.ModelForm):
     """
     REFLECT Stage: Form for reviewing AI results
@@ -99,6 +147,17 @@ class ProcessingResultOverrideForm(forms.Form):
     )
 
 
+class BulkOverrideForm(ProcessingResultOverrideForm):
+    """
+    REFLECT Stage: Form for overriding many AI results at once
+    (without a count each result keeps its AI count)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["new_count"].required = False
+
+
 class CensusAllocationForm(forms.Form):
     """
     ENGAGE Stage: Form for allocating results to census data
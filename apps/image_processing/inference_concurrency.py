@@ -0,0 +1,244 @@
+"""
+Inference concurrency: core partitioning, thread limits and admission control
+
+Every process that holds a detection model (a web worker without the
+inference daemon, or the daemon itself) is a replica. Left alone, PyTorch and
+OpenCV each size their thread pools to all cores in every replica, so a few
+concurrent Clarify requests oversubscribe the CPU and latency collapses.
+
+- plan_concurrency() splits the available cores between REPLICAS processes:
+  each gets THREADS_PER_REPLICA intra-op threads (cores // replicas by
+  default), one inter-op thread and OPENCV_THREADS OpenCV threads
+- configure_inference_threads() applies the plan once per process before the
+  model is loaded (called by BirdDetectionService)
+- InferenceAdmission is a bounded semaphore in front of the model: at most
+  SLOTS inferences run at a time per replica (one model instance is not
+  thread-safe), up to MAX_QUEUE more wait for up to QUEUE_TIMEOUT seconds and
+  anything beyond that is rejected instead of piling up. Queue wait and
+  utilization are exposed by stats()
+
+``python manage.py benchmark_concurrency`` measures the throughput of
+different replica x thread splits on this host.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INFERENCE_CONCURRENCY_CONFIG = {
+    "CPU_CORES": None,  # defaults to the cores this process may run on
+    "REPLICAS": None,  # model-holding processes on the host; defaults to WEB_CONCURRENCY or 1
+    "THREADS_PER_REPLICA": None,  # defaults to CPU_CORES // REPLICAS
+    "INTEROP_THREADS": 1,
+    "OPENCV_THREADS": 1,  # OpenCV only does colour conversions here
+    "SLOTS": 1,  # concurrent inferences per replica
+    "MAX_QUEUE": 32,
+    "QUEUE_TIMEOUT": 60.0,  # seconds a request may wait for a slot
+}
+
+
+class InferenceQueueFull(Exception):
+    """The inference queue is full or the wait for a slot timed out"""
+
+
+class ConcurrencyPlan(NamedTuple):
+    cores: int
+    replicas: int
+    threads_per_replica: int
+    interop_threads: int
+    opencv_threads: int
+
+    def as_dict(self) -> Dict:
+        return self._asdict()
+
+
+def get_concurrency_config() -> Dict:
+    config = dict(DEFAULT_INFERENCE_CONCURRENCY_CONFIG)
+    config.update(getattr(settings, "INFERENCE_CONCURRENCY", {}))
+    return config
+
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity / cpuset aware where supported)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def plan_concurrency(cores: Optional[int] = None, replicas: Optional[int] = None,
+                     threads: Optional[int] = None, config: Optional[Dict] = None) -> ConcurrencyPlan:
+    """Split ``cores`` between model replicas so replicas x threads never exceeds the cores"""
+    config = config or get_concurrency_config()
+    cores = max(1, int(cores or config["CPU_CORES"] or available_cores()))
+    replicas = replicas or config["REPLICAS"]
+    threads = threads or config["THREADS_PER_REPLICA"]
+
+    if not replicas:
+        replicas = cores // threads if threads else int(os.environ.get("WEB_CONCURRENCY", 0) or 1)
+    replicas = max(1, int(replicas))
+    if replicas > cores:
+        logger.warning(f"{replicas} inference replicas on {cores} cores; each gets a single thread")
+    threads = max(1, min(int(threads or cores // replicas), max(1, cores // replicas)))
+
+    return ConcurrencyPlan(
+        cores=cores,
+        replicas=replicas,
+        threads_per_replica=threads,
+        interop_threads=max(1, int(config["INTEROP_THREADS"])),
+        opencv_threads=max(0, int(config["OPENCV_THREADS"])),
+    )
+
+
+_configured_plan = None
+_configure_lock = threading.Lock()
+
+
+def apply_thread_limits(threads: int, interop_threads: int = 1, opencv_threads: int = 1):
+    """Set PyTorch and OpenCV thread pools of this process"""
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Only settable before the first parallel work in the process
+        logger.debug("PyTorch inter-op threads already initialised; keeping the current value")
+    try:
+        import cv2
+
+        cv2.setNumThreads(opencv_threads)
+    except ImportError:
+        pass
+
+
+def configure_inference_threads(plan: Optional[ConcurrencyPlan] = None) -> ConcurrencyPlan:
+    """Apply the concurrency plan to this process (once; later calls return it)"""
+    global _configured_plan
+    with _configure_lock:
+        if _configured_plan is None:
+            plan = plan or plan_concurrency()
+            apply_thread_limits(plan.threads_per_replica, plan.interop_threads, plan.opencv_threads)
+            logger.info(
+                f"Inference threads: {plan.threads_per_replica} intra-op, {plan.interop_threads} inter-op, "
+                f"{plan.opencv_threads} OpenCV ({plan.replicas} replica(s) on {plan.cores} cores)"
+            )
+            _configured_plan = plan
+        return _configured_plan
+
+
+def get_configured_plan() -> Optional[ConcurrencyPlan]:
+    return _configured_plan
+
+
+class InferenceAdmission:
+    """Bounded semaphore with a bounded wait queue and wait/utilization stats"""
+
+    def __init__(self, slots: int = 1, max_queue: int = 32, timeout: float = 60.0):
+        self.slots = max(1, int(slots))
+        self.max_queue = max(0, int(max_queue))
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)
+        self._started = time.monotonic()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.busy_seconds = 0.0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def slot(self):
+        """Hold an inference slot; yields the time spent waiting for it (ms)"""
+        with self._lock:
+            if self.in_flight >= self.slots and self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue is full ({self.waiting} waiting)")
+            self.waiting += 1
+
+        requested = time.monotonic()
+        acquired = self._semaphore.acquire(timeout=self.timeout)
+        admitted = time.monotonic()
+        wait = admitted - requested
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.timeouts += 1
+            else:
+                self.in_flight += 1
+                self.admitted += 1
+                self._waits.append(wait)
+                self.total_wait_seconds += wait
+                self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        if not acquired:
+            raise InferenceQueueFull(f"No inference slot free after {self.timeout:.0f}s")
+
+        try:
+            yield wait * 1000
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.busy_seconds += time.monotonic() - admitted
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        from .benchmarking import percentile
+
+        with self._lock:
+            waits = list(self._waits)
+            uptime = max(time.monotonic() - self._started, 1e-9)
+            busy = self.busy_seconds
+            stats = {
+                "slots": self.slots,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+                "mean_wait_ms": round(self.total_wait_seconds * 1000 / self.admitted, 3) if self.admitted else None,
+            }
+        stats.update({
+            "p50_wait_ms": round(percentile(waits, 50) * 1000, 3) if waits else None,
+            "p95_wait_ms": round(percentile(waits, 95) * 1000, 3) if waits else None,
+            # Share of slot time spent running inference since the process started
+            "utilization": round(min(1.0, busy / (self.slots * uptime)), 4),
+            "uptime_seconds": round(uptime, 1),
+        })
+        plan = get_configured_plan()
+        if plan is not None:
+            stats["plan"] = plan.as_dict()
+        return stats
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_inference_admission() -> InferenceAdmission:
+    """Process-wide admission control (created on first use)"""
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            config = get_concurrency_config()
+            _admission = InferenceAdmission(config["SLOTS"], config["MAX_QUEUE"], config["QUEUE_TIMEOUT"])
+        return _admission
+
+
+def reset_inference_admission():
+    """Drop the admission state (useful for testing)"""
+    global _admission
+    with _admission_lock:
+        _admission = None
@@ -0,0 +1,420 @@
+"""
+Shared out-of-process inference daemon
+
+Without the daemon every web worker that reaches the Clarify stage loads and
+warms its own YOLO model (get_bird_detection_service() is a per-process
+singleton), multiplying RAM by the worker count. The daemon, started with
+``manage.py run_inference_daemon``, owns the model instead:
+
+- Web workers send images over a local Unix socket (InferenceClient)
+- Requests from all workers are queued and micro-batched: the batcher waits up
+  to MAX_BATCH_WAIT_MS for up to MAX_BATCH_SIZE images and runs them through
+  BirdDetectionService.detect_birds_batch() in one model call
+- Each client gets back exactly what detect_birds() would have returned
+
+get_detection_service() returns the daemon client when the daemon is enabled
+and reachable, and the in-process service otherwise (development, Windows
+hosts without AF_UNIX, or the daemon being down with FALLBACK_IN_PROCESS).
+
+Wire format (both directions): a 4-byte big-endian header length, a 4-byte
+big-endian payload length, a JSON header and the raw payload bytes.
+
+This module must not import torch/ultralytics at import time: web workers
+using the daemon never load the model stack.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .inference_concurrency import get_inference_admission
+from .model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INFERENCE_DAEMON_CONFIG = {
+    "ENABLED": False,
+    "SOCKET_PATH": None,
+    "MAX_BATCH_SIZE": 8,
+    "MAX_BATCH_WAIT_MS": 10,
+    "TIMEOUT": 120.0,  # seconds a client waits for its result
+    "FALLBACK_IN_PROCESS": True,
+}
+
+_FRAME_HEADER = struct.Struct("!II")
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class InferenceDaemonUnavailable(Exception):
+    """The daemon could not be reached or did not answer"""
+
+
+def _failed_result(error, device: str = "unknown") -> Dict:
+    """detect_birds()-shaped result for a request the daemon could not serve"""
+    return {
+        "success": False,
+        "error": str(error),
+        "detections": [],
+        "total_detections": 0,
+        "primary_species": None,
+        "primary_confidence": 0.0,
+        "model_used": "ERROR",
+        "device_used": device,
+    }
+
+
+def get_daemon_config() -> Dict:
+    config = dict(DEFAULT_INFERENCE_DAEMON_CONFIG)
+    config.update(getattr(settings, "INFERENCE_DAEMON", {}))
+    if not config["SOCKET_PATH"]:
+        config["SOCKET_PATH"] = str(Path(settings.BASE_DIR) / "temp" / "inference.sock")
+    return config
+
+
+def send_frame(sock: socket.socket, header: Dict, payload: bytes = b"") -> None:
+    header_bytes = json.dumps(header).encode("utf-8")
+    sock.sendall(_FRAME_HEADER.pack(len(header_bytes), len(payload)) + header_bytes + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Connection closed mid-frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[Dict, bytes]]:
+    """Read one frame; returns None when the peer closed the connection cleanly"""
+    first = sock.recv(1)
+    if not first:
+        return None
+    header_size, payload_size = _FRAME_HEADER.unpack(first + _recv_exactly(sock, _FRAME_HEADER.size - 1))
+    if header_size + payload_size > MAX_FRAME_SIZE:
+        raise ConnectionError(f"Frame of {header_size + payload_size} bytes exceeds the {MAX_FRAME_SIZE} byte limit")
+    header = json.loads(_recv_exactly(sock, header_size).decode("utf-8"))
+    payload = _recv_exactly(sock, payload_size) if payload_size else b""
+    return header, payload
+
+
+class _PendingRequest:
+    __slots__ = ("image_data", "filename", "result", "done")
+
+    def __init__(self, image_data: bytes, filename: str):
+        self.image_data = image_data
+        self.filename = filename
+        self.result = None
+        self.done = threading.Event()
+
+
+def _resolve_service(service):
+    # A callable provider (e.g. get_bird_detection_service) is resolved per
+    # batch so the daemon follows model hot-swaps
+    return service() if callable(service) else service
+
+
+class MicroBatcher:
+    """
+    Collect requests from many connections and run them through the service in
+    batches. ``service`` needs detect_birds_batch([(bytes, filename), ...]), or
+    is a callable returning such a service.
+    """
+
+    def __init__(self, service, max_batch_size: int = 8, max_batch_wait_ms: float = 10):
+        self.service = service
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_wait = max(0.0, max_batch_wait_ms / 1000.0)
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.batches = 0
+        self.images = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._queue.put(None)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def submit(self, image_data: bytes, filename: str, timeout: Optional[float] = None) -> Dict:
+        request = _PendingRequest(image_data, filename)
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError(f"Inference for {filename} timed out")
+        return request.result
+
+    def _next_batch(self) -> List[_PendingRequest]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.max_batch_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._stopped.set()
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            service = None
+            try:
+                service = _resolve_service(self.service)
+                results = service.detect_birds_batch([(r.image_data, r.filename) for r in batch])
+            except Exception as e:
+                logger.error(f"Inference batch of {len(batch)} failed: {e}")
+                results = [_failed_result(e, getattr(service, "device", "unknown")) for _ in batch]
+            self.batches += 1
+            self.images += len(batch)
+            for request, result in zip(batch, results):
+                request.result = result
+                request.done.set()
+
+
+class _InferenceRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        daemon = self.server.inference_daemon
+        while True:
+            try:
+                frame = recv_frame(self.request)
+            except (ConnectionError, ValueError, OSError) as e:
+                logger.warning(f"Dropping inference connection: {e}")
+                return
+            if frame is None:
+                return
+
+            header, payload = frame
+            op = header.get("op")
+            if op == "detect":
+                try:
+                    result = daemon.batcher.submit(payload, header.get("filename", "unknown"), daemon.timeout)
+                except TimeoutError as e:
+                    result = _failed_result(e)
+                send_frame(self.request, {"ok": True, "result": result})
+            elif op == "info":
+                send_frame(self.request, {"ok": True, "result": daemon.info()})
+            else:
+                send_frame(self.request, {"ok": False, "error": f"Unknown operation: {op}"})
+
+
+class _UnixInferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class InferenceDaemon:
+    """Serve a detection service over a Unix socket with micro-batching"""
+
+    def __init__(self, service, socket_path: str, max_batch_size: int = 8,
+                 max_batch_wait_ms: float = 10, timeout: float = 120.0):
+        if not hasattr(socket, "AF_UNIX"):
+            raise InferenceDaemonUnavailable("Unix domain sockets are not supported on this platform")
+        self.service = service
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self.batcher = MicroBatcher(service, max_batch_size, max_batch_wait_ms)
+        self.started_at = None
+        self._server = None
+
+    def info(self) -> Dict:
+        service = _resolve_service(self.service)
+        model_info = service.get_model_info() if hasattr(service, "get_model_info") else {}
+        return {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "batches": self.batcher.batches,
+            "images": self.batcher.images,
+            "max_batch_size": self.batcher.max_batch_size,
+            "model": model_info,
+            "registry": get_model_registry().stats(),
+            "admission": get_inference_admission().stats(),
+        }
+
+    def start(self):
+        """Bind the socket and start serving in background threads"""
+        socket_path = Path(self.socket_path)
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if socket_path.exists():
+            # Refuse to steal the socket of a daemon that is still running
+            if InferenceClient(self.socket_path, timeout=1).ping():
+                raise InferenceDaemonUnavailable(f"Another inference daemon is already serving {self.socket_path}")
+            socket_path.unlink()
+
+        self._server = _UnixInferenceServer(self.socket_path, _InferenceRequestHandler)
+        self._server.inference_daemon = self
+        os.chmod(self.socket_path, 0o660)
+        self.batcher.start()
+        self.started_at = time.time()
+        threading.Thread(target=self._server.serve_forever, name="inference-server", daemon=True).start()
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.batcher.stop()
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+
+class InferenceClient:
+    """
+    Client side of the daemon with the BirdDetectionService detect_birds()
+    contract. Connections are per call, so the client is safe to share
+    between threads and survives daemon restarts.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 120.0):
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._info = None
+
+    def _request(self, header: Dict, payload: bytes = b"", timeout: Optional[float] = None) -> Dict:
+        if not hasattr(socket, "AF_UNIX"):
+            raise InferenceDaemonUnavailable("Unix domain sockets are not supported on this platform")
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout or self.timeout)
+                sock.connect(self.socket_path)
+                send_frame(sock, header, payload)
+                frame = recv_frame(sock)
+        except (OSError, ConnectionError, ValueError) as e:
+            raise InferenceDaemonUnavailable(f"Inference daemon at {self.socket_path} unavailable: {e}")
+        if frame is None:
+            raise InferenceDaemonUnavailable("Inference daemon closed the connection")
+        response, _ = frame
+        if not response.get("ok"):
+            raise InferenceDaemonUnavailable(response.get("error", "Inference daemon error"))
+        return response["result"]
+
+    def ping(self) -> bool:
+        try:
+            self._info = self._request({"op": "info"}, timeout=min(self.timeout, 2.0))
+            return True
+        except InferenceDaemonUnavailable:
+            return False
+
+    def is_available(self) -> bool:
+        return self.ping()
+
+    @property
+    def model_path(self) -> Optional[str]:
+        if self._info is None:
+            self.ping()
+        return ((self._info or {}).get("model") or {}).get("model_path")
+
+    @property
+    def weights_path(self) -> Optional[str]:
+        if self._info is None:
+            self.ping()
+        return ((self._info or {}).get("model") or {}).get("weights_path")
+
+    @property
+    def confidence_threshold(self) -> Optional[float]:
+        if self._info is None:
+            self.ping()
+        return ((self._info or {}).get("model") or {}).get("confidence_threshold")
+
+    def detect_birds(self, image_data: bytes, filename: str = "unknown") -> Dict:
+        return self._request({"op": "detect", "filename": filename}, image_data)
+
+    def get_model_info(self) -> Dict:
+        return self._request({"op": "info"}).get("model", {})
+
+    def get_registry_stats(self) -> List[Dict]:
+        return self._request({"op": "info"}).get("registry", [])
+
+    def get_admission_stats(self) -> Dict:
+        return self._request({"op": "info"}).get("admission", {})
+
+
+class FallbackDetectionService:
+    """
+    Daemon client that transparently falls back to the in-process service
+    when the daemon goes away between calls
+    """
+
+    def __init__(self, client: InferenceClient):
+        self.client = client
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def detect_birds(self, image_data: bytes, filename: str = "unknown") -> Dict:
+        try:
+            return self.client.detect_birds(image_data, filename)
+        except InferenceDaemonUnavailable as e:
+            logger.warning(f"{e}; running detection in process")
+            from .bird_detection_service import get_bird_detection_service
+
+            return get_bird_detection_service().detect_birds(image_data, filename)
+
+
+def get_detection_service():
+    """
+    Detection backend for web requests: the shared daemon when it is enabled
+    and reachable, otherwise the in-process BirdDetectionService singleton
+    """
+    config = get_daemon_config()
+    if config["ENABLED"]:
+        client = InferenceClient(config["SOCKET_PATH"], timeout=config["TIMEOUT"])
+        if client.ping():
+            return FallbackDetectionService(client) if config["FALLBACK_IN_PROCESS"] else client
+        if not config["FALLBACK_IN_PROCESS"]:
+            raise InferenceDaemonUnavailable(f"Inference daemon at {config['SOCKET_PATH']} is not running")
+        logger.warning(f"Inference daemon at {config['SOCKET_PATH']} is not running; loading the model in process")
+
+    from .bird_detection_service import get_bird_detection_service
+
+    return get_bird_detection_service()
+
+
+def get_admission_stats() -> Dict:
+    """
+    Inference queue wait and utilization of the process running the model:
+    the daemon when it is enabled and reachable, otherwise this worker
+    """
+    config = get_daemon_config()
+    if config["ENABLED"]:
+        try:
+            stats = InferenceClient(config["SOCKET_PATH"], timeout=2).get_admission_stats()
+            return dict(stats, source="inference daemon")
+        except InferenceDaemonUnavailable:
+            pass
+    return dict(get_inference_admission().stats(), source="this worker")
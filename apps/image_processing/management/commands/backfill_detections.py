@@ -0,0 +1,28 @@
+"""
+Management command to fill the Detection table from older results.
+
+Results processed before detections were normalized only have the JSON
+fields (all_detections / bounding_box). This creates their Detection rows
+in batches with bulk_create; it is safe to re-run and only touches results
+that have no rows yet.
+
+    python manage.py backfill_detections
+    python manage.py backfill_detections --batch-size 2000
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.image_processing.detections import backfill_detections, results_missing_detections
+
+
+class Command(BaseCommand):
+    help = 'Create Detection rows from the JSON detection lists of existing processing results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Results converted per batch')
+
+    def handle(self, *args, **options):
+        pending = results_missing_detections().count()
+        self.stdout.write(f"{pending} result(s) without detection rows")
+        created = backfill_detections(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Created {created} detection row(s)"))
@@ -0,0 +1,84 @@
+"""
+Management command to benchmark replica x thread splits for CPU inference.
+
+Runs the model in N processes with T PyTorch threads each, side by side, for
+every split (1 x cores, 2 x cores/2, ... by default) and prints the aggregate
+throughput and per-image latency. Use the best split for
+INFERENCE_CONCURRENCY["REPLICAS"] / ["THREADS_PER_REPLICA"] (and the number
+of web workers or the daemon's --threads).
+
+    python manage.py benchmark_concurrency
+    python manage.py benchmark_concurrency --splits 1x8,2x4,4x2,8x1
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.benchmarking import (
+    benchmark_concurrency_split,
+    default_splits,
+    discover_models,
+    get_benchmark_config,
+    load_fixtures,
+    model_entry,
+)
+from apps.image_processing.inference_concurrency import available_cores
+
+
+class Command(BaseCommand):
+    help = 'Benchmark inference throughput for different replica x thread splits of the CPU cores'
+
+    def add_arguments(self, parser):
+        config = get_benchmark_config()
+        parser.add_argument('--model', default=None, help='Model file (defaults to the first discovered model)')
+        parser.add_argument('--fixtures', default=config['FIXTURE_DIR'], help='Directory of fixture images')
+        parser.add_argument('--cores', type=int, default=None, help='Cores to split (defaults to all available)')
+        parser.add_argument('--splits', default=None,
+                            help='Comma separated REPLICASxTHREADS splits, e.g. 1x8,2x4,4x2')
+        parser.add_argument('--images', type=int, default=32, help='Images per replica and split')
+        parser.add_argument('--device', default='cpu', help='Inference device')
+
+    def handle(self, *args, **options):
+        config = get_benchmark_config()
+        cores = options['cores'] or available_cores()
+        try:
+            splits = [
+                tuple(int(n) for n in split.lower().split('x'))
+                for split in options['splits'].split(',') if split.strip()
+            ] if options['splits'] else default_splits(cores)
+            entry = model_entry(options['model']) if options['model'] else next(iter(discover_models()), None)
+        except ValueError as e:
+            raise CommandError(f'Invalid option: {e}')
+        if entry is None:
+            raise CommandError('No model files (.pt/.onnx) found to benchmark')
+        if not load_fixtures(options['fixtures'], config['IMAGE_SIZE'], 1):
+            raise CommandError(f"No fixture images found in {options['fixtures']}")
+
+        self.stdout.write(f"Benchmarking {entry['name']} ({entry['backend']}) on {cores} core(s)")
+        self.stdout.write(f"{'replicas':>8} {'threads':>8} {'img/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+
+        results = []
+        for replicas, threads in splits:
+            try:
+                result = benchmark_concurrency_split(
+                    entry['path'], entry['backend'], replicas, threads, options['fixtures'],
+                    images=options['images'], device=options['device'],
+                    image_size=config['IMAGE_SIZE'], limit=config['MAX_FIXTURES'],
+                )
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{replicas:>8} {threads:>8}   failed: {e}"))
+                continue
+            results.append(result)
+            self.stdout.write(
+                f"{replicas:>8} {threads:>8} {result['images_per_second']:>10.1f} "
+                f"{result['latency_p50_ms']:>10.1f} {result['latency_p95_ms']:>10.1f}"
+            )
+
+        if not results:
+            raise CommandError('Every split failed')
+        best = max(results, key=lambda r: r['images_per_second'] or 0)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Best throughput: {best['replicas']} replica(s) x {best['threads']} thread(s) "
+                f"({best['images_per_second']:.1f} img/s)"
+            )
+        )
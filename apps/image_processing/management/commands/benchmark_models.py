@@ -0,0 +1,129 @@
+"""
+Management command to benchmark the available detection models.
+
+Every model file (PyTorch .pt and ONNX .onnx) found under models/ and
+egret_500_model/weights, or given with --model, is run over the local fixture
+images (BIRD_MODEL_BENCHMARK["FIXTURE_DIR"]). Each model is measured in its own
+Python process so cold-load time and peak memory are not skewed by models
+loaded before it. Results are stored as ModelBenchmarkRun rows and shown on
+the Model Benchmarking page.
+
+    python manage.py benchmark_models
+    python manage.py benchmark_models --model models/chinese_egret_v1/chinese_egret_best.onnx
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.benchmarking import (
+    benchmark_model,
+    discover_models,
+    get_benchmark_config,
+    load_fixtures,
+    model_entry,
+    parse_worker_output,
+    save_benchmark_run,
+    save_failed_run,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark detection models (cold load, latency percentiles, throughput, peak memory)'
+
+    def add_arguments(self, parser):
+        config = get_benchmark_config()
+        parser.add_argument('--model', action='append', default=[],
+                            help='Model file to benchmark (repeatable; defaults to every discovered model)')
+        parser.add_argument('--fixtures', default=config['FIXTURE_DIR'], help='Directory of fixture images')
+        parser.add_argument('--device', default='cpu', help='Inference device (cpu, cuda:0, mps)')
+        parser.add_argument('--batch-sizes', default=','.join(str(b) for b in config['BATCH_SIZES']),
+                            help='Comma separated batch sizes for the throughput runs')
+        parser.add_argument('--iterations', type=int, default=config['WARM_ITERATIONS'],
+                            help='Single-image calls for the latency percentiles')
+        parser.add_argument('--throughput-images', type=int, default=config['THROUGHPUT_IMAGES'],
+                            help='Images pushed through the model per batch size')
+        parser.add_argument('--in-process', action='store_true',
+                            help='Run every model in this process (cold load and memory numbers are then skewed)')
+        parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        config = get_benchmark_config()
+        try:
+            batch_sizes = [int(b) for b in options['batch_sizes'].split(',') if b.strip()]
+        except ValueError:
+            raise CommandError('--batch-sizes must be a comma separated list of integers')
+
+        if options['worker']:
+            # Child process: measure one model and print the result as JSON
+            fixtures = load_fixtures(options['fixtures'], config['IMAGE_SIZE'], config['MAX_FIXTURES'])
+            entry = model_entry(options['worker'])
+            result = benchmark_model(
+                entry['path'], entry['backend'], fixtures, options['device'], batch_sizes,
+                options['iterations'], options['throughput_images'],
+            )
+            self.stdout.write(json.dumps(result))
+            return
+
+        try:
+            models = [model_entry(path) for path in options['model']] or discover_models()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not models:
+            raise CommandError('No model files (.pt/.onnx) found to benchmark')
+
+        fixtures = load_fixtures(options['fixtures'], config['IMAGE_SIZE'], config['MAX_FIXTURES'])
+        if not fixtures:
+            raise CommandError(f"No fixture images found in {options['fixtures']}")
+        self.stdout.write(f"Benchmarking {len(models)} model(s) on {len(fixtures)} fixture image(s)...")
+
+        for entry in models:
+            label = f"{entry['name']} ({entry['backend']}, {Path(entry['path']).name})"
+            self.stdout.write(f"  {label}...")
+            try:
+                if options['in_process']:
+                    result = benchmark_model(
+                        entry['path'], entry['backend'], fixtures, options['device'], batch_sizes,
+                        options['iterations'], options['throughput_images'],
+                    )
+                else:
+                    result = self._run_worker(entry, options)
+            except Exception as e:
+                save_failed_run(entry, options['device'], str(e))
+                self.stdout.write(self.style.ERROR(f"    failed: {e}"))
+                continue
+
+            run = save_benchmark_run(entry['name'], result)
+            throughput = ', '.join(f"b{size}: {ips} img/s" for size, ips in run.throughput_by_batch)
+            rss = f"{run.peak_rss_bytes / 1024 ** 2:.0f}MB" if run.peak_rss_bytes else 'n/a'
+            self.stdout.write(
+                f"    cold load {run.cold_load_seconds:.2f}s, p50/p95/p99 "
+                f"{run.latency_p50_ms:.1f}/{run.latency_p95_ms:.1f}/{run.latency_p99_ms:.1f}ms, "
+                f"{throughput}, peak RSS {rss}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark results saved; see Image Processing > Model Benchmarking'))
+
+    def _run_worker(self, entry, options):
+        """Benchmark one model in a fresh Python process"""
+        command = [
+            sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'benchmark_models',
+            '--worker', entry['path'],
+            '--fixtures', options['fixtures'],
+            '--device', options['device'],
+            '--batch-sizes', options['batch_sizes'],
+            '--iterations', str(options['iterations']),
+            '--throughput-images', str(options['throughput_images']),
+        ]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            raise RuntimeError(error[-1] if error else f'worker exited with {completed.returncode}')
+        result = parse_worker_output(completed.stdout)
+        result['model_path'] = entry['path']
+        return result
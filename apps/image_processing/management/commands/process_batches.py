@@ -0,0 +1,42 @@
+"""
+Management command to run Clarify for queued processing batches.
+
+Bulk uploads are grouped into a ProcessingBatch. With
+BULK_UPLOAD["PROCESS_IN_BACKGROUND"] off (or after a restart interrupted a
+background run) the batches stay QUEUED; run this from cron or by hand to
+process them in one place.
+
+    python manage.py process_batches
+    python manage.py process_batches --batch <uuid>
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.bulk_ingest import process_batch
+from apps.image_processing.models import ProcessingBatch
+
+
+class Command(BaseCommand):
+    help = 'Run AI detection for the images of queued processing batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', action='append', default=None,
+                            help='Batch id to process (repeatable; defaults to every queued batch)')
+
+    def handle(self, *args, **options):
+        batches = ProcessingBatch.objects.order_by('created_at')
+        if options['batch']:
+            batches = batches.filter(pk__in=options['batch'])
+            if not batches.exists():
+                raise CommandError('No such batch')
+        else:
+            batches = batches.filter(status='QUEUED')
+
+        for batch in batches:
+            self.stdout.write(f"Processing {batch.name} ({batch.total_images} image(s))...")
+            batch = process_batch(batch)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"  {batch.processed_images} processed, {batch.failed_images} failed ({batch.status})"
+                )
+            )
@@ -0,0 +1,64 @@
+"""
+Management command to build and validate an INT8 CPU variant of a model.
+
+Exports the model to INT8 (ONNX Runtime dynamic quantization or OpenVINO),
+evaluates FP32 and INT8 on the labeled holdout
+(BIRD_MODEL_QUANTIZATION["HOLDOUT_DIR"]) and records the result. A variant
+that regresses mAP@0.5 or any species' recall past the configured tolerances
+is rejected and never served. With USE_INT8_ON_CPU enabled, CPU workers pick
+up a validated variant on their next model load.
+
+    python manage.py quantize_model --model egret_500_model/weights/best.pt
+    python manage.py quantize_model --method openvino
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.model_registry import get_selected_model_path
+from apps.image_processing.quantization import QUANTIZATION_METHODS, build_quantized_variant, get_quantization_config
+
+
+class Command(BaseCommand):
+    help = 'Build an INT8 quantized CPU variant of a detection model and check it against the holdout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=None,
+                            help='FP32 model file (defaults to the selected or default model)')
+        parser.add_argument('--method', choices=QUANTIZATION_METHODS, default=None,
+                            help='Quantization path (defaults to BIRD_MODEL_QUANTIZATION["METHOD"])')
+        parser.add_argument('--confidence', type=float, default=0.25,
+                            help='Confidence threshold the per-species recall is measured at')
+
+    def handle(self, *args, **options):
+        model_path = (
+            options['model']
+            or get_selected_model_path()
+            or str(Path(settings.BASE_DIR) / 'egret_500_model' / 'weights' / 'best.pt')
+        )
+        if not Path(model_path).exists():
+            raise CommandError(f'Model file not found: {model_path}')
+
+        config = get_quantization_config()
+        self.stdout.write(f"Quantizing {model_path} ({options['method'] or config['METHOD']})...")
+        try:
+            variant = build_quantized_variant(model_path, options['method'], options['confidence'])
+        except (ImportError, ValueError) as e:
+            raise CommandError(str(e))
+
+        reference, candidate = variant.reference_metrics, variant.variant_metrics
+        self.stdout.write(f"  mAP@0.5: FP32 {reference['map50']:.3f}, INT8 {candidate['map50']:.3f}")
+        for species, metrics in reference['species'].items():
+            int8_recall = candidate['species'].get(species, {}).get('recall', 0.0)
+            self.stdout.write(f"  {species} recall: FP32 {metrics['recall']:.3f}, INT8 {int8_recall:.3f}")
+
+        if variant.failures:
+            for failure in variant.failures:
+                self.stdout.write(self.style.ERROR(f"  {failure}"))
+            raise CommandError(f'INT8 variant rejected; it will not be used ({variant.variant_path})')
+
+        self.stdout.write(self.style.SUCCESS(f'INT8 variant validated: {variant.variant_path}'))
+        if not config['USE_INT8_ON_CPU']:
+            self.stdout.write('Set BIRD_MODEL_INT8_ON_CPU=True to serve it on CPU workers')
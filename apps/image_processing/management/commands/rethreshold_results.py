@@ -0,0 +1,60 @@
+"""
+Management command to apply a new confidence threshold to stored results.
+
+Recomputes the filtered detections, egret counts and primary species of
+stored results from their raw detections (no inference is run). Without
+--commit it only prints the diff; --report writes the full diff as JSON.
+
+    python manage.py rethreshold_results --confidence 0.35
+    python manage.py rethreshold_results --confidence 0.35 --report rethreshold.json
+    python manage.py rethreshold_results --confidence 0.35 --iou 0.5 --commit
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.rethreshold import apply_rethreshold, eligible_results, plan_rethreshold
+
+
+class Command(BaseCommand):
+    help = 'Re-threshold stored processing results from their raw detections (dry run unless --commit)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--confidence', type=float, required=True, help='New confidence threshold')
+        parser.add_argument('--iou', type=float, default=None, help='NMS IoU threshold (default from settings)')
+        parser.add_argument('--model', default=None, help='Only results produced by this model file')
+        parser.add_argument('--include-reviewed', action='store_true',
+                            help='Also rewrite results that were already reviewed (allocated ones never are)')
+        parser.add_argument('--report', default=None, help='Write the diff report to this JSON file')
+        parser.add_argument('--commit', action='store_true', help='Write the changes (default is a dry run)')
+
+    def handle(self, *args, **options):
+        if not 0.0 < options['confidence'] <= 1.0:
+            raise CommandError('--confidence must be in (0, 1]')
+        if options['iou'] is not None and not 0.0 < options['iou'] <= 1.0:
+            raise CommandError('--iou must be in (0, 1]')
+
+        queryset = eligible_results(include_reviewed=options['include_reviewed'], model=options['model'])
+        plan = plan_rethreshold(options['confidence'], options['iou'], queryset=queryset)
+        report = plan.report()
+
+        self.stdout.write(
+            f"{report['evaluated']} result(s) evaluated at confidence {report['confidence_threshold']} "
+            f"(IoU {report['nms_iou']}), {report['changed']} would change"
+        )
+        if report['skipped']:
+            self.stdout.write(f"{report['skipped']} result(s) skipped: raw detections stored above this threshold")
+        for species, delta in report['species_delta'].items():
+            self.stdout.write(f"  {species}: {delta['before']} -> {delta['after']} ({delta['delta']:+d})")
+
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Diff report written to {options['report']}")
+
+        if not options['commit']:
+            self.stdout.write('Dry run: nothing written (use --commit to apply)')
+            return
+        updated = apply_rethreshold(plan)
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} result(s)"))
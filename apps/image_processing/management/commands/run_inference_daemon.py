@@ -0,0 +1,74 @@
+"""
+Management command to run the shared inference daemon.
+
+The daemon loads the YOLO model once and serves detection requests from all
+web workers over a local Unix socket, micro-batching them across workers.
+Enable the client side with INFERENCE_DAEMON_ENABLED=True; run one daemon per
+host, e.g. as a systemd service next to gunicorn.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.image_processing.inference_concurrency import (
+    configure_inference_threads,
+    get_concurrency_config,
+    plan_concurrency,
+)
+from apps.image_processing.inference_daemon import (
+    InferenceDaemon,
+    InferenceDaemonUnavailable,
+    get_daemon_config,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run the shared bird detection inference daemon on a Unix socket'
+
+    def add_arguments(self, parser):
+        config = get_daemon_config()
+        parser.add_argument('--socket', default=config['SOCKET_PATH'], help='Unix socket path to listen on')
+        parser.add_argument('--model', default=None, help='YOLO model path (defaults to the active model)')
+        parser.add_argument('--max-batch-size', type=int, default=config['MAX_BATCH_SIZE'],
+                            help='Maximum number of images per model call')
+        parser.add_argument('--max-batch-wait-ms', type=float, default=config['MAX_BATCH_WAIT_MS'],
+                            help='How long to wait for more requests before running a batch')
+        parser.add_argument('--threads', type=int, default=None,
+                            help='PyTorch intra-op threads (defaults to the cores left per replica)')
+
+    def handle(self, *args, **options):
+        from apps.image_processing.bird_detection_service import get_bird_detection_service
+
+        # The daemon is the only model replica on the host unless configured otherwise
+        replicas = get_concurrency_config()['REPLICAS'] or 1
+        plan = configure_inference_threads(plan_concurrency(replicas=replicas, threads=options['threads']))
+        self.stdout.write(
+            f"Using {plan.threads_per_replica} inference thread(s) of {plan.cores} core(s) "
+            f"({plan.replicas} replica(s))"
+        )
+        self.stdout.write(f"Loading detection model{' ' + options['model'] if options['model'] else ''}...")
+        service = get_bird_detection_service(options['model'])
+        service.max_batch_size = max(service.max_batch_size, options['max_batch_size'])
+
+        daemon = InferenceDaemon(
+            # Without --model, follow the model selected on Model Management
+            service if options['model'] else get_bird_detection_service,
+            options['socket'],
+            max_batch_size=options['max_batch_size'],
+            max_batch_wait_ms=options['max_batch_wait_ms'],
+            timeout=get_daemon_config()['TIMEOUT'],
+        )
+        try:
+            daemon.start()
+        except InferenceDaemonUnavailable as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Inference daemon serving {service.model_path} on {options['socket']} "
+                f"(device {service.device}, batches of up to {options['max_batch_size']})"
+            )
+        )
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Shutting down inference daemon")
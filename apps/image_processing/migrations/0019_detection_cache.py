@@ -0,0 +1,47 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:15
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0018_add_allocation_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectionCacheEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content_sha256', models.CharField(max_length=64)),
+                ('model_identity', models.CharField(help_text='Model file name, size and modification time', max_length=255)),
+                ('confidence_threshold', models.FloatField()),
+                ('preprocessing_version', models.CharField(max_length=50)),
+                ('result', models.JSONField(help_text='detect_birds() result')),
+                ('perceptual_hash', models.CharField(blank=True, max_length=16)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Detection Cache Entry',
+                'verbose_name_plural': 'Detection Cache Entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of the image bytes (detection cache key)', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='64-bit difference hash (hex) for near-duplicate detection', max_length=16),
+        ),
+        migrations.AddConstraint(
+            model_name='detectioncacheentry',
+            constraint=models.UniqueConstraint(fields=('content_sha256', 'model_identity', 'confidence_threshold', 'preprocessing_version'), name='unique_detection_cache_key'),
+        ),
+    ]
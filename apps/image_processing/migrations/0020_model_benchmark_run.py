@@ -0,0 +1,42 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:18
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0019_detection_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelBenchmarkRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model_name', models.CharField(max_length=100)),
+                ('model_path', models.CharField(max_length=500)),
+                ('backend', models.CharField(choices=[('pytorch', 'PyTorch'), ('onnx', 'ONNX')], max_length=20)),
+                ('device', models.CharField(default='cpu', max_length=20)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], default='success', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('fixture_count', models.PositiveIntegerField(default=0)),
+                ('cold_load_seconds', models.FloatField(blank=True, help_text='Model load plus first inference in a fresh process', null=True)),
+                ('latency_p50_ms', models.FloatField(blank=True, null=True)),
+                ('latency_p95_ms', models.FloatField(blank=True, null=True)),
+                ('latency_p99_ms', models.FloatField(blank=True, null=True)),
+                ('throughput', models.JSONField(blank=True, default=dict, help_text='Images/sec keyed by batch size')),
+                ('peak_rss_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('environment', models.JSONField(blank=True, default=dict, help_text='Host, CPU count and library versions of the run')),
+                ('duration_seconds', models.FloatField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Model Benchmark Run',
+                'verbose_name_plural': 'Model Benchmark Runs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['model_name', 'backend', '-created_at'], name='image_proce_model_n_21342e_idx')],
+            },
+        ),
+    ]
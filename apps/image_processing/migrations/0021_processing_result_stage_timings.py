@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0020_model_benchmark_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingresult',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict, help_text='Wall time in ms per pipeline stage (read, decode, preprocess, inference, postprocess, persist)'),
+        ),
+    ]
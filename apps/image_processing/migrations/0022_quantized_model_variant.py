@@ -0,0 +1,38 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:27
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0021_processing_result_stage_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuantizedModelVariant',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_path', models.CharField(max_length=500)),
+                ('source_identity', models.CharField(help_text='FP32 model file name, size and modification time', max_length=255)),
+                ('variant_path', models.CharField(max_length=500)),
+                ('method', models.CharField(choices=[('onnx', 'ONNX Runtime dynamic INT8'), ('openvino', 'OpenVINO INT8')], max_length=20)),
+                ('status', models.CharField(choices=[('validated', 'Validated'), ('rejected', 'Rejected')], max_length=20)),
+                ('reference_metrics', models.JSONField(default=dict, help_text='FP32 mAP@0.5 and per-species AP/recall')),
+                ('variant_metrics', models.JSONField(default=dict, help_text='INT8 mAP@0.5 and per-species AP/recall')),
+                ('failures', models.JSONField(blank=True, default=list, help_text='Regressions beyond the tolerances')),
+                ('map_tolerance', models.FloatField()),
+                ('recall_tolerance', models.FloatField()),
+                ('holdout_images', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Quantized Model Variant',
+                'verbose_name_plural': 'Quantized Model Variants',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['source_identity', 'status'], name='image_proce_source__96477e_idx')],
+            },
+        ),
+    ]
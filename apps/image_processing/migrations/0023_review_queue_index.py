@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0022_quantized_model_variant'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processingresult',
+            index=models.Index(fields=['review_decision', '-created_at', '-id'], name='image_proce_review__15370d_idx'),
+        ),
+    ]
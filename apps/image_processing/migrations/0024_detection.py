@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0023_review_queue_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Detection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Order of the detection within the result')),
+                ('species', models.CharField(help_text='Species label as reported by the model', max_length=100)),
+                ('confidence', models.FloatField()),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('is_raw', models.BooleanField(default=False, help_text='Pre-threshold model output, kept so results can be re-thresholded')),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='detections', to='image_processing.processingresult')),
+            ],
+            options={
+                'verbose_name': 'Detection',
+                'verbose_name_plural': 'Detections',
+                'ordering': ['result', 'position'],
+                'indexes': [models.Index(fields=['species', 'confidence'], name='image_proce_species_4aea8e_idx'), models.Index(fields=['confidence'], name='image_proce_confide_e1b536_idx'), models.Index(fields=['result', 'is_raw', 'position'], name='image_proce_result__c74c31_idx')],
+            },
+        ),
+    ]
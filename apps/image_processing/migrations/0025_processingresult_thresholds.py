@@ -0,0 +1,28 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_processing', '0024_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingresult',
+            name='applied_confidence_threshold',
+            field=models.FloatField(blank=True, help_text='Confidence threshold the filtered detections were produced at', null=True),
+        ),
+        migrations.AddField(
+            model_name='processingresult',
+            name='applied_nms_iou',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='processingresult',
+            name='raw_confidence_floor',
+            field=models.FloatField(blank=True, help_text='Confidence down to which raw detections are stored (empty if none are)', null=True),
+        ),
+    ]
@@ -0,0 +1,293 @@
+"""
+Process-wide detection model registry
+
+Loaded models are shared by every BirdDetectionService in the process and
+keyed by (path, backend, device):
+
+- Memory budget with LRU eviction: loading a model that pushes the total over
+  MEMORY_BUDGET_MB evicts the least recently used models (never the active one)
+- Warm pools: warm() loads and warms a model in a background thread so traffic
+  never pays a cold load inside a user request
+- Atomic hot-swap: activate() warms the new model first and then replaces the
+  active key in one step; requests already running keep the model they started
+  with
+- Load time and memory are recorded per model for the Model Management page
+
+The model selected on the Model Management page is also stored in the cache
+(ACTIVE_MODEL_CACHE_KEY), so every worker process (and the inference daemon)
+warms and swaps to it on its next detection request.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_REGISTRY_CONFIG = {
+    "MEMORY_BUDGET_MB": 2048,
+    "BACKEND": "ultralytics",
+}
+
+ACTIVE_MODEL_CACHE_KEY = "image_processing:active_model"
+
+ModelKey = Tuple[str, str, str]  # (path, backend, device)
+
+
+def get_registry_config() -> Dict:
+    config = dict(DEFAULT_MODEL_REGISTRY_CONFIG)
+    config.update(getattr(settings, "BIRD_MODEL_REGISTRY", {}))
+    return config
+
+
+def _ultralytics_loader(path: str, backend: str, device: str):
+    """Load a YOLO model and run one warmup inference"""
+    import numpy as np
+    from ultralytics import YOLO
+
+    if backend != "ultralytics":
+        raise ValueError(f"Unsupported model backend: {backend}")
+
+    model = YOLO(path, task="detect")  # ONNX/OpenVINO files don't carry the task
+    try:
+        model(np.zeros((640, 640, 3), dtype=np.uint8), device=device, verbose=False)
+    except Exception as e:
+        logger.warning(f"Model warmup failed for {path}: {e}")
+    return model
+
+
+def estimate_model_memory(model, path: str) -> int:
+    """Bytes held by the model's parameters and buffers (file size as fallback)"""
+    module = getattr(model, "model", model)
+    try:
+        tensors = list(module.parameters()) + list(module.buffers())
+        total = sum(t.numel() * t.element_size() for t in tensors)
+        if total:
+            return total
+    except Exception:
+        pass
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class LoadedModel:
+    """A model held by the registry plus its load statistics"""
+
+    def __init__(self, key: ModelKey, model, load_seconds: float, memory_bytes: int):
+        self.key = key
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.uses = 0
+
+    @property
+    def path(self) -> str:
+        return self.key[0]
+
+    def as_dict(self, active_key: Optional[ModelKey] = None) -> Dict:
+        path, backend, device = self.key
+        return {
+            "path": path,
+            "name": Path(path).parent.parent.name if Path(path).parent.name == "weights" else Path(path).parent.name,
+            "file": Path(path).name,
+            "backend": backend,
+            "device": device,
+            "load_seconds": self.load_seconds,
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "uses": self.uses,
+            "active": self.key == active_key,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, memory_budget_bytes: int, loader: Optional[Callable] = None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.loader = loader or _ultralytics_loader
+        self._models: "OrderedDict[ModelKey, LoadedModel]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._warming: Dict[ModelKey, threading.Thread] = {}
+        self._active_key: Optional[ModelKey] = None
+        self.evictions = 0
+
+    # Loading ---------------------------------------------------------------
+
+    def _key_lock(self, key: ModelKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, path: str, backend: str, device: str) -> LoadedModel:
+        """Return the loaded model for the key, loading it on first use"""
+        key = (str(path), backend, device)
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                entry.last_used = time.time()
+                entry.uses += 1
+                return entry
+
+        # One load per key at a time; other keys keep being served meanwhile
+        with self._key_lock(key):
+            with self._lock:
+                entry = self._models.get(key)
+            if entry is None:
+                started = time.perf_counter()
+                model = self.loader(*key)
+                load_seconds = time.perf_counter() - started
+                entry = LoadedModel(key, model, load_seconds, estimate_model_memory(model, key[0]))
+                logger.info(
+                    f"Loaded model {key[0]} ({backend}, {device}) in {load_seconds:.2f}s, "
+                    f"~{entry.memory_bytes / 1024 ** 2:.0f}MB"
+                )
+                with self._lock:
+                    self._models[key] = entry
+                    self._evict_over_budget(keep=key)
+
+        with self._lock:
+            entry.last_used = time.time()
+            entry.uses += 1
+        return entry
+
+    def _evict_over_budget(self, keep: ModelKey):
+        while self.memory_used() > self.memory_budget_bytes:
+            victim = next(
+                (k for k in self._models if k != keep and k != self._active_key),
+                None,
+            )
+            if victim is None:
+                break
+            evicted = self._models.pop(victim)
+            self.evictions += 1
+            logger.info(f"Evicted model {victim[0]} ({victim[2]}) to stay within the memory budget")
+            del evicted
+
+    def memory_used(self) -> int:
+        with self._lock:
+            return sum(entry.memory_bytes for entry in self._models.values())
+
+    def is_loaded(self, path: str, backend: str, device: str) -> bool:
+        with self._lock:
+            return (str(path), backend, device) in self._models
+
+    def evict(self, path: str, backend: str, device: str) -> bool:
+        key = (str(path), backend, device)
+        with self._lock:
+            if key == self._active_key or key not in self._models:
+                return False
+            del self._models[key]
+            self.evictions += 1
+            return True
+
+    # Warm pools and hot-swap ---------------------------------------------------
+
+    def warm(self, path: str, backend: str, device: str, on_ready: Optional[Callable] = None) -> threading.Thread:
+        """Load a model in a background thread; calls on_ready(entry) once warm"""
+        key = (str(path), backend, device)
+        with self._lock:
+            thread = self._warming.get(key)
+            if thread is not None and thread.is_alive() and on_ready is None:
+                return thread
+
+            def run():
+                try:
+                    entry = self.get(*key)
+                    if on_ready:
+                        on_ready(entry)
+                except Exception as e:
+                    logger.error(f"Warming model {key[0]} failed: {e}")
+                finally:
+                    with self._lock:
+                        if self._warming.get(key) is threading.current_thread():
+                            del self._warming[key]
+
+            thread = threading.Thread(target=run, name=f"model-warm-{Path(key[0]).stem}", daemon=True)
+            self._warming[key] = thread
+        thread.start()
+        return thread
+
+    def is_warming(self, path: str, backend: str, device: str) -> bool:
+        with self._lock:
+            thread = self._warming.get((str(path), backend, device))
+            return thread is not None and thread.is_alive()
+
+    def activate(self, path: str, backend: str, device: str, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Make the model the active one. With ``background`` the model is warmed
+        in a thread and swapped in once ready; the previously active model keeps
+        serving until then.
+        """
+        key = (str(path), backend, device)
+
+        def swap(entry):
+            with self._lock:
+                previous, self._active_key = self._active_key, entry.key
+            if previous != entry.key:
+                logger.info(f"Active detection model switched to {entry.key[0]} ({entry.key[2]})")
+
+        if background and not self.is_loaded(*key):
+            return self.warm(*key, on_ready=swap)
+        swap(self.get(*key))
+        return None
+
+    @property
+    def active_key(self) -> Optional[ModelKey]:
+        with self._lock:
+            return self._active_key
+
+    # Reporting -----------------------------------------------------------------
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            entries = [entry.as_dict(self._active_key) for entry in reversed(self._models.values())]
+            warming = [key for key, thread in self._warming.items() if thread.is_alive()]
+        for path, backend, device in warming:
+            entries.append({
+                "path": path, "name": Path(path).stem, "file": Path(path).name, "backend": backend,
+                "device": device, "warming": True, "active": False,
+            })
+        return entries
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry (created on first use)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            config = get_registry_config()
+            _registry = ModelRegistry(config["MEMORY_BUDGET_MB"] * 1024 * 1024)
+        return _registry
+
+
+def reset_model_registry():
+    """Drop every loaded model (useful for testing)"""
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+def get_selected_model_path() -> Optional[str]:
+    """Model path selected on the Model Management page, shared by all workers"""
+    return cache.get(ACTIVE_MODEL_CACHE_KEY)
+
+
+def select_model(path: str):
+    """Select the model every worker should switch to (warmed before the swap)"""
+    cache.set(ACTIVE_MODEL_CACHE_KEY, str(path), None)
@@ -7,8 +7,12 @@ import uuid
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
+from .stage_counters import invalidate_stage_counts
+
 User = get_user_model()
 
 
@@ -59,6 +63,18 @@ class ImageUpload(models.Model):
     # Capture metadata
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     original_filename = models.CharField(max_length=255)
+    content_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="SHA-256 of the image bytes (detection cache key)"
+    )
+    perceptual_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        db_index=True,
+        help_text="64-bit difference hash (hex) for near-duplicate detection"
+    )
 
     # GTD Workflow status (maps to upload_status in database)
     upload_status = models.CharField(
@@ -169,6 +185,24 @@ class ProcessingResult(models.Model):
         blank=True,
         help_text="AI inference time in seconds"
     )
+    stage_timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Wall time in ms per pipeline stage (read, decode, preprocess, inference, postprocess, persist)"
+    )
+
+    # Thresholds behind the filtered detections (see rethreshold.py)
+    applied_confidence_threshold = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Confidence threshold the filtered detections were produced at"
+    )
+    applied_nms_iou = models.FloatField(null=True, blank=True)
+    raw_confidence_floor = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Confidence down to which raw detections are stored (empty if none are)"
+    )
 
     # Human review (Reflect stage)
     review_decision = models.CharField(
@@ -229,6 +263,10 @@ class ProcessingResult(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Processing Result"
         verbose_name_plural = "Processing Results"
+        indexes = [
+            # Keyset pagination of the review queue
+            models.Index(fields=["review_decision", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.image_upload.title} - {self.get_detected_species_display()}"
@@ -392,3 +430,198 @@ class ProcessingBatch(models.Model):
         if self.total_images == 0:
             return 0
         return ((self.processed_images + self.failed_images) / self.total_images) * 100
+
+
+class DetectionCacheEntry(models.Model):
+    """
+    Cached detection output for identical image content, so duplicate uploads
+    and re-runs of Clarify skip inference (see detection_cache.py)
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    content_sha256 = models.CharField(max_length=64)
+    model_identity = models.CharField(max_length=255, help_text="Model file name, size and modification time")
+    confidence_threshold = models.FloatField()
+    preprocessing_version = models.CharField(max_length=50)
+    result = models.JSONField(help_text="detect_birds() result")
+    perceptual_hash = models.CharField(max_length=16, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Detection Cache Entry"
+        verbose_name_plural = "Detection Cache Entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_sha256", "model_identity", "confidence_threshold", "preprocessing_version"],
+                name="unique_detection_cache_key",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.content_sha256[:12]} - {self.model_identity}"
+
+
+
+class ModelBenchmarkRun(models.Model):
+    """
+    Measured performance of one model file and backend on the local benchmark
+    fixtures (written by the benchmark_models management command)
+    """
+
+    class Backend(models.TextChoices):
+        PYTORCH = "pytorch", "PyTorch"
+        ONNX = "onnx", "ONNX"
+
+    class Status(models.TextChoices):
+        SUCCESS = "success", "Success"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    model_name = models.CharField(max_length=100)
+    model_path = models.CharField(max_length=500)
+    backend = models.CharField(max_length=20, choices=Backend.choices)
+    device = models.CharField(max_length=20, default="cpu")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.SUCCESS)
+    error = models.TextField(blank=True)
+
+    fixture_count = models.PositiveIntegerField(default=0)
+    cold_load_seconds = models.FloatField(
+        null=True, blank=True, help_text="Model load plus first inference in a fresh process"
+    )
+    latency_p50_ms = models.FloatField(null=True, blank=True)
+    latency_p95_ms = models.FloatField(null=True, blank=True)
+    latency_p99_ms = models.FloatField(null=True, blank=True)
+    throughput = models.JSONField(default=dict, blank=True, help_text="Images/sec keyed by batch size")
+    peak_rss_bytes = models.BigIntegerField(null=True, blank=True)
+    environment = models.JSONField(
+        default=dict, blank=True, help_text="Host, CPU count and library versions of the run"
+    )
+
+    duration_seconds = models.FloatField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Model Benchmark Run"
+        verbose_name_plural = "Model Benchmark Runs"
+        indexes = [
+            models.Index(fields=["model_name", "backend", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} ({self.backend}) - {self.created_at:%Y-%m-%d %H:%M}"
+
+    @property
+    def throughput_by_batch(self):
+        """[(batch size, images/sec)] sorted by batch size"""
+        return sorted((int(size), ips) for size, ips in self.throughput.items())
+
+
+class QuantizedModelVariant(models.Model):
+    """
+    INT8 variant of a detection model and the holdout check that decides
+    whether it may replace the FP32 model on CPU (see quantization.py)
+    """
+
+    class Method(models.TextChoices):
+        ONNX = "onnx", "ONNX Runtime dynamic INT8"
+        OPENVINO = "openvino", "OpenVINO INT8"
+
+    class Status(models.TextChoices):
+        VALIDATED = "validated", "Validated"
+        REJECTED = "rejected", "Rejected"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    source_path = models.CharField(max_length=500)
+    source_identity = models.CharField(max_length=255, help_text="FP32 model file name, size and modification time")
+    variant_path = models.CharField(max_length=500)
+    method = models.CharField(max_length=20, choices=Method.choices)
+    status = models.CharField(max_length=20, choices=Status.choices)
+
+    reference_metrics = models.JSONField(default=dict, help_text="FP32 mAP@0.5 and per-species AP/recall")
+    variant_metrics = models.JSONField(default=dict, help_text="INT8 mAP@0.5 and per-species AP/recall")
+    failures = models.JSONField(default=list, blank=True, help_text="Regressions beyond the tolerances")
+    map_tolerance = models.FloatField()
+    recall_tolerance = models.FloatField()
+    holdout_images = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Quantized Model Variant"
+        verbose_name_plural = "Quantized Model Variants"
+        indexes = [
+            models.Index(fields=["source_identity", "status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.variant_path} ({self.get_status_display()})"
+
+
+class Detection(models.Model):
+    """
+    CLARIFY Stage: One detected bird of a processing result
+    Normalized copy of the result's detection lists, so detections can be
+    queried by species and confidence without parsing JSON (see detections.py)
+    """
+    result = models.ForeignKey(ProcessingResult, on_delete=models.CASCADE, related_name="detections")
+    position = models.PositiveSmallIntegerField(default=0, help_text="Order of the detection within the result")
+    species = models.CharField(max_length=100, help_text="Species label as reported by the model")
+    confidence = models.FloatField()
+
+    # Bounding box in original image pixels
+    x = models.PositiveIntegerField()
+    y = models.PositiveIntegerField()
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+
+    is_raw = models.BooleanField(
+        default=False,
+        help_text="Pre-threshold model output, kept so results can be re-thresholded"
+    )
+
+    class Meta:
+        ordering = ["result", "position"]
+        verbose_name = "Detection"
+        verbose_name_plural = "Detections"
+        indexes = [
+            models.Index(fields=["species", "confidence"]),
+            models.Index(fields=["confidence"]),
+            models.Index(fields=["result", "is_raw", "position"]),
+        ]
+
+    def __str__(self):
+        return f"{self.species} ({self.confidence:.2f}) at {self.x},{self.y}"
+
+    @property
+    def bounding_box(self):
+        return {"x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+    def as_dict(self):
+        """The detection in the detect_birds() / all_detections format"""
+        return {
+            "id": self.position,
+            "species": self.species,
+            "confidence": self.confidence,
+            "bounding_box": self.bounding_box,
+        }
+
+# Any status transition can move images between GTD stages; drop the cached
+# dashboard counters (see stage_counters.py)
+@receiver([post_save, post_delete], sender=ImageUpload)
+@receiver([post_save, post_delete], sender=ProcessingResult)
+def invalidate_stage_counters(sender, instance, **kwargs):
+    """Invalidate cached stage counts when uploads or results change"""
+    invalidate_stage_counts()
+
+
+# Allocation resolves detected species against a cached name map (see
+# allocation.py); rebuild it whenever the fauna species list changes
+@receiver([post_save, post_delete], sender="fauna.Species")
+def invalidate_allocation_species_map(sender, instance, **kwargs):
+    """Invalidate the cached species map used by census allocation"""
+    from .allocation import invalidate_species_map
+
+    invalidate_species_map()
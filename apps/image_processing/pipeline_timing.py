@@ -0,0 +1,169 @@
+"""
+Per-stage timing of the detection pipeline
+
+Each Clarify run is split into spans:
+
+- read: reading the image file from storage
+- queue: waiting for an inference slot (see inference_concurrency.py)
+- decode: decoding the JPEG/PNG
+- preprocess: resize and contrast enhancement
+- inference: the model call (a batch's time is shared equally by its images;
+  includes the tiled pass)
+- postprocess: box parsing, thresholding, NMS and coordinate transforms
+- persist: writing the ProcessingResult and the status change (including
+  the signal cascade it triggers)
+
+The detection service measures queue to postprocess and returns them as
+``result["timings"]`` (milliseconds, so they also survive the inference
+daemon); the view adds read and persist and stores everything on
+ProcessingResult.stage_timings. pipeline_histograms() aggregates the most
+recent ROLLING_WINDOW results into histograms for the System Monitoring page
+and the pipeline metrics endpoint.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+STAGES = ("read", "queue", "decode", "preprocess", "inference", "postprocess", "persist")
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is unbounded
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+DEFAULT_PIPELINE_TIMING_CONFIG = {
+    "ROLLING_WINDOW": 500,  # most recent results aggregated
+    "CACHE_SECONDS": 30,
+}
+
+PIPELINE_HISTOGRAMS_CACHE_KEY = "image_processing:pipeline_histograms"
+
+
+def get_pipeline_timing_config() -> Dict:
+    config = dict(DEFAULT_PIPELINE_TIMING_CONFIG)
+    config.update(getattr(settings, "PIPELINE_TIMING", {}))
+    return config
+
+
+class StageTimer:
+    """Accumulates wall time (ms) per pipeline stage"""
+
+    def __init__(self, timings: Optional[Dict[str, float]] = None):
+        self.timings: Dict[str, float] = dict(timings or {})
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - started) * 1000)
+
+    def add(self, stage: str, ms: float):
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + ms, 3)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(self.timings.values()), 3)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {stage: self.timings[stage] for stage in STAGES if stage in self.timings}
+
+
+def _bucket_index(ms: float) -> int:
+    for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(HISTOGRAM_BUCKETS_MS)
+
+
+def build_histograms(timing_rows) -> Dict:
+    """Per-stage count, sum, percentiles and bucket counts of stage_timings dicts"""
+    from .benchmarking import percentile
+
+    samples = {stage: [] for stage in STAGES}
+    for timings in timing_rows:
+        for stage, ms in (timings or {}).items():
+            if stage in samples and ms is not None:
+                samples[stage].append(float(ms))
+
+    stages = []
+    for stage in STAGES:
+        values = samples[stage]
+        buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for ms in values:
+            buckets[_bucket_index(ms)] += 1
+        peak = max(buckets) or 1
+        stages.append({
+            "stage": stage,
+            "count": len(values),
+            "sum_ms": round(sum(values), 3),
+            "mean_ms": round(sum(values) / len(values), 3) if values else None,
+            "p50_ms": round(percentile(values, 50), 3) if values else None,
+            "p95_ms": round(percentile(values, 95), 3) if values else None,
+            "p99_ms": round(percentile(values, 99), 3) if values else None,
+            "buckets": [
+                {"le": bound, "count": count, "percent": round(100 * count / peak)}
+                for bound, count in zip(list(HISTOGRAM_BUCKETS_MS) + ["+Inf"], buckets)
+            ],
+        })
+    return {"stages": stages, "samples": len(timing_rows)}
+
+
+def pipeline_histograms(use_cache: bool = True) -> Dict:
+    """Rolling histograms over the most recent processing results"""
+    if use_cache:
+        cached = cache.get(PIPELINE_HISTOGRAMS_CACHE_KEY)
+        if cached is not None:
+            return cached
+
+    from .models import ProcessingResult
+
+    config = get_pipeline_timing_config()
+    rows = [
+        timings for timings in ProcessingResult.objects.order_by("-created_at")
+        .values_list("stage_timings", flat=True)[: config["ROLLING_WINDOW"]]
+        if timings
+    ]
+    histograms = build_histograms(rows)
+    histograms["window"] = config["ROLLING_WINDOW"]
+    cache.set(PIPELINE_HISTOGRAMS_CACHE_KEY, histograms, config["CACHE_SECONDS"])
+    return histograms
+
+
+def prometheus_exposition(histograms: Dict, admission: Optional[Dict] = None) -> str:
+    """
+    Histograms in the Prometheus text format (cumulative buckets, seconds),
+    plus the inference admission gauges when given
+    """
+    name = "avicast_detection_stage_seconds"
+    lines = [
+        f"# HELP {name} Wall time per detection pipeline stage over the most recent results",
+        f"# TYPE {name} histogram",
+    ]
+    for stage in histograms["stages"]:
+        cumulative = 0
+        for bucket in stage["buckets"]:
+            cumulative += bucket["count"]
+            le = "+Inf" if bucket["le"] == "+Inf" else f"{bucket['le'] / 1000:g}"
+            lines.append(f'{name}_bucket{{stage="{stage["stage"]}",le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum{{stage="{stage["stage"]}"}} {stage["sum_ms"] / 1000:g}')
+        lines.append(f'{name}_count{{stage="{stage["stage"]}"}} {stage["count"]}')
+
+    if admission:
+        gauges = (
+            ("in_flight", "Inferences running"),
+            ("waiting", "Requests waiting for an inference slot"),
+            ("utilization", "Share of inference slot time spent busy"),
+            ("rejected", "Requests rejected because the inference queue was full"),
+            ("timeouts", "Requests that timed out waiting for an inference slot"),
+        )
+        for key, help_text in gauges:
+            metric = f"avicast_inference_{key}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", f"{metric} {admission.get(key) or 0}"]
+        for key in ("p50_wait_ms", "p95_wait_ms", "max_wait_ms"):
+            if admission.get(key) is not None:
+                lines.append(f'avicast_inference_queue_wait_seconds{{stat="{key[:-8]}"}} {admission[key] / 1000:g}')
+    return "\n".join(lines) + "\n"
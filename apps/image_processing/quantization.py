@@ -0,0 +1,320 @@
+"""
+INT8 quantized CPU variants of the detection model with an accuracy guard
+
+CPU field-office machines get no reduced-precision option from
+``enable_half_precision`` (CUDA only). build_quantized_variant() produces an
+INT8 variant of a FP32 model and only lets it serve if it keeps up on a
+labeled holdout:
+
+- "onnx": export to ONNX, then ONNX Runtime dynamic INT8 quantization
+- "openvino": OpenVINO INT8 export (post-training quantization calibrated on
+  the holdout images)
+
+PyTorch dynamic quantization is not offered: it only covers Linear/LSTM layers
+and leaves a convolutional detector unchanged.
+
+Both models are evaluated on the holdout (mAP@0.5 and per-species recall at
+the service confidence threshold). A variant whose mAP drops by more than
+MAP_TOLERANCE, or whose recall for any species drops by more than
+RECALL_TOLERANCE, is stored as rejected and never used. Validated variants are
+cached next to the model (quantized/) and recorded as QuantizedModelVariant
+rows keyed by the FP32 model identity, so replacing the FP32 file
+invalidates them.
+
+With USE_INT8_ON_CPU enabled, BirdDetectionService runs the validated variant
+instead of the FP32 model when it runs on the CPU (runtime_model_path()).
+
+Holdout layout (YOLO format): HOLDOUT_DIR/images/*.jpg and
+HOLDOUT_DIR/labels/<image stem>.txt with "class cx cy w h" lines (normalized),
+class ids as in the model's class names.
+"""
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .benchmarking import FIXTURE_EXTENSIONS
+from .detection_cache import model_identity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANTIZATION_CONFIG = {
+    "USE_INT8_ON_CPU": False,
+    "METHOD": "onnx",
+    "HOLDOUT_DIR": None,  # defaults to BASE_DIR / "benchmark_fixtures" / "holdout"
+    "MAP_TOLERANCE": 0.02,  # max absolute mAP@0.5 drop
+    "RECALL_TOLERANCE": 0.05,  # max absolute per-species recall drop
+    "IOU_THRESHOLD": 0.5,
+    "EVAL_CONFIDENCE": 0.01,  # low threshold so the precision/recall curve is complete
+}
+
+QUANTIZATION_METHODS = ("onnx", "openvino")
+
+
+def get_quantization_config() -> Dict:
+    config = dict(DEFAULT_QUANTIZATION_CONFIG)
+    config.update(getattr(settings, "BIRD_MODEL_QUANTIZATION", {}))
+    if not config["HOLDOUT_DIR"]:
+        config["HOLDOUT_DIR"] = str(Path(settings.BASE_DIR) / "benchmark_fixtures" / "holdout")
+    if config["METHOD"] not in QUANTIZATION_METHODS:
+        raise ValueError(f"BIRD_MODEL_QUANTIZATION METHOD must be one of {QUANTIZATION_METHODS}")
+    return config
+
+
+# Metrics -------------------------------------------------------------------------
+
+def iou_xyxy(a, b) -> float:
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def average_precision(true_positives: List[bool], ground_truth_count: int) -> float:
+    """All-point interpolated AP of detections sorted by descending confidence"""
+    if not ground_truth_count:
+        return 0.0
+    points = []
+    tp = fp = 0
+    for is_tp in true_positives:
+        tp += is_tp
+        fp += not is_tp
+        points.append((tp / ground_truth_count, tp / (tp + fp)))
+
+    ap, previous_recall = 0.0, 0.0
+    for i, (recall, _) in enumerate(points):
+        # Interpolated precision: best precision at this recall or beyond
+        precision = max(p for _, p in points[i:])
+        ap += (recall - previous_recall) * precision
+        previous_recall = recall
+    return ap
+
+
+def evaluate_predictions(predictions: Dict, ground_truth: Dict, iou_threshold: float = 0.5,
+                         recall_confidence: float = 0.25) -> Dict:
+    """
+    mAP@iou_threshold and per-species AP/recall
+
+    ``predictions``: {image: [(species, confidence, (x1, y1, x2, y2)), ...]}
+    ``ground_truth``: {image: [(species, (x1, y1, x2, y2)), ...]}
+    Recall is measured at ``recall_confidence``, the service's operating point.
+    """
+    species_names = sorted({s for boxes in ground_truth.values() for s, _ in boxes})
+    report = {"species": {}, "images": len(ground_truth)}
+
+    for species in species_names:
+        truth = {image: [box for s, box in boxes if s == species] for image, boxes in ground_truth.items()}
+        matched = {image: [False] * len(boxes) for image, boxes in truth.items()}
+        ground_truth_count = sum(len(boxes) for boxes in truth.values())
+
+        candidates = sorted(
+            ((confidence, image, box) for image, boxes in predictions.items()
+             for s, confidence, box in boxes if s == species),
+            key=lambda c: c[0], reverse=True,
+        )
+        flags, operating_tp = [], 0
+        for confidence, image, box in candidates:
+            best, best_iou = None, iou_threshold
+            for i, truth_box in enumerate(truth.get(image, [])):
+                overlap = iou_xyxy(box, truth_box)
+                if not matched[image][i] and overlap >= best_iou:
+                    best, best_iou = i, overlap
+            if best is not None:
+                matched[image][best] = True
+                operating_tp += confidence >= recall_confidence
+            flags.append(best is not None)
+
+        report["species"][species] = {
+            "ground_truth": ground_truth_count,
+            "ap50": round(average_precision(flags, ground_truth_count), 4),
+            "recall": round(operating_tp / ground_truth_count, 4),
+        }
+
+    aps = [s["ap50"] for s in report["species"].values()]
+    report["map50"] = round(sum(aps) / len(aps), 4) if aps else 0.0
+    return report
+
+
+def compare_reports(reference: Dict, candidate: Dict, map_tolerance: float, recall_tolerance: float) -> List[str]:
+    """Regressions of ``candidate`` against ``reference`` beyond the tolerances"""
+    failures = []
+    if candidate["map50"] < reference["map50"] - map_tolerance:
+        failures.append(
+            f"mAP@0.5 dropped from {reference['map50']:.3f} to {candidate['map50']:.3f} "
+            f"(tolerance {map_tolerance:.3f})"
+        )
+    for species, metrics in reference["species"].items():
+        recall = candidate["species"].get(species, {}).get("recall", 0.0)
+        if recall < metrics["recall"] - recall_tolerance:
+            failures.append(
+                f"{species} recall dropped from {metrics['recall']:.3f} to {recall:.3f} "
+                f"(tolerance {recall_tolerance:.3f})"
+            )
+    return failures
+
+
+# Holdout evaluation --------------------------------------------------------------
+
+def load_holdout(holdout_dir: str, class_names: Dict[int, str]) -> List[Tuple[Path, List]]:
+    """[(image path, [(species, (x1, y1, x2, y2)), ...])] of the YOLO-format holdout"""
+    from PIL import Image
+
+    holdout = Path(holdout_dir)
+    images = sorted(
+        p for p in (holdout / "images").iterdir() if p.suffix.lower() in FIXTURE_EXTENSIONS
+    ) if (holdout / "images").is_dir() else []
+
+    samples = []
+    for image_path in images:
+        with Image.open(image_path) as image:
+            width, height = image.size
+        boxes = []
+        label_file = holdout / "labels" / f"{image_path.stem}.txt"
+        if label_file.exists():
+            for line in label_file.read_text().splitlines():
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                class_id, cx, cy, w, h = int(parts[0]), *(float(v) for v in parts[1:5])
+                boxes.append((
+                    class_names.get(class_id, str(class_id)),
+                    ((cx - w / 2) * width, (cy - h / 2) * height, (cx + w / 2) * width, (cy + h / 2) * height),
+                ))
+        samples.append((image_path, boxes))
+    return samples
+
+
+def evaluate_model(model, holdout: List[Tuple[Path, List]], config: Dict, recall_confidence: float) -> Dict:
+    """Run an ultralytics model over the holdout and score it"""
+    predictions, ground_truth = {}, {}
+    for image_path, boxes in holdout:
+        result = model(str(image_path), conf=config["EVAL_CONFIDENCE"], device="cpu", verbose=False)[0]
+        detections = []
+        if result.boxes is not None:
+            for xyxy, confidence, class_id in zip(
+                result.boxes.xyxy.tolist(), result.boxes.conf.tolist(), result.boxes.cls.tolist()
+            ):
+                detections.append((result.names[int(class_id)], float(confidence), tuple(xyxy)))
+        predictions[image_path.name] = detections
+        ground_truth[image_path.name] = boxes
+    return evaluate_predictions(predictions, ground_truth, config["IOU_THRESHOLD"], recall_confidence)
+
+
+# Variant production --------------------------------------------------------------
+
+def variant_dir(model_path: str) -> Path:
+    return Path(model_path).parent / "quantized"
+
+
+def _export_onnx_int8(model_path: str, target_dir: Path) -> Path:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from ultralytics import YOLO
+
+    onnx_path = Path(YOLO(model_path).export(format="onnx", imgsz=640, dynamic=True, simplify=True))
+    target = target_dir / f"{Path(model_path).stem}.int8.onnx"
+    quantize_dynamic(str(onnx_path), str(target), weight_type=QuantType.QInt8)
+    onnx_path.unlink(missing_ok=True)  # Intermediate FP32 export
+    return target
+
+
+def _export_openvino_int8(model_path: str, target_dir: Path, holdout_dir: str, class_names: Dict[int, str]) -> Path:
+    from ultralytics import YOLO
+
+    # Calibration dataset description for the post-training quantization
+    data_yaml = target_dir / "holdout.yaml"
+    names = "\n".join(f"  {i}: {name}" for i, name in sorted(class_names.items()))
+    data_yaml.write_text(f"path: {holdout_dir}\ntrain: images\nval: images\nnames:\n{names}\n")
+
+    exported = Path(YOLO(model_path).export(format="openvino", imgsz=640, int8=True, data=str(data_yaml)))
+    target = target_dir / f"{Path(model_path).stem}_int8_openvino_model"
+    if target.exists():
+        shutil.rmtree(target)
+    shutil.move(str(exported), str(target))
+    return target
+
+
+def build_quantized_variant(model_path: str, method: Optional[str] = None, recall_confidence: float = 0.25):
+    """
+    Produce an INT8 variant of ``model_path``, check it against the FP32 model
+    on the holdout and record the outcome as a QuantizedModelVariant
+    """
+    from ultralytics import YOLO
+
+    from .models import QuantizedModelVariant
+
+    config = get_quantization_config()
+    method = method or config["METHOD"]
+    if method not in QUANTIZATION_METHODS:
+        raise ValueError(f"Unknown quantization method {method!r}")
+
+    reference_model = YOLO(model_path)
+    class_names = dict(reference_model.names)
+    holdout = load_holdout(config["HOLDOUT_DIR"], class_names)
+    if not holdout:
+        raise ValueError(f"No holdout images found in {config['HOLDOUT_DIR']}/images")
+
+    target_dir = variant_dir(model_path)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    if method == "onnx":
+        variant_path = _export_onnx_int8(model_path, target_dir)
+    else:
+        variant_path = _export_openvino_int8(model_path, target_dir, config["HOLDOUT_DIR"], class_names)
+
+    reference = evaluate_model(reference_model, holdout, config, recall_confidence)
+    candidate = evaluate_model(YOLO(str(variant_path), task="detect"), holdout, config, recall_confidence)
+    failures = compare_reports(reference, candidate, config["MAP_TOLERANCE"], config["RECALL_TOLERANCE"])
+
+    variant = QuantizedModelVariant.objects.create(
+        source_path=str(model_path),
+        source_identity=model_identity(str(model_path)),
+        variant_path=str(variant_path),
+        method=method,
+        status=QuantizedModelVariant.Status.REJECTED if failures else QuantizedModelVariant.Status.VALIDATED,
+        reference_metrics=reference,
+        variant_metrics=candidate,
+        failures=failures,
+        map_tolerance=config["MAP_TOLERANCE"],
+        recall_tolerance=config["RECALL_TOLERANCE"],
+        holdout_images=len(holdout),
+    )
+    if failures:
+        logger.warning(f"INT8 variant of {model_path} rejected: {'; '.join(failures)}")
+    else:
+        logger.info(f"INT8 variant of {model_path} validated ({variant_path})")
+    return variant
+
+
+def get_validated_variant(model_path: str):
+    """Latest validated INT8 variant of the current FP32 model file, if any"""
+    from .models import QuantizedModelVariant
+
+    variant = (
+        QuantizedModelVariant.objects.filter(
+            source_identity=model_identity(str(model_path)),
+            status=QuantizedModelVariant.Status.VALIDATED,
+        )
+        .order_by("-created_at")
+        .first()
+    )
+    if variant is None or not Path(variant.variant_path).exists():
+        return None
+    return variant
+
+
+def runtime_model_path(model_path: str, device: str) -> str:
+    """
+    Weights the service should run for ``model_path``: the validated INT8
+    variant on CPU when USE_INT8_ON_CPU is enabled, otherwise the model itself
+    """
+    if not model_path or not device.startswith("cpu") or not get_quantization_config()["USE_INT8_ON_CPU"]:
+        return model_path
+    try:
+        variant = get_validated_variant(model_path)
+    except Exception as e:  # Database unavailable (e.g. the daemon starting before migrations)
+        logger.warning(f"Could not look up INT8 variants of {model_path}: {e}")
+        return model_path
+    return variant.variant_path if variant else model_path
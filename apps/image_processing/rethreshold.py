@@ -0,0 +1,329 @@
+"""
+Re-threshold stored results without re-running inference
+
+The detector keeps every box above a low raw confidence floor
+(DETECTION_RETHRESHOLD["RAW_CONFIDENCE_FLOOR"]) and Clarify stores them once
+per (image, model) as raw Detection rows, next to the filtered rows produced
+at the operating threshold. When the operating threshold (or NMS IoU) is
+changed, the filtered detections, egret counts and primary species of every
+stored result can be recomputed from the raw rows:
+
+- the raw rows of all eligible results are loaded with one query into numpy
+  arrays sorted by (result, confidence desc)
+- the confidence cut is one vectorized comparison; class-agnostic greedy NMS
+  runs per result with vectorized IoU, like the detector's own post-processing
+- the kept rows of each result are already in confidence order, so the egret
+  count, primary (highest confidence egret) species and species summary are
+  read straight off its slice
+
+plan_rethreshold() only builds the diff; nothing is written until
+apply_rethreshold() is called with the plan. By default only unreviewed,
+unallocated results are eligible so human decisions are never rewritten
+behind the reviewer's back.
+
+Boxes are stored in original image coordinates while the detector runs NMS
+in model input coordinates; the transform is a uniform scale, so IoU (and
+therefore the outcome) only differs by integer rounding.
+"""
+
+import logging
+from collections import Counter, OrderedDict
+from decimal import Decimal
+from typing import Dict, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .detections import detection_rows
+from .models import Detection, EgretSpecies, ProcessingResult, ReviewDecision
+from .stage_counters import invalidate_stage_counts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETHRESHOLD_CONFIG = {
+    "STORE_RAW": True,  # keep raw detections so results can be re-thresholded
+    "RAW_CONFIDENCE_FLOOR": 0.05,  # lowest confidence kept as raw (capped at the operating threshold)
+    "NMS_IOU": 0.45,
+    "MAX_REPORT_CHANGES": 200,  # per-result entries listed in a diff report
+}
+
+# Display names the detector counts as egrets (total_detections, primary species)
+EGRET_DISPLAY_NAMES = frozenset(EgretSpecies.labels)
+
+_RESULT_FIELDS = [
+    "detected_species", "confidence_score", "bounding_box", "total_detections",
+    "all_detections", "applied_confidence_threshold", "applied_nms_iou", "updated_at",
+]
+
+
+def get_rethreshold_config() -> Dict:
+    config = dict(DEFAULT_RETHRESHOLD_CONFIG)
+    config.update(getattr(settings, "DETECTION_RETHRESHOLD", {}))
+    return config
+
+
+def raw_confidence_floor(confidence_threshold: float) -> Optional[float]:
+    """Confidence the detector should keep raw boxes down to, or None when raw storage is off"""
+    config = get_rethreshold_config()
+    if not config["STORE_RAW"]:
+        return None
+    return min(float(config["RAW_CONFIDENCE_FLOOR"]), float(confidence_threshold))
+
+
+def eligible_results(include_reviewed: bool = False, model: Optional[str] = None):
+    """Unallocated results that have raw detections stored (unreviewed ones unless include_reviewed)"""
+    queryset = ProcessingResult.objects.filter(
+        raw_confidence_floor__isnull=False, allocated_to_census__isnull=True
+    )
+    if not include_reviewed:
+        queryset = queryset.filter(review_decision=ReviewDecision.PENDING)
+    if model:
+        queryset = queryset.filter(ai_model_used=model)
+    return queryset
+
+
+# Vectorized evaluation -----------------------------------------------------------
+
+def nms_keep(boxes: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Indices kept by greedy NMS for x/y/width/height boxes already sorted by
+    confidence (highest first); a box is dropped when its IoU with a kept box
+    exceeds the threshold
+    """
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    order = np.arange(len(boxes))
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        inter = (
+            np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+            * np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        )
+        union = areas[i] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def _load_raw(results) -> Dict[str, np.ndarray]:
+    """Raw rows of the given results as arrays sorted by (result, confidence desc, position)"""
+    rows = list(
+        Detection.objects.filter(result__in=results, is_raw=True)
+        .values_list("result_id", "position", "species", "confidence", "x", "y", "width", "height")
+    )
+    if not rows:
+        return {"result": np.empty(0, dtype=object), "confidence": np.empty(0)}
+    result_ids, positions, species, confidence, x, y, width, height = zip(*rows)
+    # Sort keys need a comparable type: factorize the UUIDs
+    result_keys, result_index = np.unique([str(pk) for pk in result_ids], return_inverse=True)
+    confidence = np.asarray(confidence, dtype=np.float64)
+    order = np.lexsort((np.asarray(positions), -confidence, result_index))
+    return {
+        "result": result_keys[result_index][order],
+        "result_index": result_index[order],
+        "species": np.asarray(species, dtype=object)[order],
+        "confidence": confidence[order],
+        "boxes": np.column_stack([x, y, width, height]).astype(np.float64)[order],
+    }
+
+
+def evaluate(raw: Dict[str, np.ndarray], confidence_threshold: float, nms_iou: float) -> np.ndarray:
+    """Boolean mask of the raw rows that survive the threshold and per-result NMS"""
+    keep = raw["confidence"] >= confidence_threshold
+    if not keep.any():
+        return keep
+    candidates = np.flatnonzero(keep)
+    # Segments of consecutive rows that belong to the same result
+    boundaries = np.flatnonzero(np.diff(raw["result_index"][candidates])) + 1
+    for segment in np.split(candidates, boundaries):
+        if segment.size > 1:
+            survivors = segment[nms_keep(raw["boxes"][segment], nms_iou)]
+            keep[segment] = False
+            keep[survivors] = True
+    return keep
+
+
+def _outcome(species: np.ndarray, confidence: np.ndarray, boxes: np.ndarray) -> Dict:
+    """Result fields for the kept detections of one result (sorted by confidence)"""
+    detections = [
+        {
+            "species": str(name),
+            "confidence": float(score),
+            "bounding_box": {"x": int(box[0]), "y": int(box[1]), "width": int(box[2]), "height": int(box[3])},
+            "id": i,
+        }
+        for i, (name, score, box) in enumerate(zip(species, confidence, boxes))
+    ]
+    counts = OrderedDict()
+    for detection in detections:
+        counts[detection["species"]] = counts.get(detection["species"], 0) + 1
+    egrets = [d for d in detections if d["species"] in EGRET_DISPLAY_NAMES]
+    return {
+        "detections": detections,
+        "species_counts": counts,
+        "total_detections": len(egrets),
+        "primary_species": egrets[0]["species"] if egrets else None,
+        "primary_confidence": egrets[0]["confidence"] if egrets else 0.0,
+        "detected_species": ", ".join(f"{count} {name}" for name, count in counts.items()) or "UNKNOWN",
+    }
+
+
+# Plan and apply --------------------------------------------------------------------
+
+class RethresholdPlan:
+    """Recomputed outcomes for a set of results, and the diff against what is stored"""
+
+    def __init__(self, confidence_threshold: float, nms_iou: float):
+        self.confidence_threshold = confidence_threshold
+        self.nms_iou = nms_iou
+        self.evaluated = 0
+        self.skipped = 0  # raw floor above the requested threshold
+        self.outcomes: Dict[str, Dict] = {}  # changed results only
+        self.results: Dict[str, ProcessingResult] = {}
+        self.species_before: Counter = Counter()
+        self.species_after: Counter = Counter()
+
+    @property
+    def changed(self) -> int:
+        return len(self.outcomes)
+
+    def report(self) -> Dict:
+        """JSON-serializable dry-run diff"""
+        limit = get_rethreshold_config()["MAX_REPORT_CHANGES"]
+        species = sorted(set(self.species_before) | set(self.species_after))
+        changes = []
+        for pk, outcome in list(self.outcomes.items())[:limit]:
+            result = self.results[pk]
+            changes.append({
+                "result_id": pk,
+                "image": result.image_upload.title,
+                "before": {
+                    "detected_species": result.detected_species,
+                    "total_detections": result.total_detections,
+                    "confidence_score": float(result.confidence_score),
+                },
+                "after": {
+                    "detected_species": outcome["detected_species"],
+                    "total_detections": outcome["total_detections"],
+                    "confidence_score": round(outcome["primary_confidence"], 4),
+                },
+            })
+        return {
+            "confidence_threshold": self.confidence_threshold,
+            "nms_iou": self.nms_iou,
+            "evaluated": self.evaluated,
+            "skipped": self.skipped,
+            "changed": self.changed,
+            "species_delta": {
+                name: {
+                    "before": self.species_before[name],
+                    "after": self.species_after[name],
+                    "delta": self.species_after[name] - self.species_before[name],
+                }
+                for name in species
+                if self.species_before[name] != self.species_after[name]
+            },
+            "changes": changes,
+        }
+
+
+def plan_rethreshold(confidence_threshold: float, nms_iou: Optional[float] = None,
+                     queryset=None) -> RethresholdPlan:
+    """
+    Recompute the detections of every eligible result at a new threshold.
+    Nothing is written; pass the plan to apply_rethreshold() to commit it.
+    """
+    nms_iou = get_rethreshold_config()["NMS_IOU"] if nms_iou is None else nms_iou
+    plan = RethresholdPlan(confidence_threshold, nms_iou)
+    queryset = eligible_results() if queryset is None else queryset
+
+    plan.skipped = queryset.filter(raw_confidence_floor__gt=confidence_threshold).count()
+    results = queryset.filter(raw_confidence_floor__lte=confidence_threshold)
+    current = {
+        str(result.pk): result
+        for result in results.select_related("image_upload").only(
+            "id", "detected_species", "confidence_score", "total_detections",
+            "applied_confidence_threshold", "applied_nms_iou", "image_upload__title",
+        )
+    }
+    plan.evaluated = len(current)
+    if not current:
+        return plan
+
+    raw = _load_raw(results)
+    keep = evaluate(raw, confidence_threshold, nms_iou)
+
+    # Stored filtered counts per result and species, in one grouped query
+    before: Dict[str, Counter] = {}
+    for row in (
+        Detection.objects.filter(result__in=results, is_raw=False)
+        .values("result_id", "species").annotate(count=Count("id")).order_by()
+    ):
+        before.setdefault(str(row["result_id"]), Counter())[row["species"]] = row["count"]
+
+    kept = np.flatnonzero(keep)
+    by_result = {}
+    if kept.size:
+        keys, starts = np.unique(raw["result"][kept], return_index=True)
+        ends = list(starts[1:]) + [kept.size]
+        by_result = {key: kept[start:end] for key, start, end in zip(keys, starts, ends)}
+
+    empty = np.empty(0, dtype=np.int64)
+    for pk, result in current.items():
+        rows = by_result.get(pk, empty)
+        outcome = _outcome(raw["species"][rows], raw["confidence"][rows], raw["boxes"][rows]) if rows.size \
+            else _outcome(np.empty(0), np.empty(0), np.empty((0, 4)))
+        old_counts = before.get(pk, Counter())
+        new_counts = Counter(outcome["species_counts"])
+        plan.species_before.update(old_counts)
+        plan.species_after.update(new_counts)
+        if (
+            old_counts != new_counts
+            or outcome["total_detections"] != result.total_detections
+            or outcome["detected_species"] != result.detected_species
+        ):
+            plan.outcomes[pk] = outcome
+            plan.results[pk] = result
+    logger.info(
+        f"Re-threshold at {confidence_threshold} (IoU {nms_iou}): "
+        f"{plan.changed} of {plan.evaluated} results change, {plan.skipped} skipped"
+    )
+    return plan
+
+
+def apply_rethreshold(plan: RethresholdPlan, batch_size: int = 500) -> int:
+    """Write a plan: result fields with one bulk_update, filtered Detection rows replaced in bulk"""
+    if not plan.outcomes:
+        return 0
+    now = timezone.now()
+    results = []
+    rows = []
+    for pk, outcome in plan.outcomes.items():
+        result = plan.results[pk]
+        detections = outcome["detections"]
+        result.detected_species = outcome["detected_species"]
+        result.confidence_score = Decimal(f"{outcome['primary_confidence']:.4f}")
+        result.bounding_box = [d["bounding_box"] for d in detections] or [{"x": 0, "y": 0, "width": 0, "height": 0}]
+        result.total_detections = outcome["total_detections"]
+        result.all_detections = detections
+        result.applied_confidence_threshold = plan.confidence_threshold
+        result.applied_nms_iou = plan.nms_iou
+        result.updated_at = now  # bulk_update skips auto_now
+        results.append(result)
+        rows.extend(detection_rows(result, detections))
+
+    with transaction.atomic():
+        ProcessingResult.objects.bulk_update(results, _RESULT_FIELDS, batch_size=batch_size)
+        Detection.objects.filter(result__in=[r.pk for r in results], is_raw=False).delete()
+        Detection.objects.bulk_create(rows, batch_size=batch_size)
+
+    # bulk_update sends no post_save signals
+    invalidate_stage_counts()
+    logger.info(f"Re-threshold applied to {len(results)} results ({len(rows)} detections)")
+    return len(results)
@@ -0,0 +1,167 @@
+"""
+Keyset-paginated review queue and bulk review decisions
+
+The Reflect queue is ordered newest first on (created_at, id). A page is
+fetched with ``WHERE (created_at, id) < cursor ORDER BY ... LIMIT n``, so
+every page costs the same however deep the backlog is (no OFFSET scans and
+no page shifts when results are reviewed in between). Cursors are opaque
+URL-safe tokens of the last row's sort key.
+
+bulk_review() applies one decision to many pending results in a single
+transaction: one bulk_update for the results and one UPDATE for their
+uploads, instead of two saves per result.
+"""
+
+import base64
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ImageUpload, ProcessingResult, ProcessingStatus, ReviewDecision
+from .stage_counters import invalidate_stage_counts
+
+DEFAULT_REVIEW_QUEUE_CONFIG = {
+    "PAGE_SIZE": 20,
+    "MAX_BULK_RESULTS": 500,  # results one bulk action may touch
+    "THUMBNAIL_WIDTH": 480,  # annotated thumbnails prefetched for the next page
+}
+
+BULK_ACTIONS = ("approve", "reject", "override")
+
+_REVIEW_FIELDS = ["review_decision", "reviewed_by", "reviewed_at", "review_notes", "updated_at"]
+_OVERRIDE_FIELDS = _REVIEW_FIELDS + ["is_overridden", "overridden_species", "overridden_count", "override_reason"]
+
+
+def get_review_queue_config() -> Dict:
+    config = dict(DEFAULT_REVIEW_QUEUE_CONFIG)
+    config.update(getattr(settings, "REVIEW_QUEUE", {}))
+    return config
+
+
+def pending_results(user):
+    """Pending results visible to the user (admins see everyone's)"""
+    queryset = ProcessingResult.objects.filter(review_decision=ReviewDecision.PENDING)
+    if user.role not in ["SUPERADMIN", "ADMIN"]:
+        queryset = queryset.filter(image_upload__uploaded_by=user)
+    return queryset
+
+
+# Cursors ----------------------------------------------------------------------
+
+def encode_cursor(result: ProcessingResult) -> str:
+    raw = f"{result.created_at.isoformat()}|{result.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """(created_at, id) of a cursor; raises ValueError for a malformed one"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(pk)
+    except (UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def review_page(user, after: Optional[str] = None, page_size: Optional[int] = None) -> Dict:
+    """
+    One page of the user's review queue after the ``after`` cursor. Returns
+    ``{"results": [...], "next_cursor": str or None}``.
+    """
+    page_size = page_size or get_review_queue_config()["PAGE_SIZE"]
+    queryset = (
+        pending_results(user)
+        .select_related("image_upload", "reviewed_by")
+        .order_by("-created_at", "-id")
+    )
+    if after:
+        created_at, pk = decode_cursor(after)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    results = list(queryset[: page_size + 1])
+    has_more = len(results) > page_size
+    results = results[:page_size]
+    for result in results:
+        result.thumbnail_url = review_thumbnail_url(result)
+    return {
+        "results": results,
+        "next_cursor": encode_cursor(results[-1]) if has_more else None,
+    }
+
+
+def review_thumbnail_url(result: ProcessingResult) -> str:
+    """
+    Annotated (bounding box) thumbnail of a result. The version parameter
+    changes whenever the result does, so browsers may cache the image.
+    """
+    width = get_review_queue_config()["THUMBNAIL_WIDTH"]
+    url = reverse("image_processing:image_with_bbox", args=[result.pk])
+    return f"{url}?w={width}&v={int(result.updated_at.timestamp())}"
+
+
+# Bulk decisions ----------------------------------------------------------------
+
+def bulk_review(user, result_ids: Iterable, action: str, notes: str = "",
+                override_species: Optional[str] = None, override_count: Optional[int] = None) -> Dict:
+    """
+    Approve, reject or override the given pending results in one transaction.
+    Results that are not pending (already reviewed elsewhere) or not visible
+    to the user are skipped. Returns ``{"updated": [...ids], "skipped": [...ids]}``.
+    """
+    if action not in BULK_ACTIONS:
+        raise ValueError(f"Unknown review action '{action}'")
+    if action == "override" and not override_species:
+        raise ValueError("An override needs the corrected species")
+
+    requested = []
+    for pk in result_ids:
+        try:
+            requested.append(str(uuid.UUID(str(pk))))
+        except ValueError:
+            continue
+    requested = list(dict.fromkeys(requested))
+    max_results = get_review_queue_config()["MAX_BULK_RESULTS"]
+    if len(requested) > max_results:
+        raise ValueError(f"At most {max_results} results can be reviewed at once")
+
+    now = timezone.now()
+    with transaction.atomic():
+        results: List[ProcessingResult] = list(
+            pending_results(user).select_for_update(of=("self",)).filter(pk__in=requested)
+        )
+        for result in results:
+            result.reviewed_by = user
+            result.reviewed_at = now
+            result.updated_at = now  # bulk_update skips auto_now
+            if action == "override":
+                result.review_decision = ReviewDecision.OVERRIDDEN
+                result.is_overridden = True
+                result.overridden_species = override_species
+                result.overridden_count = override_count
+                result.override_reason = notes
+            else:
+                result.review_decision = ReviewDecision.APPROVED if action == "approve" else ReviewDecision.REJECTED
+                result.review_notes = notes
+
+        if results:
+            ProcessingResult.objects.bulk_update(
+                results, _OVERRIDE_FIELDS if action == "override" else _REVIEW_FIELDS, batch_size=200
+            )
+            # Reviewed (approved, rejected or overridden) images wait for allocation
+            ImageUpload.objects.filter(
+                pk__in=[result.image_upload_id for result in results]
+            ).update(upload_status=ProcessingStatus.REFLECTED)
+
+    # bulk_update and update() send no post_save signals
+    invalidate_stage_counts()
+    updated = {str(result.pk) for result in results}
+    return {
+        "updated": [pk for pk in requested if pk in updated],
+        "skipped": [pk for pk in requested if pk not in updated],
+    }
@@ -0,0 +1,97 @@
+"""
+GTD stage counters for the image processing dashboards
+
+All stage counts for a scope (everyone, or a single uploader) come from one
+grouped query over ImageUpload LEFT JOIN ProcessingResult and are cached for a
+short time. Any ImageUpload / ProcessingResult save or delete bumps a global
+counter version, which invalidates every cached scope at once.
+"""
+
+from django.core.cache import cache
+from django.db.models import Count
+
+STAGE_COUNTS_TTL = 30  # seconds
+STAGE_COUNTS_VERSION_KEY = "image_processing:stage_counts:version"
+
+ADMIN_ROLES = ["SUPERADMIN", "ADMIN"]
+
+
+def _current_version():
+    version = cache.get(STAGE_COUNTS_VERSION_KEY)
+    if version is None:
+        cache.add(STAGE_COUNTS_VERSION_KEY, 1, None)
+        version = cache.get(STAGE_COUNTS_VERSION_KEY, 1)
+    return version
+
+
+def invalidate_stage_counts():
+    """Invalidate cached counters for every scope (call after bulk updates)"""
+    try:
+        cache.incr(STAGE_COUNTS_VERSION_KEY)
+    except ValueError:
+        cache.set(STAGE_COUNTS_VERSION_KEY, 2, None)
+
+
+def compute_stage_counts(uploaded_by=None):
+    """
+    Count images per GTD stage with a single grouped query.
+
+    Returns a dict with upload status counts (``captured``, ``clarified``,
+    ``organized``, ``reflected_status``, ``engaged_status``), review decision
+    counts (``pending``, ``approved``, ``rejected``, ``overridden``) and the
+    totals ``all`` (images) and ``processed`` (images with a result).
+    """
+    from .models import ImageUpload, ProcessingStatus, ReviewDecision
+
+    uploads = ImageUpload.objects.all()
+    if uploaded_by is not None:
+        uploads = uploads.filter(uploaded_by=uploaded_by)
+
+    rows = (
+        uploads.values_list("upload_status", "processing_result__review_decision")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+
+    by_status = {status: 0 for status in ProcessingStatus.values}
+    by_decision = {decision: 0 for decision in ReviewDecision.values}
+    total = processed = 0
+    for status, decision, n in rows:
+        total += n
+        by_status[status] = by_status.get(status, 0) + n
+        if decision is not None:
+            processed += n
+            by_decision[decision] = by_decision.get(decision, 0) + n
+
+    return {
+        "all": total,
+        "processed": processed,
+        "captured": by_status[ProcessingStatus.CAPTURED],
+        "clarified": by_status[ProcessingStatus.CLARIFIED],
+        "organized": by_status[ProcessingStatus.ORGANIZED],
+        "reflected_status": by_status[ProcessingStatus.REFLECTED],
+        "engaged_status": by_status[ProcessingStatus.ENGAGED],
+        "pending": by_decision[ReviewDecision.PENDING],
+        "approved": by_decision[ReviewDecision.APPROVED],
+        "rejected": by_decision[ReviewDecision.REJECTED],
+        "overridden": by_decision[ReviewDecision.OVERRIDDEN],
+    }
+
+
+def get_stage_counts(user=None):
+    """
+    Cached stage counts for a user's scope. Admins (and ``user=None``) see
+    counts over all images; everyone else sees only their own uploads.
+    """
+    if user is None or getattr(user, "role", None) in ADMIN_ROLES:
+        scope, uploaded_by = "all", None
+    else:
+        scope, uploaded_by = f"user:{user.pk}", user
+
+    key = f"image_processing:stage_counts:{scope}"
+    version = _current_version()
+    counts = cache.get(key, version=version)
+    if counts is None:
+        counts = compute_stage_counts(uploaded_by)
+        cache.set(key, counts, STAGE_COUNTS_TTL, version=version)
+    return counts
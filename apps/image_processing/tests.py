@@ -0,0 +1,1019 @@
+import hashlib
+import io
+import json
+import socket
+import tempfile
+import threading
+import unittest
+import unittest.mock
+import zipfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+
+from apps.fauna.models import Species
+from apps.locations.models import Census, CensusMonth, CensusObservation, CensusYear, Site
+
+from .allocation import SpeciesResolver, UnregisteredSpeciesError, allocate_batch
+from .benchmarking import benchmark_model, default_splits, load_fixtures, percentile, save_benchmark_run
+from .detection_cache import detect_with_cache, difference_hash, hamming_distance
+from .detections import backfill_detections, result_detections, save_detections
+from .inference_concurrency import InferenceAdmission, InferenceQueueFull, plan_concurrency
+from .inference_daemon import InferenceClient, InferenceDaemon, InferenceDaemonUnavailable, get_detection_service
+from .model_registry import ModelRegistry, get_selected_model_path
+from .models import Detection, DetectionCacheEntry, ImageUpload, ModelBenchmarkRun, ProcessingBatch, QuantizedModelVariant, ProcessingResult, ReviewDecision
+from .pipeline_timing import StageTimer, build_histograms, prometheus_exposition
+from .quantization import compare_reports, evaluate_predictions, runtime_model_path
+from .rethreshold import apply_rethreshold, plan_rethreshold
+from .review_queue import bulk_review, review_page
+from .stage_counters import get_stage_counts
+from .tiling import DEFAULT_TILING_CONFIG, shift_detections, should_tile, tile_grid
+
+User = get_user_model()
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def create_upload(user, status="CAPTURED", title="Colony photo"):
+    return ImageUpload.objects.create(
+        title=title,
+        image_file="egret_images/test.jpg",
+        uploaded_by=user,
+        file_size=1024,
+        original_filename="test.jpg",
+        upload_status=status,
+    )
+
+
+def detection(species):
+    return {"species": species, "confidence": 0.9, "bounding_box": [0, 0, 10, 10]}
+
+
+def create_result(upload, decision=ReviewDecision.PENDING, detections=None):
+    detections = detections or []
+    return ProcessingResult.objects.create(
+        image_upload=upload,
+        detected_species="Little_Egret",
+        confidence_score=0.9,
+        bounding_box=[d["bounding_box"] for d in detections],
+        total_detections=len(detections),
+        all_detections=detections,
+        review_decision=decision,
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StageCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            employee_id="ADM001", username="admin", password="pass12345", role="ADMIN"
+        )
+        self.worker = User.objects.create_user(
+            employee_id="FW001", username="worker", password="pass12345", role="FIELD_WORKER"
+        )
+        create_upload(self.worker, "CAPTURED")
+        create_upload(self.admin, "CAPTURED")
+        create_result(create_upload(self.worker, "ORGANIZED"), ReviewDecision.PENDING)
+        create_result(create_upload(self.worker, "REFLECTED"), ReviewDecision.APPROVED)
+        create_result(create_upload(self.admin, "REFLECTED"), ReviewDecision.REJECTED)
+
+    def test_counts_are_scoped_by_role(self):
+        all_counts = get_stage_counts(self.admin)
+        self.assertEqual(all_counts["all"], 5)
+        self.assertEqual(all_counts["captured"], 2)
+        self.assertEqual(all_counts["organized"], 1)
+        self.assertEqual(all_counts["processed"], 3)
+        self.assertEqual(all_counts["pending"], 1)
+        self.assertEqual(all_counts["approved"], 1)
+        self.assertEqual(all_counts["rejected"], 1)
+
+        own_counts = get_stage_counts(self.worker)
+        self.assertEqual(own_counts["all"], 3)
+        self.assertEqual(own_counts["captured"], 1)
+        self.assertEqual(own_counts["rejected"], 0)
+
+    def test_counts_cost_one_query_then_none(self):
+        with self.assertNumQueries(1):
+            get_stage_counts(self.admin)
+        with self.assertNumQueries(0):
+            get_stage_counts(self.admin)
+
+    def test_status_transition_invalidates_cache(self):
+        self.assertEqual(get_stage_counts(self.worker)["captured"], 1)
+
+        upload = ImageUpload.objects.filter(uploaded_by=self.worker, upload_status="CAPTURED").get()
+        upload.start_processing()
+
+        counts = get_stage_counts(self.worker)
+        self.assertEqual(counts["captured"], 0)
+        self.assertEqual(counts["clarified"], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AllocationEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            employee_id="ADM002", username="allocator", password="pass12345", role="ADMIN"
+        )
+        self.little = Species.objects.create(name="LITTLE EGRET", scientific_name="Egretta garzetta", iucn_status="LC")
+        self.great = Species.objects.create(name="GREAT EGRET", scientific_name="Ardea alba", iucn_status="LC")
+        self.chinese = Species.objects.create(name="CHINESE EGRET", scientific_name="Egretta eulophotes", iucn_status="VU")
+        self.site = Site.objects.create(name="Mangrove Flats", coordinates="10.0, 123.0", created_by=self.user)
+        self.month = CensusMonth.objects.create(
+            year=CensusYear.objects.create(site=self.site, year=2025), month=3
+        )
+        self.census = Census.objects.create(month=self.month, census_date="2025-03-10")
+
+    def approved_result(self, *species):
+        upload = create_upload(self.user, "REFLECTED")
+        return create_result(upload, ReviewDecision.APPROVED, [detection(name) for name in species])
+
+    def test_resolver_matches_names_and_egret_fallbacks(self):
+        resolver = SpeciesResolver()
+        self.assertEqual(resolver.resolve("Little Egret").pk, self.little.pk)
+        self.assertEqual(resolver.resolve("ardea alba").pk, self.great.pk)
+        self.assertEqual(resolver.resolve("Swinhoe's Chinese Egret").pk, self.chinese.pk)
+        self.assertIsNone(resolver.resolve("Pacific Reef Heron"))
+
+    def test_batch_groups_counts_and_rolls_up_once(self):
+        CensusObservation.objects.create(
+            census=self.census, species=self.little, species_name="LITTLE EGRET", count=5
+        )
+        results = [
+            self.approved_result("Little Egret", "Little Egret", "Great Egret"),
+            self.approved_result("Little Egret", "Chinese Egret"),
+            self.approved_result("Great Egret"),
+        ]
+        for result in results:
+            result.refresh_from_db()
+
+        summary = allocate_batch([(r, self.census) for r in results], allocated_by=self.user)
+
+        counts = dict(self.census.observations.values_list("species_name", "count"))
+        self.assertEqual(counts, {"LITTLE EGRET": 8, "GREAT EGRET": 2, "CHINESE EGRET": 1})
+        self.assertEqual((summary.observations_created, summary.observations_updated), (2, 1))
+        self.assertEqual(summary.total_birds, 6)
+
+        self.census.refresh_from_db()
+        self.month.refresh_from_db()
+        self.assertEqual((self.census.total_birds, self.census.total_species), (11, 3))
+        self.assertEqual(self.month.total_birds_recorded, 11)
+        self.assertEqual(self.month.year.total_birds_recorded, 11)
+        self.assertFalse(ImageUpload.objects.exclude(upload_status="ENGAGED").exists())
+        self.assertEqual(
+            ProcessingResult.objects.filter(allocated_to_census=self.census, allocated_to_site=self.site).count(), 3
+        )
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        for _ in range(10):
+            self.approved_result("Little Egret", "Great Egret")
+        assignments = [(r, self.census) for r in ProcessingResult.objects.select_related("image_upload")]
+        SpeciesResolver()  # Warm the species map
+
+        # Detection counts, observation lookup, one bulk insert, two bulk status
+        # updates and a single census -> month -> year rollup, however many results
+        with self.assertNumQueries(15):
+            allocate_batch(assignments, allocated_by=self.user)
+
+    def test_unregistered_species_writes_nothing(self):
+        result = self.approved_result("Little Egret", "Pacific Reef Heron")
+        with self.assertRaises(UnregisteredSpeciesError) as ctx:
+            allocate_batch([(result, self.census)], allocated_by=self.user)
+        self.assertEqual(ctx.exception.species_names, ["Pacific Reef Heron"])
+        self.assertFalse(CensusObservation.objects.exists())
+        result.image_upload.refresh_from_db()
+        self.assertEqual(result.image_upload.upload_status, "REFLECTED")
+
+    def test_detection_table_takes_precedence_over_json(self):
+        result = self.approved_result("Little Egret")
+        save_detections(result, [detection("Great Egret"), detection("Great Egret")])
+        allocate_batch([(result, self.census)], allocated_by=self.user)
+        self.assertEqual(dict(self.census.observations.values_list("species_name", "count")), {"GREAT EGRET": 2})
+
+    def test_allocate_view_accepts_multiple_results(self):
+        results = [self.approved_result("Little Egret"), self.approved_result("Great Egret")]
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("image_processing:allocate"),
+            {
+                "result_ids": [str(r.id) for r in results],
+                "site_id": str(self.site.id),
+                "year": "2025",
+                "month": "3",
+                "observation_date": "2025-03-10",
+            },
+        )
+        self.assertRedirects(response, reverse("image_processing:allocate"), fetch_redirect_response=False)
+        self.assertEqual(
+            dict(self.census.observations.values_list("species_name", "count")),
+            {"LITTLE EGRET": 1, "GREAT EGRET": 1},
+        )
+
+
+class FakeDetectionService:
+    """Stands in for BirdDetectionService: one detection per image, named after its bytes"""
+
+    device = "cpu"
+    model_path = "fake.pt"
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_birds_batch(self, images):
+        self.batch_sizes.append(len(images))
+        return [
+            {"success": True, "detections": [{"species": data.decode()}], "total_detections": 1, "filename": filename}
+            for data, filename in images
+        ]
+
+    def get_model_info(self):
+        return {"model_path": self.model_path, "device": self.device}
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets not available")
+class InferenceDaemonTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.socket_path = str(Path(tmp.name) / "inference.sock")
+        self.service = FakeDetectionService()
+        self.daemon = InferenceDaemon(self.service, self.socket_path, max_batch_size=8, max_batch_wait_ms=200)
+        self.daemon.start()
+        self.addCleanup(self.daemon.stop)
+
+    def test_client_keeps_detect_birds_contract(self):
+        client = InferenceClient(self.socket_path, timeout=5)
+        self.assertTrue(client.is_available())
+        self.assertEqual(client.model_path, "fake.pt")
+
+        result = client.detect_birds(b"Little Egret", "colony.jpg")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["detections"], [{"species": "Little Egret"}])
+        self.assertEqual(result["filename"], "colony.jpg")
+
+    def test_concurrent_requests_are_micro_batched(self):
+        client = InferenceClient(self.socket_path, timeout=5)
+        results = {}
+
+        def detect(i):
+            results[i] = client.detect_birds(f"bird-{i}".encode(), f"{i}.jpg")
+
+        threads = [threading.Thread(target=detect, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({i: r["detections"][0]["species"] for i, r in results.items()},
+                         {i: f"bird-{i}" for i in range(6)})
+        self.assertEqual(sum(self.service.batch_sizes), 6)
+        self.assertLess(len(self.service.batch_sizes), 6)
+
+    def test_detection_service_uses_running_daemon(self):
+        config = {"ENABLED": True, "SOCKET_PATH": self.socket_path}
+        with override_settings(INFERENCE_DAEMON=config):
+            service = get_detection_service()
+            self.assertTrue(service.is_available())
+            self.assertEqual(service.detect_birds(b"Great Egret")["detections"][0]["species"], "Great Egret")
+
+        self.daemon.stop()
+        with override_settings(INFERENCE_DAEMON=dict(config, FALLBACK_IN_PROCESS=False)):
+            with self.assertRaises(InferenceDaemonUnavailable):
+                get_detection_service()
+
+
+class FakeModel:
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+
+class ModelRegistryTests(TestCase):
+    MB = 1024 * 1024
+
+    def setUp(self):
+        self.loads = []
+        self.release_load = threading.Event()
+        self.release_load.set()
+
+        def loader(path, backend, device):
+            self.release_load.wait(5)
+            self.loads.append(path)
+            return FakeModel(path, 0)
+
+        self.registry = ModelRegistry(memory_budget_bytes=100 * self.MB, loader=loader)
+
+    def load(self, path, mb):
+        with unittest.mock.patch(
+            "apps.image_processing.model_registry.estimate_model_memory", return_value=mb * self.MB
+        ):
+            return self.registry.get(path, "ultralytics", "cpu")
+
+    def test_models_are_loaded_once_per_key(self):
+        first = self.load("a.pt", 10)
+        self.assertIs(self.load("a.pt", 10), first)
+        self.load("a.pt", 10)
+        self.assertEqual(self.loads, ["a.pt"])
+        self.assertEqual(first.uses, 3)
+
+    def test_least_recently_used_model_is_evicted_over_budget(self):
+        self.load("a.pt", 40)
+        self.load("b.pt", 40)
+        self.load("a.pt", 40)  # b is now least recently used
+        self.load("c.pt", 40)
+        self.assertTrue(self.registry.is_loaded("a.pt", "ultralytics", "cpu"))
+        self.assertFalse(self.registry.is_loaded("b.pt", "ultralytics", "cpu"))
+        self.assertEqual(self.registry.evictions, 1)
+
+    def test_active_model_is_never_evicted(self):
+        self.load("a.pt", 60)
+        self.registry.activate("a.pt", "ultralytics", "cpu")
+        self.load("b.pt", 60)
+        self.assertTrue(self.registry.is_loaded("a.pt", "ultralytics", "cpu"))
+        self.assertEqual(self.registry.active_key, ("a.pt", "ultralytics", "cpu"))
+
+    def test_activate_warms_in_background_before_swapping(self):
+        self.load("a.pt", 10)
+        self.registry.activate("a.pt", "ultralytics", "cpu")
+
+        self.release_load.clear()
+        thread = self.registry.activate("b.pt", "ultralytics", "cpu", background=True)
+        self.assertTrue(self.registry.is_warming("b.pt", "ultralytics", "cpu"))
+        self.assertEqual(self.registry.active_key[0], "a.pt")
+        self.assertTrue(any(s.get("warming") for s in self.registry.stats()))
+
+        self.release_load.set()
+        thread.join(5)
+        self.assertEqual(self.registry.active_key[0], "b.pt")
+        stats = {s["path"]: s for s in self.registry.stats()}
+        self.assertTrue(stats["b.pt"]["active"])
+        self.assertIn("load_seconds", stats["b.pt"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ModelSelectionViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            employee_id="ADM003", username="modeladmin", password="pass12345", role="ADMIN"
+        )
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = Path(tmp.name)
+        (self.base_dir / "models" / "egret_v2").mkdir(parents=True)
+        (self.base_dir / "models" / "egret_v2" / "best.pt").write_bytes(b"weights")
+
+    def test_admin_selects_model_for_all_workers(self):
+        self.client.force_login(self.admin)
+        with override_settings(BASE_DIR=self.base_dir):
+            response = self.client.post(reverse("image_processing:model_selection"), {"model_name": "egret_v2"})
+            self.assertRedirects(response, reverse("image_processing:model_selection"), fetch_redirect_response=False)
+            self.assertEqual(get_selected_model_path(), str(self.base_dir / "models" / "egret_v2" / "best.pt"))
+
+            response = self.client.get(reverse("image_processing:model_selection"))
+        self.assertEqual(response.context["current_model"], "egret_v2")
+
+
+def box(width, height, x=0, y=0):
+    return {"species": "Little Egret", "confidence": 0.8,
+            "bounding_box": {"x": x, "y": y, "width": width, "height": height}}
+
+
+class TilingTests(unittest.TestCase):
+    def test_grid_covers_image_with_overlap(self):
+        grid = tile_grid(6000, 4000, 640, 0.2, max_tiles=500)
+        covered_x = {x + w for x, _, w, _ in grid}
+        covered_y = {y + h for _, y, _, h in grid}
+        self.assertEqual(max(covered_x), 6000)
+        self.assertEqual(max(covered_y), 4000)
+        xs = sorted({x for x, _, _, _ in grid})
+        self.assertTrue(all(b - a < 640 for a, b in zip(xs, xs[1:])))
+        self.assertTrue(all(w == 640 and h == 640 for _, _, w, h in grid))
+
+    def test_grid_grows_tiles_to_respect_max_tiles(self):
+        grid = tile_grid(6000, 4000, 640, 0.2, max_tiles=48)
+        self.assertLessEqual(len(grid), 48)
+        self.assertGreater(grid[0][2], 640)
+
+    def test_small_image_is_a_single_tile(self):
+        self.assertEqual(tile_grid(500, 400, 640, 0.2, 48), [(0, 0, 500, 400)])
+
+    def test_adaptive_policy(self):
+        adaptive = dict(DEFAULT_TILING_CONFIG, MODE="adaptive")
+        self.assertFalse(should_tile(adaptive, (1920, 1080), [box(80, 60)]))
+        self.assertTrue(should_tile(adaptive, (1920, 1080), [box(80, 60), box(12, 9)]))
+        self.assertTrue(should_tile(adaptive, (6000, 4000), []))
+        self.assertFalse(should_tile(DEFAULT_TILING_CONFIG, (6000, 4000), [box(5, 5)]))
+        self.assertTrue(should_tile(dict(DEFAULT_TILING_CONFIG, MODE="always"), (640, 480), []))
+
+    def test_tile_boxes_are_shifted_to_image_coordinates(self):
+        shifted = shift_detections([box(50, 40, x=600, y=10)], (1024, 512, 640, 640))
+        self.assertEqual(shifted[0]["bounding_box"], {"x": 1624, "y": 522, "width": 40, "height": 40})
+
+
+def png_bytes(size=(120, 80), color=(30, 120, 200)):
+    image = Image.new("RGB", size, color)
+    for x in range(0, size[0], 10):
+        for y in range(size[1]):
+            image.putpixel((x, y), (255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def gradient_png():
+    image = Image.new("L", (64, 64))
+    image.putdata([(x * 4) if y < 32 else 255 - x * 4 for y in range(64) for x in range(64)])
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class CountingDetectionService:
+    model_path = "missing-model.pt"
+    confidence_threshold = 0.25
+
+    def __init__(self, detections=None):
+        self.calls = 0
+        self.detections = detections or []
+
+    def is_available(self):
+        return True
+
+    def detect_birds(self, image_data, filename="unknown"):
+        self.calls += 1
+        return {"success": True, "detections": self.detections, "total_detections": len(self.detections),
+                "primary_species": None,
+                "primary_confidence": 0.0, "model_used": "missing-model.pt", "device_used": "cpu",
+                "timings": {"decode": 2.0, "preprocess": 3.0, "inference": 40.0, "postprocess": 1.5}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DetectionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media = override_settings(MEDIA_ROOT=tmp.name)
+        self.media.enable()
+        self.addCleanup(self.media.disable)
+        self.user = User.objects.create_user(
+            employee_id="FW002", username="uploader", password="pass12345", role="ADMIN"
+        )
+        self.content = png_bytes()
+
+    def upload(self, title="Colony", content=None):
+        self.client.force_login(self.user)
+        return self.client.post(reverse("image_processing:upload"), {
+            "title": title,
+            "image_file": SimpleUploadedFile("colony.png", content or self.content, content_type="image/png"),
+        })
+
+    def test_upload_records_content_hash_while_streaming(self):
+        self.upload()
+        upload = ImageUpload.objects.get()
+        self.assertEqual(upload.content_sha256, hashlib.sha256(self.content).hexdigest())
+
+    def test_duplicate_upload_reuses_cached_detections(self):
+        self.upload("Phone copy")
+        response = self.upload("Laptop copy")
+        self.assertIn("already uploaded", " ".join(str(m) for m in response.wsgi_request._messages))
+
+        service = CountingDetectionService()
+        first, second = ImageUpload.objects.order_by("uploaded_at")
+        self.assertTrue(detect_with_cache(first, service)["success"])
+        cached = detect_with_cache(second, service)
+        self.assertEqual(service.calls, 1)
+        self.assertTrue(cached["cache_hit"])
+        self.assertEqual(DetectionCacheEntry.objects.get().hit_count, 1)
+
+        service.confidence_threshold = 0.5
+        detect_with_cache(second, service)
+        self.assertEqual(service.calls, 2)
+
+    def test_perceptual_hash_matches_resized_copy(self):
+        original = difference_hash(io.BytesIO(png_bytes((400, 300))))
+        resized = difference_hash(io.BytesIO(png_bytes((200, 150))))
+        different = difference_hash(io.BytesIO(gradient_png()))
+        self.assertLessEqual(hamming_distance(original, resized), 6)
+        self.assertGreater(hamming_distance(original, different), 6)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, BULK_UPLOAD={"MAX_FILE_SIZE": 64 * 1024})
+class BulkUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media_root = Path(tmp.name)
+        self.media = override_settings(MEDIA_ROOT=tmp.name)
+        self.media.enable()
+        self.addCleanup(self.media.disable)
+        self.user = User.objects.create_user(
+            employee_id="FW004", username="bulk", password="pass12345", role="ADMIN"
+        )
+        self.client.force_login(self.user)
+
+    def archive(self, members):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, content in members.items():
+                archive.writestr(name, content)
+        return SimpleUploadedFile("survey.zip", buffer.getvalue(), content_type="application/zip")
+
+    def test_files_and_archive_members_become_one_batch(self):
+        loose = png_bytes()
+        member = gradient_png()
+        response = self.client.post(reverse("image_processing:bulk_upload"), {
+            "files": [
+                SimpleUploadedFile("loose.png", loose, content_type="image/png"),
+                self.archive({
+                    "day1/heron.png": member,
+                    "day1/notes.txt": b"tide was low",
+                    "day1/fake.jpg": b"not really a jpeg",
+                    "__MACOSX/day1/._heron.png": b"resource fork",
+                }),
+            ],
+            "site_hint": "Olango",
+            "batch_name": "Survey 1",
+        })
+        self.assertRedirects(response, reverse("image_processing:dashboard"), fetch_redirect_response=False)
+
+        batch = ProcessingBatch.objects.get()
+        self.assertEqual(batch.name, "Survey 1")
+        self.assertEqual(batch.total_images, 2)
+        self.assertEqual(batch.status, "QUEUED")
+        uploads = {u.original_filename: u for u in batch.images.all()}
+        self.assertEqual(set(uploads), {"loose.png", "heron.png"})
+        self.assertEqual(uploads["heron.png"].content_sha256, hashlib.sha256(member).hexdigest())
+        self.assertEqual(uploads["heron.png"].file_size, len(member))
+        self.assertEqual(uploads["loose.png"].site_hint, "Olango")
+        with uploads["heron.png"].image_file.open("rb") as f:
+            self.assertEqual(f.read(), member)
+
+        skipped = " ".join(str(m) for m in response.wsgi_request._messages)
+        self.assertIn("notes.txt", skipped)
+        self.assertIn("fake.jpg", skipped)
+        self.assertEqual(get_stage_counts(self.user)["captured"], 2)
+
+    def test_oversized_members_are_rejected_without_leftovers(self):
+        buffer = io.BytesIO()
+        Image.effect_noise((400, 400), 100).save(buffer, format="PNG")  # Noise does not compress
+        big = buffer.getvalue()
+        self.assertGreater(len(big), 64 * 1024)
+
+        response = self.client.post(
+            reverse("image_processing:bulk_upload"),
+            {"files": [self.archive({"huge.png": big})]},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["rejected"][0]["file"], "huge.png")
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(ProcessingBatch.objects.exists())
+        self.assertFalse(any(path.is_file() for path in self.media_root.rglob("*")))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DetectionTableTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user(
+            employee_id="FW006", username="detector", password="pass12345", role="ADMIN"
+        )
+
+    def test_processing_writes_detection_rows(self):
+        from .views import process_image_with_ai
+
+        service = CountingDetectionService([
+            {"id": 0, "species": "Chinese Egret", "confidence": 0.82, "bounding_box": {"x": 10, "y": 20, "width": 30, "height": 40}},
+            {"id": 1, "species": "Little Egret", "confidence": 0.41, "bounding_box": {"x": 50, "y": 60, "width": 25, "height": 25}},
+        ])
+        upload = ImageUpload.objects.create(
+            title="Colony", image_file=SimpleUploadedFile("colony.png", png_bytes(), content_type="image/png"),
+            original_filename="colony.png", file_size=100, uploaded_by=self.user,
+        )
+        with unittest.mock.patch("apps.image_processing.inference_daemon.get_detection_service", return_value=service):
+            result = process_image_with_ai(upload)
+
+        rows = list(Detection.objects.filter(result=result))
+        self.assertEqual([(d.species, d.x, d.height) for d in rows], [("Chinese Egret", 10, 40), ("Little Egret", 50, 25)])
+        self.assertEqual(
+            list(Detection.objects.filter(species="Chinese Egret", confidence__gte=0.6).values_list("result", flat=True)),
+            [result.pk],
+        )
+        self.assertEqual(result_detections(result)[1]["bounding_box"], {"x": 50, "y": 60, "width": 25, "height": 25})
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("image_processing:image_with_bbox", args=[result.pk]))
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        with Image.open(io.BytesIO(response.content)) as rendered:
+            red, green, _ = rendered.getpixel((9, 45))  # Left edge of the first box
+            self.assertGreater(red - green, 80)
+
+    def test_backfill_converts_json_once(self):
+        create_result(create_upload(self.user), detections=[detection("Little Egret"), detection("Great Egret")])
+        legacy = ProcessingResult.objects.create(
+            image_upload=create_upload(self.user), detected_species="Great_Egret", confidence_score=0.7,
+            bounding_box={"x": 1.6, "y": 2, "width": 30, "height": 40}, total_detections=1,
+        )
+        create_result(create_upload(self.user))  # Nothing detected
+
+        self.assertEqual(backfill_detections(batch_size=1), 3)
+        self.assertEqual(backfill_detections(), 0)
+        row = Detection.objects.get(result=legacy)
+        self.assertEqual((row.species, row.x, row.width), ("Great_Egret", 2, 30))
+        self.assertAlmostEqual(row.confidence, 0.7)
+
+
+def raw_box(species, confidence, x, y, size=100):
+    return {"species": species, "confidence": confidence, "bounding_box": {"x": x, "y": y, "width": size, "height": size}}
+
+
+class RethresholdTests(TestCase):
+    RAW = [
+        raw_box("Chinese Egret", 0.9, 0, 0),
+        raw_box("Chinese Egret", 0.5, 5, 5),  # Same bird, suppressed by NMS
+        raw_box("Little Egret", 0.3, 300, 300),
+        raw_box("Great Egret", 0.1, 600, 600),
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            employee_id="FW007", username="thresholds", password="pass12345", role="ADMIN"
+        )
+
+    def stored_result(self, raw, decision=ReviewDecision.PENDING, threshold=0.25):
+        result = ProcessingResult.objects.create(
+            image_upload=create_upload(self.user), detected_species="UNKNOWN", confidence_score=0,
+            bounding_box=[], total_detections=0, review_decision=decision,
+            raw_confidence_floor=0.05, applied_confidence_threshold=threshold,
+        )
+        save_detections(result, raw, raw=True)
+        # The stored (filtered) state is built with the engine itself
+        plan = plan_rethreshold(threshold, queryset=ProcessingResult.objects.filter(pk=result.pk))
+        apply_rethreshold(plan)
+        result.refresh_from_db()
+        return result
+
+    def test_plan_is_dry_run_until_applied(self):
+        result = self.stored_result(self.RAW)
+        self.assertEqual((result.detected_species, result.total_detections), ("1 Chinese Egret, 1 Little Egret", 2))
+        unchanged = self.stored_result([raw_box("Chinese Egret", 0.95, 0, 0)])
+        self.stored_result([raw_box("Little Egret", 0.3, 0, 0)], decision=ReviewDecision.APPROVED)
+
+        plan = plan_rethreshold(0.35)
+        report = plan.report()
+        self.assertEqual((report["evaluated"], report["changed"]), (2, 1))
+        self.assertEqual(report["species_delta"], {"Little Egret": {"before": 1, "after": 0, "delta": -1}})
+        self.assertEqual(report["changes"][0]["after"]["detected_species"], "1 Chinese Egret")
+        self.assertEqual(ProcessingResult.objects.get(pk=result.pk).total_detections, 2)
+
+        self.assertEqual(apply_rethreshold(plan), 1)
+        result.refresh_from_db()
+        self.assertEqual((result.detected_species, result.total_detections), ("1 Chinese Egret", 1))
+        self.assertAlmostEqual(float(result.confidence_score), 0.9)
+        self.assertEqual(result.applied_confidence_threshold, 0.35)
+        self.assertEqual(list(result.detections.filter(is_raw=False).values_list("species", flat=True)), ["Chinese Egret"])
+        self.assertEqual(result.detections.filter(is_raw=True).count(), 4)
+        self.assertEqual(ProcessingResult.objects.get(pk=unchanged.pk).applied_confidence_threshold, 0.25)
+
+        # Lowering the threshold brings the faint detection back; NMS still merges the duplicate
+        apply_rethreshold(plan_rethreshold(0.08))
+        result.refresh_from_db()
+        self.assertEqual(result.detected_species, "1 Chinese Egret, 1 Little Egret, 1 Great Egret")
+
+    def test_processing_stores_raw_rows_and_command_reports(self):
+        from .views import process_image_with_ai
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        with override_settings(MEDIA_ROOT=tmp.name):
+            upload = ImageUpload.objects.create(
+                title="Colony", image_file=SimpleUploadedFile("colony.png", png_bytes(), content_type="image/png"),
+                original_filename="colony.png", file_size=100, uploaded_by=self.user,
+            )
+        service = CountingDetectionService([dict(self.RAW[0], id=0), dict(self.RAW[2], id=1)])
+        detect_birds = service.detect_birds
+        service.detect_birds = lambda *args: dict(
+            detect_birds(*args), confidence_threshold=0.25, nms_iou=0.45,
+            raw_confidence_floor=0.05, raw_detections=self.RAW,
+        )
+        with override_settings(MEDIA_ROOT=tmp.name), unittest.mock.patch(
+            "apps.image_processing.inference_daemon.get_detection_service", return_value=service
+        ):
+            result = process_image_with_ai(upload)
+        self.assertEqual(result.detections.filter(is_raw=True).count(), 4)
+        self.assertEqual(result.detections.filter(is_raw=False).count(), 2)
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as report:
+            out = io.StringIO()
+            call_command("rethreshold_results", "--confidence", "0.6", "--report", report.name, stdout=out)
+            self.assertIn("1 would change", out.getvalue())
+            self.assertEqual(json.loads(Path(report.name).read_text())["changes"][0]["result_id"], str(result.pk))
+        self.assertEqual(result.detections.filter(is_raw=False).count(), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ReviewQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            employee_id="ADM005", username="reviewer", password="pass12345", role="ADMIN"
+        )
+        self.worker = User.objects.create_user(
+            employee_id="FW005", username="counter", password="pass12345", role="FIELD_WORKER"
+        )
+
+    def pending(self, count, user=None):
+        return [create_result(create_upload(user or self.worker, "ORGANIZED")) for _ in range(count)]
+
+    def test_keyset_pages_cover_the_queue_once(self):
+        self.pending(5)
+        seen = []
+        page = review_page(self.admin, page_size=2)
+        while True:
+            seen += [r.pk for r in page["results"]]
+            if not page["next_cursor"]:
+                break
+            page = review_page(self.admin, after=page["next_cursor"], page_size=2)
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+        # Reviewing the first page does not shift the later pages
+        first = review_page(self.admin, page_size=2)
+        bulk_review(self.admin, [r.pk for r in first["results"]], "approve")
+        second = review_page(self.admin, after=first["next_cursor"], page_size=2)
+        self.assertEqual([r.pk for r in second["results"]], seen[2:4])
+
+        self.assertEqual(len(review_page(self.worker)["results"]), 3)
+        with self.assertRaises(ValueError):
+            review_page(self.admin, after="not-a-cursor")
+
+    def test_bulk_action_is_one_transaction_of_constant_queries(self):
+        self.client.force_login(self.admin)
+
+        def approve(results):
+            return self.client.post(reverse("image_processing:review_bulk"), {
+                "action": "approve", "result_ids": [str(r.pk) for r in results], "notes": "Checked",
+            }, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+        approve(self.pending(1))  # Warm up sessions and permissions
+        small, large = self.pending(2), self.pending(8)
+        with CaptureQueriesContext(connection) as small_queries:
+            approve(small)
+        with CaptureQueriesContext(connection) as large_queries:
+            response = approve(large + small[:1])
+        self.assertEqual(len(small_queries), len(large_queries))
+
+        body = response.json()
+        self.assertEqual(len(body["updated"]), 8)
+        self.assertEqual(body["skipped"], [str(small[0].pk)])
+        result = ProcessingResult.objects.select_related("image_upload").get(pk=large[0].pk)
+        self.assertEqual(result.review_decision, ReviewDecision.APPROVED)
+        self.assertEqual(result.reviewed_by, self.admin)
+        self.assertEqual(result.review_notes, "Checked")
+        self.assertEqual(result.image_upload.upload_status, "REFLECTED")
+        self.assertEqual(get_stage_counts(self.admin)["approved"], 11)
+
+    def test_bulk_override_keeps_ai_counts_unless_given(self):
+        results = self.pending(2)
+        other = self.pending(1, user=self.admin)[0]
+        outcome = bulk_review(
+            self.worker, [r.pk for r in results] + [other.pk], "override",
+            notes="Cattle egrets", override_species="Western_Cattle_Egret",
+        )
+        self.assertEqual(outcome["skipped"], [str(other.pk)])  # Not the worker's upload
+        result = ProcessingResult.objects.get(pk=results[0].pk)
+        self.assertTrue(result.is_overridden)
+        self.assertEqual(result.final_species, "Western_Cattle_Egret")
+        self.assertEqual(result.final_count, result.total_detections)
+        self.assertEqual(result.override_reason, "Cattle egrets")
+
+
+class FakeBenchmarkModel:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, batch, device="cpu", verbose=False):
+        self.batches.append(len(batch))
+        return [None] * len(batch)
+
+
+class ModelBenchmarkTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.fixture_dir = Path(tmp.name)
+        for i in range(3):
+            (self.fixture_dir / f"colony_{i}.png").write_bytes(png_bytes())
+        self.user = User.objects.create_user(
+            employee_id="FW003", username="bench", password="pass12345", role="ADMIN"
+        )
+
+    def test_percentile_interpolates(self):
+        self.assertEqual(percentile([10, 20, 30, 40, 50], 50), 30)
+        self.assertAlmostEqual(percentile([10, 20], 95), 19.5)
+
+    def test_benchmark_model_measures_latency_and_throughput(self):
+        model = FakeBenchmarkModel()
+        fixtures = load_fixtures(str(self.fixture_dir), image_size=64)
+        result = benchmark_model(
+            "models/egret/best.pt", "pytorch", fixtures, batch_sizes=[1, 4], warm_iterations=5,
+            throughput_images=8, loader=lambda path, backend, device: model,
+        )
+
+        self.assertEqual(result["fixture_count"], 3)
+        self.assertEqual(set(result["throughput"]), {"1", "4"})
+        self.assertLessEqual(result["latency_p50_ms"], result["latency_p99_ms"])
+        # Cold call, 5 warm calls, then a warmup plus 8 images per batch size
+        self.assertEqual(model.batches, [1] * 6 + [1] * 9 + [4] * 3)
+
+        save_benchmark_run("egret_500_model", result)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("image_processing:benchmark_models"))
+        self.assertContains(response, "egret_500_model")
+        self.assertContains(response, "Batch 4")
+
+    def test_command_records_failed_runs(self):
+        model_file = self.fixture_dir / "broken.pt"
+        model_file.write_bytes(b"not a model")
+        call_command(
+            "benchmark_models", "--model", str(model_file), "--fixtures", str(self.fixture_dir),
+            "--in-process", stdout=io.StringIO(),
+        )
+        run = ModelBenchmarkRun.objects.get()
+        self.assertEqual(run.status, ModelBenchmarkRun.Status.FAILED)
+        self.assertEqual(run.backend, "pytorch")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PipelineTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        media = override_settings(MEDIA_ROOT=tmp.name)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.user = User.objects.create_user(
+            employee_id="FW004", username="timer", password="pass12345", role="ADMIN"
+        )
+        self.upload = ImageUpload.objects.create(
+            title="Colony",
+            image_file=SimpleUploadedFile("colony.png", png_bytes(), content_type="image/png"),
+            original_filename="colony.png",
+            file_size=100,
+            uploaded_by=self.user,
+        )
+
+    def test_stage_timer_accumulates_spans(self):
+        timer = StageTimer({"inference": 10.0})
+        with timer.span("persist"):
+            pass
+        timer.add("inference", 5.0)
+        self.assertEqual(list(timer.as_dict()), ["inference", "persist"])
+        self.assertEqual(timer.timings["inference"], 15.0)
+
+    def test_processing_stores_stage_timings(self):
+        from .views import process_image_with_ai
+
+        service = CountingDetectionService()
+        with unittest.mock.patch("apps.image_processing.inference_daemon.get_detection_service", return_value=service):
+            result = process_image_with_ai(self.upload)
+
+        result.refresh_from_db()
+        self.assertEqual(
+            set(result.stage_timings), {"read", "decode", "preprocess", "inference", "postprocess", "persist"}
+        )
+        self.assertEqual(result.stage_timings["inference"], 40.0)
+        self.assertEqual(str(result.inference_time), "0.040")
+
+    def test_histograms_and_metrics_endpoint(self):
+        histograms = build_histograms([{"inference": 40.0, "read": 1.0}, {"inference": 300.0}])
+        inference = next(s for s in histograms["stages"] if s["stage"] == "inference")
+        self.assertEqual(inference["count"], 2)
+        self.assertEqual(sum(b["count"] for b in inference["buckets"]), 2)
+        self.assertIn(
+            'avicast_detection_stage_seconds_bucket{stage="inference",le="0.05"} 1',
+            prometheus_exposition(histograms),
+        )
+
+        ProcessingResult.objects.create(
+            image_upload=self.upload, detected_species="UNKNOWN", confidence_score=0,
+            bounding_box=[], stage_timings={"inference": 40.0},
+        )
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("image_processing:pipeline_metrics"))
+        self.assertEqual(response.json()["samples"], 1)
+        self.assertIn("utilization", response.json()["admission"])
+        response = self.client.get(reverse("image_processing:pipeline_metrics"), {"format": "prometheus"})
+        self.assertContains(response, 'avicast_detection_stage_seconds_count{stage="inference"} 1')
+
+
+class InferenceConcurrencyTests(unittest.TestCase):
+    def test_plan_splits_cores_between_replicas(self):
+        config = {"CPU_CORES": None, "REPLICAS": None, "THREADS_PER_REPLICA": None,
+                  "INTEROP_THREADS": 1, "OPENCV_THREADS": 1}
+        self.assertEqual(plan_concurrency(cores=8, replicas=2, config=config).threads_per_replica, 4)
+        plan = plan_concurrency(cores=8, threads=3, config=config)
+        self.assertEqual((plan.replicas, plan.threads_per_replica), (2, 3))
+        self.assertEqual(plan_concurrency(cores=8, replicas=16, config=config).threads_per_replica, 1)
+        self.assertEqual(default_splits(8), [(1, 8), (2, 4), (4, 2), (8, 1)])
+
+    def test_admission_queues_then_rejects(self):
+        admission = InferenceAdmission(slots=1, max_queue=1, timeout=5)
+        holding, release = threading.Event(), threading.Event()
+        waits = []
+
+        def hold():
+            with admission.slot():
+                holding.set()
+                release.wait(5)
+
+        def queued():
+            with admission.slot() as wait_ms:
+                waits.append(wait_ms)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        holding.wait(5)
+        waiter = threading.Thread(target=queued)
+        waiter.start()
+        while admission.waiting == 0:
+            threading.Event().wait(0.005)
+
+        with self.assertRaises(InferenceQueueFull):
+            with admission.slot():
+                pass
+
+        release.set()
+        holder.join(5)
+        waiter.join(5)
+        stats = admission.stats()
+        self.assertEqual((stats["admitted"], stats["rejected"], stats["in_flight"]), (2, 1, 0))
+        self.assertGreater(waits[0], 0)
+        self.assertGreater(stats["utilization"], 0)
+
+
+class QuantizationGuardTests(TestCase):
+    def test_evaluation_scores_map_and_recall(self):
+        ground_truth = {
+            "a.jpg": [("Little Egret", (0, 0, 10, 10)), ("Little Egret", (20, 20, 30, 30))],
+            "b.jpg": [("Great Egret", (0, 0, 50, 50))],
+        }
+        predictions = {
+            "a.jpg": [
+                ("Little Egret", 0.9, (0, 0, 10, 10)),
+                ("Little Egret", 0.5, (40, 40, 50, 50)),  # false positive
+                ("Little Egret", 0.1, (20, 20, 30, 31)),  # below the operating threshold
+            ],
+            "b.jpg": [],
+        }
+        report = evaluate_predictions(predictions, ground_truth, recall_confidence=0.25)
+        self.assertEqual(report["species"]["Little Egret"]["recall"], 0.5)
+        self.assertEqual(report["species"]["Great Egret"]["ap50"], 0.0)
+        self.assertAlmostEqual(report["species"]["Little Egret"]["ap50"], 0.8333, places=3)
+
+        degraded = {"map50": report["map50"], "species": dict(report["species"])}
+        degraded["species"]["Little Egret"] = dict(report["species"]["Little Egret"], recall=0.3)
+        failures = compare_reports(report, degraded, map_tolerance=0.02, recall_tolerance=0.05)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("Little Egret recall", failures[0])
+
+    def test_only_validated_variants_of_the_current_model_are_served(self):
+        from .detection_cache import model_identity
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        fp32 = Path(tmp.name) / "best.pt"
+        int8 = Path(tmp.name) / "best.int8.onnx"
+        fp32.write_bytes(b"fp32")
+        int8.write_bytes(b"int8")
+        variant = QuantizedModelVariant.objects.create(
+            source_path=str(fp32), source_identity=model_identity(str(fp32)), variant_path=str(int8),
+            method="onnx", status=QuantizedModelVariant.Status.REJECTED, map_tolerance=0.02, recall_tolerance=0.05,
+        )
+
+        with override_settings(BIRD_MODEL_QUANTIZATION={"USE_INT8_ON_CPU": True}):
+            self.assertEqual(runtime_model_path(str(fp32), "cpu"), str(fp32))
+            variant.status = QuantizedModelVariant.Status.VALIDATED
+            variant.save()
+            self.assertEqual(runtime_model_path(str(fp32), "cpu"), str(int8))
+            self.assertEqual(runtime_model_path(str(fp32), "cuda:0"), str(fp32))
+
+        self.assertEqual(runtime_model_path(str(fp32), "cpu"), str(fp32))
@@ -0,0 +1,117 @@
+"""
+Sliced (tiled) inference helpers for high-resolution colony photos
+
+The regular pass squeezes the whole upload into one 640x640 model input, so
+distant egrets in a 6000x4000 colony shot end up a few pixels wide. Tiled mode
+cuts the image at native resolution into overlapping tiles, sends all tiles of
+the image through the model as one batch, shifts the tile boxes back into
+image coordinates and merges everything (including the coarse pass) with
+cross-tile NMS.
+
+Tiling is opt-in (BIRD_DETECTION_TILING["MODE"]):
+- "off": single pass only (default)
+- "adaptive": tile only when the coarse pass finds small boxes or the image
+  exceeds SIZE_THRESHOLD pixels on its long side
+- "always": tile every image
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from django.conf import settings
+from PIL import Image
+
+DEFAULT_TILING_CONFIG = {
+    "MODE": "off",
+    "TILE_SIZE": 640,  # native pixels per tile side
+    "OVERLAP": 0.2,  # fraction of the tile shared with its neighbour
+    "MAX_TILES": 48,  # tiles grow beyond TILE_SIZE to stay under this count
+    "SIZE_THRESHOLD": 4000,  # adaptive: tile images with a longer side (px)
+    "SMALL_BOX_PX": 24,  # adaptive: tile when a coarse box is smaller (model px)
+    "NMS_IOU": 0.45,
+}
+
+TILING_MODES = ("off", "adaptive", "always")
+
+
+def get_tiling_config() -> Dict:
+    config = dict(DEFAULT_TILING_CONFIG)
+    config.update(getattr(settings, "BIRD_DETECTION_TILING", {}))
+    if config["MODE"] not in TILING_MODES:
+        raise ValueError(f"BIRD_DETECTION_TILING MODE must be one of {TILING_MODES}, got {config['MODE']!r}")
+    return config
+
+
+def should_tile(config: Dict, image_size: Tuple[int, int], coarse_detections: List[Dict]) -> bool:
+    """
+    Tiling policy. ``coarse_detections`` are the coarse pass boxes in model
+    input space (before the transform back to the original image).
+    """
+    mode = config["MODE"]
+    if mode == "always":
+        return True
+    if mode != "adaptive":
+        return False
+    if max(image_size) >= config["SIZE_THRESHOLD"]:
+        return True
+    small = config["SMALL_BOX_PX"]
+    return any(
+        min(d["bounding_box"]["width"], d["bounding_box"]["height"]) < small
+        for d in coarse_detections
+    )
+
+
+def _origins(length: int, tile: int, stride: int) -> List[int]:
+    if length <= tile:
+        return [0]
+    origins = list(range(0, length - tile, stride))
+    origins.append(length - tile)  # Last tile flush with the edge
+    return origins
+
+
+def tile_grid(width: int, height: int, tile_size: int, overlap: float, max_tiles: int) -> List[Tuple[int, int, int, int]]:
+    """
+    (x, y, width, height) of overlapping tiles covering the image. The tile
+    size grows until the grid fits within ``max_tiles``.
+    """
+    overlap = min(max(overlap, 0.0), 0.9)
+    tile = max(32, int(tile_size))
+    while True:
+        stride = max(1, int(tile * (1 - overlap)))
+        xs = _origins(width, tile, stride)
+        ys = _origins(height, tile, stride)
+        if len(xs) * len(ys) <= max_tiles or tile >= max(width, height):
+            break
+        tile = int(math.ceil(tile * 1.25))
+    return [(x, y, min(tile, width), min(tile, height)) for y in ys for x in xs]
+
+
+def extract_tiles(image_array: np.ndarray, grid: List[Tuple[int, int, int, int]]) -> List[np.ndarray]:
+    return [np.ascontiguousarray(image_array[y:y + h, x:x + w]) for x, y, w, h in grid]
+
+
+def to_rgb_array(image: Image.Image) -> np.ndarray:
+    """Native-resolution RGB uint8 array of a PIL image"""
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image)
+
+
+def shift_detections(detections: List[Dict], tile: Tuple[int, int, int, int]) -> List[Dict]:
+    """Move tile-local boxes into full image coordinates (clipped to the tile)"""
+    x0, y0, w, h = tile
+    shifted = []
+    for detection in detections:
+        bbox = detection["bounding_box"]
+        x = max(0, min(int(bbox["x"]), w - 1))
+        y = max(0, min(int(bbox["y"]), h - 1))
+        shifted_detection = dict(detection)
+        shifted_detection["bounding_box"] = {
+            "x": x0 + x,
+            "y": y0 + y,
+            "width": max(1, min(int(bbox["width"]), w - x)),
+            "height": max(1, min(int(bbox["height"]), h - y)),
+        }
+        shifted.append(shifted_detection)
+    return shifted
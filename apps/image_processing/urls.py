@@ -7,8 +7,9 @@ CAPTURE → CLARIFY → ORGANIZE → REFLECT → ENGAGE
 
 from django.urls import path
 from .views import (
-    dashboard, upload_images, process_images, start_processing,
-    review_results, review_history, allocate_results, delete_result, delete_allocation, ImageListView, model_selection, benchmark_models, image_with_bbox, cache_reset,
+    dashboard, upload_images, bulk_upload, process_images, start_processing,
+    review_results, review_queue_page, review_bulk, review_history, allocate_results, delete_result, delete_allocation, ImageListView, model_selection, benchmark_models, image_with_bbox, cache_reset,
+    pipeline_metrics,
     get_years_for_site, get_months_for_site_year
 )
 
@@ -21,6 +22,7 @@ urlpatterns = [
 
     # CAPTURE Stage - Upload images
     path("upload/", upload_images, name="upload"),
+    path("upload/bulk/", bulk_upload, name="bulk_upload"),
     path("list/", ImageListView.as_view(), name="list"),
 
     # CLARIFY Stage - Process images with AI
@@ -29,6 +31,8 @@ urlpatterns = [
 
     # REFLECT Stage - Review AI results
     path("review/", review_results, name="review"),
+    path("review/queue/", review_queue_page, name="review_queue_page"),
+    path("review/bulk/", review_bulk, name="review_bulk"),
     path("review/delete-result/<uuid:result_id>/", delete_result, name="delete_result_review"),
     path("review-history/", review_history, name="review_history"),
     path("image-with-bbox/<uuid:result_id>/", image_with_bbox, name="image_with_bbox"),
@@ -46,5 +50,8 @@ urlpatterns = [
     # Model Management
     path("models/", model_selection, name="model_selection"),
     path("benchmark/", benchmark_models, name="benchmark_models"),
+
+    # Monitoring
+    path("metrics/pipeline/", pipeline_metrics, name="pipeline_metrics"),
 ]
 
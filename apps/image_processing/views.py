@@ -6,12 +6,13 @@ CAPTURE → CLARIFY → ORGANIZE → REFLECT → ENGAGE
 """
 
 import logging
+from decimal import Decimal
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
 from django.db import models, transaction
-from django.http import JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 import time
@@ -21,8 +22,15 @@ from django.views.decorators.http import require_http_methods
 from apps.users.models import UserActivity
 from django.views.generic import ListView
 
-from .forms import ImageUploadForm, ProcessingResultReviewForm, ProcessingResultOverrideForm, CensusAllocationForm
-from .models import ImageUpload, ProcessingResult, ProcessingBatch, ReviewDecision
+from .forms import BulkOverrideForm, BulkUploadForm, ImageUploadForm, ProcessingResultReviewForm, ProcessingResultOverrideForm, CensusAllocationForm
+from .allocation import UnregisteredSpeciesError, allocate_batch
+from .bulk_ingest import enqueue_batch, ingest_files
+from .detection_cache import detect_with_cache, find_duplicates, fingerprint_upload
+from .detections import result_detections, save_detections
+from .models import ImageUpload, ProcessingResult, ProcessingBatch, ProcessingStatus, ReviewDecision
+from .pipeline_timing import StageTimer, pipeline_histograms, prometheus_exposition
+from .review_queue import bulk_review, review_page
+from .stage_counters import get_stage_counts
 from apps.common.permissions import permission_required
 
 # Import census models for allocation functionality
@@ -37,53 +45,14 @@ def dashboard(request):
     """
     CAPTURE Stage: Main dashboard showing workflow overview
     """
-    # Get counts for each GTD stage
+    # Get counts for each GTD stage (one grouped query, cached briefly)
     # For admin users, show all; for field workers, show only their own
-    if request.user.role in ['SUPERADMIN', 'ADMIN']:
-        capture_count = ImageUpload.objects.filter(
-            upload_status='CAPTURED'
-        ).count()
-
-        clarify_count = ImageUpload.objects.filter(
-            upload_status='CLARIFIED'
-        ).count()
-
-        organize_count = ImageUpload.objects.filter(
-            upload_status='ORGANIZED'
-        ).count()
-
-        reflect_count = ProcessingResult.objects.filter(
-            review_decision=ReviewDecision.PENDING
-        ).count()
-
-        engage_count = ProcessingResult.objects.filter(
-            review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.OVERRIDDEN]
-        ).count()
-    else:
-        capture_count = ImageUpload.objects.filter(
-            uploaded_by=request.user,
-            upload_status='CAPTURED'
-        ).count()
-
-        clarify_count = ImageUpload.objects.filter(
-            uploaded_by=request.user,
-            upload_status='CLARIFIED'
-        ).count()
-
-        organize_count = ImageUpload.objects.filter(
-            uploaded_by=request.user,
-            upload_status='ORGANIZED'
-        ).count()
-
-        reflect_count = ProcessingResult.objects.filter(
-            image_upload__uploaded_by=request.user,
-            review_decision=ReviewDecision.PENDING
-        ).count()
-
-        engage_count = ProcessingResult.objects.filter(
-            image_upload__uploaded_by=request.user,
-            review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.OVERRIDDEN]
-        ).count()
+    stage_counts = get_stage_counts(request.user)
+    capture_count = stage_counts["captured"]
+    clarify_count = stage_counts["clarified"]
+    organize_count = stage_counts["organized"]
+    reflect_count = stage_counts["pending"]
+    engage_count = stage_counts["approved"] + stage_counts["overridden"]
 
     # Recent activity
     if request.user.role in ['SUPERADMIN', 'ADMIN']:
@@ -126,6 +95,7 @@ def upload_images(request):
             upload.uploaded_by = request.user
             upload.file_size = request.FILES["image_file"].size
             upload.original_filename = request.FILES["image_file"].name
+            fingerprint_upload(upload, request.FILES["image_file"])
             upload.save()
 
             messages.success(
@@ -134,6 +104,20 @@ def upload_images(request):
                 "It will be processed in the Clarify stage."
             )
 
+            duplicates = find_duplicates(upload)
+            if duplicates["exact"]:
+                messages.info(
+                    request,
+                    f"ℹ️ This image was already uploaded as '{duplicates['exact'][0].title}'. "
+                    "Its detections will be reused in the Clarify stage."
+                )
+            elif duplicates["near"]:
+                messages.warning(
+                    request,
+                    f"⚠️ This image looks like a near-duplicate of '{duplicates['near'][0].title}'. "
+                    "Please check that it is not counted twice."
+                )
+
             return redirect("image_processing:dashboard")
     else:
         form = ImageUploadForm()
@@ -141,12 +125,63 @@ def upload_images(request):
     context = {
         "title": "Capture Images",
         "form": form,
+        "bulk_form": BulkUploadForm(),
         "stage": "capture",
     }
 
     return render(request, "image_processing/upload.html", context)
 
 
+@login_required
+@permission_required('can_process_images')
+@require_http_methods(["POST"])
+def bulk_upload(request):
+    """
+    CAPTURE Stage: Upload many images or ZIP archives as one processing batch
+    """
+    form = BulkUploadForm(request.POST)
+    files = request.FILES.getlist("files")
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    if not form.is_valid() or not files:
+        if is_ajax:
+            return JsonResponse({"success": False, "error": "Select at least one image or ZIP archive"}, status=400)
+        messages.error(request, "❌ Select at least one image or ZIP archive to upload.")
+        return redirect("image_processing:upload")
+
+    outcome = ingest_files(
+        files,
+        request.user,
+        site_hint=form.cleaned_data["site_hint"],
+        title_prefix=form.cleaned_data["title_prefix"],
+        batch_name=form.cleaned_data["batch_name"],
+    )
+    batch = outcome["batch"]
+    queued = bool(batch and form.cleaned_data["process_now"] and enqueue_batch(batch))
+
+    if is_ajax:
+        return JsonResponse({
+            "success": batch is not None,
+            "batch_id": str(batch.pk) if batch else None,
+            "created": len(outcome["uploads"]),
+            "processing": queued,
+            "rejected": [{"file": name, "reason": reason} for name, reason in outcome["rejected"]],
+        }, status=200 if batch else 400)
+
+    if batch:
+        messages.success(
+            request,
+            f"✅ {len(outcome['uploads'])} image(s) captured in batch '{batch.name}'. "
+            + ("AI processing has started." if queued else "They will be processed in the Clarify stage.")
+        )
+    for name, reason in outcome["rejected"][:10]:
+        messages.warning(request, f"⚠️ Skipped '{name}': {reason}")
+    if len(outcome["rejected"]) > 10:
+        messages.warning(request, f"⚠️ {len(outcome['rejected']) - 10} more file(s) were skipped.")
+
+    return redirect("image_processing:dashboard" if batch else "image_processing:upload")
+
+
 @login_required
 def process_images(request):
     """
@@ -255,30 +290,26 @@ def process_image_with_ai(image_upload):
     """
     try:
         # Import here to avoid circular imports
-        from .bird_detection_service import get_bird_detection_service
+        from .inference_daemon import get_detection_service
 
-        # Get the bird detection service
-        service = get_bird_detection_service()
+        # Get the bird detection service (shared inference daemon when enabled)
+        service = get_detection_service()
 
         if not service.is_available():
             raise RuntimeError("Bird detection service is not available")
 
-        # Read the image file
-        with open(image_upload.image_file.path, 'rb') as f:
-            image_data = f.read()
-
-        # Run detection
-        detection_result = service.detect_birds(image_data, image_upload.original_filename)
+        # Run detection (reusing cached detections for identical image content)
+        detection_result = detect_with_cache(image_upload, service)
 
         if not detection_result["success"]:
             raise RuntimeError(f"Detection failed: {detection_result.get('error', 'Unknown error')}")
 
         # Store all bounding boxes (list format for multiple detections)
         all_bboxes = [d["bounding_box"] for d in detection_result["detections"]]
-        
-        logger.info(f"Processing {len(detection_result['detections'])} detections")
-        logger.info(f"All bounding boxes: {all_bboxes}")
-        
+
+        logger.debug(f"Processing {len(detection_result['detections'])} detections")
+        logger.debug(f"All bounding boxes: {all_bboxes}")
+
         # Create comprehensive detection data for multi-species support
         all_detections_data = []
         for detection in detection_result["detections"]:
@@ -289,8 +320,8 @@ def process_image_with_ai(image_upload):
                 "id": detection["id"]
             })
             
-        logger.info(f"All detections data: {len(all_detections_data)} items")
-        
+        logger.debug(f"All detections data: {len(all_detections_data)} items")
+
         # Create multi-species summary for detected_species field
         species_counts = {}
         for detection in all_detections_data:
@@ -304,22 +335,41 @@ def process_image_with_ai(image_upload):
         else:
             detected_species_summary = "UNKNOWN"
         
-        # Create processing result from detection data
-        result = ProcessingResult.objects.create(
-            image_upload=image_upload,
-            detected_species=detected_species_summary,
-            confidence_score=detection_result["primary_confidence"],
-            bounding_box=all_bboxes if all_bboxes else [{"x": 0, "y": 0, "width": 0, "height": 0}],
-            total_detections=detection_result["total_detections"],
-            all_detections=all_detections_data,
-            ai_model_used=detection_result["model_used"],
-            processing_device=detection_result["device_used"],
-            review_decision=ReviewDecision.PENDING,
+        timer = StageTimer(detection_result.get("timings"))
+        inference_ms = timer.timings.get("inference")
+
+        with timer.span("persist"):
+            # Create processing result from detection data
+            result = ProcessingResult.objects.create(
+                image_upload=image_upload,
+                detected_species=detected_species_summary,
+                confidence_score=detection_result["primary_confidence"],
+                bounding_box=all_bboxes if all_bboxes else [{"x": 0, "y": 0, "width": 0, "height": 0}],
+                total_detections=detection_result["total_detections"],
+                all_detections=all_detections_data,
+                ai_model_used=detection_result["model_used"],
+                processing_device=detection_result["device_used"],
+                inference_time=Decimal(f"{inference_ms / 1000:.3f}") if inference_ms is not None else None,
+                applied_confidence_threshold=detection_result.get("confidence_threshold"),
+                applied_nms_iou=detection_result.get("nms_iou"),
+                raw_confidence_floor=detection_result.get("raw_confidence_floor"),
+                review_decision=ReviewDecision.PENDING,
+            )
+            save_detections(result, detection_result["detections"])
+            if result.raw_confidence_floor is not None:
+                # Kept once per (image, model) so the result can be re-thresholded later
+                save_detections(result, detection_result.get("raw_detections", []), raw=True)
+
+            # Update image status
+            image_upload.complete_processing()
+
+        result.stage_timings = timer.as_dict()
+        ProcessingResult.objects.filter(pk=result.pk).update(stage_timings=result.stage_timings)
+        logger.info(
+            f"Processed {image_upload.original_filename} in {timer.total_ms:.0f}ms "
+            f"({', '.join(f'{stage} {ms:.0f}' for stage, ms in result.stage_timings.items())})"
         )
 
-        # Update image status
-        image_upload.complete_processing()
-
         return result
 
     except Exception as e:
@@ -343,7 +393,9 @@ def image_with_bbox(request, result_id):
     """
     Return image with bounding box drawn on it for visualization
     """
-    result = get_object_or_404(ProcessingResult, id=result_id)
+    result = get_object_or_404(
+        ProcessingResult.objects.select_related("image_upload").prefetch_related("detections"), id=result_id
+    )
 
     if not result.image_upload.image_file:
         from django.http import Http404
@@ -356,66 +408,24 @@ def image_with_bbox(request, result_id):
     image_path = result.image_upload.image_file.path
     image = Image.open(image_path)
 
-    # Draw bounding box(es) if available and valid
-    if result.bounding_box and result.total_detections > 0:
+    # Draw the bounding boxes of the result's detections (Detection rows)
+    detections = result_detections(result)
+    if detections:
         draw = ImageDraw.Draw(image)
 
-        # Check if bounding_box is a list (multiple detections) or single dict
-        if isinstance(result.bounding_box, list):
-            # Multiple bounding boxes - draw all of them
-            bboxes = result.bounding_box
-            for idx, bbox in enumerate(bboxes):
-                x, y, width, height = bbox.get('x', 0), bbox.get('y', 0), bbox.get('width', 0), bbox.get('height', 0)
-                
-                # Validate coordinates
-                if width > 0 and height > 0:
-                    # Draw rectangle (red border, 3px thick)
-                    for i in range(3):  # Draw thicker line
-                        draw.rectangle(
-                            [x - i, y - i, x + width + i, y + height + i],
-                            outline=(255, 0, 0),  # Red color
-                            width=1
-                        )
-
-                    # Add label for each detection using all_detections data
-                    if result.all_detections and idx < len(result.all_detections):
-                        detection = result.all_detections[idx]
-                        species = detection.get("species", "Unknown")
-                        confidence = detection.get("confidence", 0)
-                        label_text = f"{species} ({confidence:.1%})"
-                    else:
-                        # Fallback to old method
-                        label_text = f"{result.detected_species} #{idx + 1}"
-
-                    # Draw background for text with better contrast
-                    try:
-                        from PIL import ImageFont
-                        # Try to load a larger font for better readability
-                        try:
-                            font = ImageFont.truetype("arial.ttf", 16)
-                        except:
-                            try:
-                                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 16)
-                            except:
-                                font = ImageFont.load_default()
-                    except:
-                        font = None
-
-                    # Get text size for background rectangle
-                    if font:
-                        text_bbox = draw.textbbox((x, y - 35), label_text, font=font)
-                    else:
-                        text_bbox = [x, y - 35, x + len(label_text) * 10, y - 15]  # Approximate
-
-                    # Draw background rectangle with better contrast
-                    draw.rectangle(text_bbox, fill=(0, 0, 0, 180))  # Semi-transparent black
-
-                    # Draw text in white with outline for better readability
-                    draw.text((x, y - 35), label_text, fill=(255, 255, 255), font=font)
-        else:
-            # Single bounding box (legacy format)
-            bbox = result.bounding_box
-            x, y, width, height = bbox.get('x', 0), bbox.get('y', 0), bbox.get('width', 0), bbox.get('height', 0)
+        from PIL import ImageFont
+        # Try to load a larger font for better readability
+        try:
+            font = ImageFont.truetype("arial.ttf", 16)
+        except OSError:
+            try:
+                font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 16)
+            except OSError:
+                font = ImageFont.load_default()
+
+        for detection in detections:
+            bbox = detection["bounding_box"]
+            x, y, width, height = bbox['x'], bbox['y'], bbox['width'], bbox['height']
 
             # Validate coordinates
             if width > 0 and height > 0:
@@ -427,29 +437,12 @@ def image_with_bbox(request, result_id):
                         width=1
                     )
 
-                # Add label with detection count
-                label_text = f"{result.get_detected_species_display()} ({result.confidence_score:.1%})"
-                if result.total_detections > 1:
-                    label_text += f" + {result.total_detections - 1} more"
-
-                # Draw semi-transparent background for text
-                try:
-                    from PIL import ImageFont
-                    font = ImageFont.load_default()
-                except:
-                    font = None
-
-                # Get text size for background rectangle
-                if font:
-                    text_bbox = draw.textbbox((x, y - 30), label_text, font=font)
-                else:
-                    text_bbox = [x, y - 30, x + len(label_text) * 12, y - 10]  # Approximate
-
-                # Draw background rectangle
-                draw.rectangle(text_bbox, fill=(255, 0, 0))
-
-                # Draw text in white
-                draw.text((x, y - 30), label_text, fill=(255, 255, 255), font=font)
+                label_text = f"{detection.get('species', 'Unknown')} ({detection.get('confidence', 0):.1%})"
+
+                # Draw background rectangle for the label, then the text in white
+                text_bbox = draw.textbbox((x, y - 35), label_text, font=font)
+                draw.rectangle(text_bbox, fill=(0, 0, 0, 180))  # Semi-transparent black
+                draw.text((x, y - 35), label_text, fill=(255, 255, 255), font=font)
     elif result.total_detections == 0:
         # No detections, add a note
         draw = ImageDraw.Draw(image)
@@ -464,6 +457,14 @@ def image_with_bbox(request, result_id):
     elif image.mode != 'RGB':
         image = image.convert('RGB')
 
+    # Review queue thumbnails (?w=<width>) are scaled down after drawing
+    try:
+        width = min(max(int(request.GET.get("w", 0)), 0), 2048)
+    except ValueError:
+        width = 0
+    if width:
+        image.thumbnail((width, width), Image.Resampling.LANCZOS)
+
     # Convert back to bytes
     output = io.BytesIO()
     image.save(output, format='JPEG')
@@ -473,6 +474,12 @@ def image_with_bbox(request, result_id):
     from django.http import HttpResponse
     response = HttpResponse(output.getvalue(), content_type='image/jpeg')
 
+    # Versioned URLs (?v=<result updated_at>) change whenever the result does,
+    # so they can be cached; this is what lets the review queue prefetch them
+    if request.GET.get("v"):
+        response['Cache-Control'] = 'private, max-age=86400'
+        return response
+
     # Add extremely aggressive cache-busting headers for dynamic images
     response['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0, private'
     response['Pragma'] = 'no-cache'
@@ -490,55 +497,55 @@ def image_with_bbox(request, result_id):
 def review_results(request):
     """
     REFLECT Stage: Review AI processing results and make decisions
-    Enhanced with better data fetching and cache management
+    Keyset-paginated queue (newest first); ?after=<cursor> shows the next page
     """
-    # Get results that need review
-    # For admin users, show all pending results; for regular users, show only their own
-    if request.user.role in ['SUPERADMIN', 'ADMIN']:
-        pending_results = ProcessingResult.objects.filter(
-            review_decision=ReviewDecision.PENDING
-        ).select_related('image_upload', 'reviewed_by').order_by("-created_at")  # Most recent first
-    else:
-        pending_results = ProcessingResult.objects.filter(
-            image_upload__uploaded_by=request.user,
-            review_decision=ReviewDecision.PENDING
-        ).select_related('image_upload', 'reviewed_by').order_by("-created_at")  # Most recent first
-
-    # Ensure we have fresh data by forcing a database query
-    pending_results = list(pending_results)  # Force evaluation of queryset
-
     if request.method == "POST":
         result_id = request.POST.get("result_id")
         action = request.POST.get("action")
 
         if result_id and action:
-            result = get_object_or_404(ProcessingResult, id=result_id)
+            result = get_object_or_404(ProcessingResult.objects.select_related("image_upload"), id=result_id)
+            options = {"notes": request.POST.get("notes", "")}
+            if action == "override":
+                # Handle override form submission
+                override_form = ProcessingResultOverrideForm(request.POST)
+                if not override_form.is_valid():
+                    messages.error(request, "❌ Please choose the correct species, count and a reason.")
+                    return redirect("image_processing:review")
+                options = {
+                    "notes": override_form.cleaned_data["override_reason"],
+                    "override_species": override_form.cleaned_data["new_species"],
+                    "override_count": override_form.cleaned_data["new_count"],
+                }
 
-            if action == "approve":
-                result.approve_result(request.user, request.POST.get("notes", ""))
+            try:
+                outcome = bulk_review(request.user, [result.pk], action, **options)
+            except ValueError as e:
+                messages.error(request, f"❌ {e}")
+                return redirect("image_processing:review")
+
+            if not outcome["updated"]:
+                messages.warning(request, f"⚠️ '{result.image_upload.title}' was already reviewed")
+            elif action == "approve":
                 messages.success(request, f"✅ Approved '{result.image_upload.title}'")
-
             elif action == "reject":
-                result.reject_result(request.user, request.POST.get("notes", ""))
                 messages.warning(request, f"❌ Rejected '{result.image_upload.title}'")
+            else:
+                messages.success(request, f"🔄 Overrode '{result.image_upload.title}'")
 
-            elif action == "override":
-                # Handle override form submission
-                override_form = ProcessingResultOverrideForm(request.POST)
-                if override_form.is_valid():
-                    result.override_result(
-                        reviewer=request.user,
-                        new_species=override_form.cleaned_data["new_species"],
-                        new_count=override_form.cleaned_data["new_count"],
-                        reason=override_form.cleaned_data["override_reason"]
-                    )
-                    messages.success(request, f"🔄 Overrode '{result.image_upload.title}'")
+        return redirect("image_processing:review")
 
-            return redirect("image_processing:review")
+    try:
+        page = review_page(request.user, after=request.GET.get("after"))
+    except ValueError:
+        return redirect("image_processing:review")
 
     context = {
         "title": "Reflect on Results",
-        "pending_results": pending_results,
+        "pending_results": page["results"],
+        "next_cursor": page["next_cursor"],
+        "is_first_page": not request.GET.get("after"),
+        "override_form": ProcessingResultOverrideForm(),
         "stage": "reflect",
     }
 
@@ -557,6 +564,80 @@ def review_results(request):
     return response
 
 
+@login_required
+@require_http_methods(["GET"])
+def review_queue_page(request):
+    """
+    REFLECT Stage: One page of the review queue as JSON, so the page can
+    prefetch the next page's annotated thumbnails while the current one is reviewed
+    """
+    try:
+        page = review_page(request.user, after=request.GET.get("after"))
+    except ValueError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "results": [
+            {
+                "id": str(result.id),
+                "title": result.image_upload.title,
+                "detected_species": result.detected_species,
+                "total_detections": result.total_detections,
+                "thumbnail_url": result.thumbnail_url,
+            }
+            for result in page["results"]
+        ],
+        "next_cursor": page["next_cursor"],
+    })
+
+
+@login_required
+@require_http_methods(["POST"])
+def review_bulk(request):
+    """
+    REFLECT Stage: Approve, reject or override many results in one transaction
+    """
+    action = request.POST.get("action")
+    result_ids = request.POST.getlist("result_ids")
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    options = {"notes": request.POST.get("notes", "")}
+
+    if action == "override":
+        override_form = BulkOverrideForm(request.POST)
+        if not override_form.is_valid():
+            error = "Choose the correct species and give a reason for the override"
+            if is_ajax:
+                return JsonResponse({"success": False, "error": error}, status=400)
+            messages.error(request, f"❌ {error}.")
+            return redirect("image_processing:review")
+        options = {
+            "notes": override_form.cleaned_data["override_reason"],
+            "override_species": override_form.cleaned_data["new_species"],
+            "override_count": override_form.cleaned_data["new_count"],
+        }
+
+    try:
+        outcome = bulk_review(request.user, result_ids, action, **options)
+    except ValueError as e:
+        if is_ajax:
+            return JsonResponse({"success": False, "error": str(e)}, status=400)
+        messages.error(request, f"❌ {e}")
+        return redirect("image_processing:review")
+
+    if is_ajax:
+        return JsonResponse({"success": True, **outcome})
+
+    verb = {"approve": "Approved", "reject": "Rejected", "override": "Overrode"}[action]
+    messages.success(request, f"✅ {verb} {len(outcome['updated'])} result(s)")
+    if outcome["skipped"]:
+        messages.warning(request, f"⚠️ {len(outcome['skipped'])} result(s) were already reviewed and were skipped")
+
+    review_url = reverse("image_processing:review")
+    after = request.POST.get("after")
+    return redirect(f"{review_url}?after={after}" if after else review_url)
+
+
 @login_required
 def cache_reset(request):
     """
@@ -723,33 +804,29 @@ def allocate_results(request):
             review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.OVERRIDDEN],
             image_upload__upload_status__in=['REFLECTED', 'ORGANIZED']  # Only show unallocated results
         ).order_by("-created_at")  # Most recent first
+    # Every card shows the upload and the reviewer
+    ready_results = ready_results.select_related("image_upload", "reviewed_by")
 
     if request.method == "POST":
-        print("DEBUG: Allocation POST request received")
-        result_id = request.POST.get("result_id")
+        result_ids = request.POST.getlist("result_ids") or [request.POST.get("result_id")]
+        result_ids = [result_id for result_id in result_ids if result_id]
         site_id = request.POST.get("site_id")
         year = request.POST.get("year")
         month = request.POST.get("month")
         observation_date = request.POST.get("observation_date")
 
-        print(f"DEBUG: Allocation params - result_id: {result_id}, site_id: {site_id}, year: {year}, month: {month}, date: {observation_date}")
-
-        if result_id and site_id and year and month and observation_date:
-            result = get_object_or_404(ProcessingResult, id=result_id)
+        if result_ids and site_id and year and month and observation_date:
+            results = list(
+                ProcessingResult.objects.filter(id__in=result_ids).select_related("image_upload")
+            )
+            if not results:
+                raise Http404("No processing results selected")
             site = get_object_or_404(Site, id=site_id)
 
-            # Check if this result has already been allocated
-            if result.image_upload.upload_status == 'ENGAGED':
-                messages.warning(
-                    request,
-                    f"⚠️ '{result.image_upload.title}' has already been allocated. Please refresh the page."
-                )
-                return redirect("image_processing:allocate")
-
             # Validate that the selected month exists for the site/year
             try:
                 census_year = CensusYear.objects.get(site=site, year=int(year))
-                census_month = CensusMonth.objects.get(year=census_year, month=int(month))
+                census_month = CensusMonth.objects.select_related("year").get(year=census_year, month=int(month))
             except (CensusYear.DoesNotExist, CensusMonth.DoesNotExist):
                 messages.error(
                     request,
@@ -757,245 +834,87 @@ def allocate_results(request):
                 )
                 return redirect("image_processing:allocate")
 
-            print(f"DEBUG: Found existing CensusMonth - Site: {site.name}, Year: {year}, Month: {month}")
-
-            # Get or create census record
-            census, created = Census.objects.get_or_create(
-                month=census_month,
-                census_date=observation_date,
-                defaults={
-                    'lead_observer': request.user,
-                }
-            )
-
-            # Log allocation details for debugging
-            print(f"DEBUG: Allocation - Site: {site.name}, Date: {observation_date}, Count: {result.final_count}")
-            print(f"DEBUG: Census record {'CREATED' if created else 'UPDATED'} - ID: {census.id}")
-
-            print(f"DEBUG: Processing multi-species allocation for Census ID: {census.id}")
-
-            # Handle multi-species allocation from all_detections data
-            from apps.locations.models import CensusObservation
-            from apps.fauna.models import Species
-
-            species_counts = {}  # Track counts per species
-
-            # Check if all_detections exists and has data (new multi-species format)
-            if result.all_detections and len(result.all_detections) > 0:
-                print(f"DEBUG: Processing {len(result.all_detections)} detections from all_detections")
-
-                # Process each detection in all_detections
-                for detection in result.all_detections:
-                    species_name = detection["species"]
-                    count = 1  # Each detection represents one bird
-
-                    # Validate that the species exists in the fauna management system
-                    try:
-                        # Try to find the species by name or scientific name with flexible matching
-                        species = Species.objects.get(
-                            models.Q(name__icontains=species_name) |
-                            models.Q(scientific_name__icontains=species_name) |
-                            models.Q(name__iexact=species_name) |
-                            models.Q(scientific_name__iexact=species_name)
-                        )
-                        validated_species_name = species.name
-                        print(f"DEBUG: Found species in database - {validated_species_name}")
-                    except Species.DoesNotExist:
-                        # Try more flexible matching for common names
-                        try:
-                            # Handle common name variations
-                            if "chinese egret" in species_name.lower():
-                                species = Species.objects.filter(name__icontains="CHINESE").filter(name__icontains="EGRET").first()
-                                if not species:
-                                    species = Species.objects.filter(name__icontains="CHINESE").first()
-                            elif "little egret" in species_name.lower():
-                                species = Species.objects.filter(name__icontains="LITTLE EGRET").first()
-                            elif "great egret" in species_name.lower():
-                                species = Species.objects.filter(name__icontains="GREAT EGRET").first()
-                            elif "intermediate egret" in species_name.lower():
-                                species = Species.objects.filter(name__icontains="INTERMEDIATE EGRET").first()
-                            elif "cattle egret" in species_name.lower():
-                                species = Species.objects.filter(name__icontains="CATTLE EGRET").first()
-                            else:
-                                raise Species.DoesNotExist
-                            
-                            if species:
-                                validated_species_name = species.name
-                                print(f"DEBUG: Found species via flexible matching - {validated_species_name}")
-                            else:
-                                raise Species.DoesNotExist
-                        except Species.DoesNotExist:
-                            # If species doesn't exist in database, show error
-                            messages.error(
-                                request,
-                                f"❌ Species '{species_name}' is not registered in the fauna management system. Please add it first."
-                            )
-                            return redirect("image_processing:allocate")
-                    except Species.MultipleObjectsReturned:
-                        # If multiple species match, use the first one
-                        species = Species.objects.filter(
-                            models.Q(name__icontains=species_name) |
-                            models.Q(scientific_name__icontains=species_name) |
-                            models.Q(name__iexact=species_name) |
-                            models.Q(scientific_name__iexact=species_name)
-                        ).first()
-                        validated_species_name = species.name if species.name else species_name
-                        print(f"DEBUG: Multiple species found, using: {validated_species_name}")
-
-                    # Accumulate counts per species
-                    if validated_species_name not in species_counts:
-                        species_counts[validated_species_name] = 0
-                    species_counts[validated_species_name] += count
+            already_allocated = [r for r in results if r.image_upload.upload_status == ProcessingStatus.ENGAGED]
+            if len(already_allocated) == len(results):
+                titles = ", ".join(f"'{r.image_upload.title}'" for r in already_allocated)
+                messages.warning(
+                    request,
+                    f"⚠️ {titles} {'has' if len(results) == 1 else 'have'} already been allocated. Please refresh the page."
+                )
+                return redirect("image_processing:allocate")
 
-            else:
-                # Fallback to single-species logic for backward compatibility
-                print(f"DEBUG: Using legacy single-species logic for backward compatibility")
-
-                # Validate the primary detected species
-                primary_species = result.detected_species if result.detected_species != "UNKNOWN" else None
-
-                if primary_species:
-                    try:
-                        # Try to find the species by name or scientific name with flexible matching
-                        species = Species.objects.get(
-                            models.Q(name__icontains=primary_species) |
-                            models.Q(scientific_name__icontains=primary_species) |
-                            models.Q(name__iexact=primary_species) |
-                            models.Q(scientific_name__iexact=primary_species)
-                        )
-                        validated_species_name = species.name
-                        print(f"DEBUG: Found species in database - {validated_species_name}")
-                    except Species.DoesNotExist:
-                        # Try more flexible matching for common names
-                        try:
-                            if "chinese egret" in primary_species.lower():
-                                species = Species.objects.filter(name__icontains="CHINESE").filter(name__icontains="EGRET").first()
-                                if not species:
-                                    species = Species.objects.filter(name__icontains="CHINESE").first()
-                            elif "little egret" in primary_species.lower():
-                                species = Species.objects.filter(name__icontains="LITTLE EGRET").first()
-                            elif "great egret" in primary_species.lower():
-                                species = Species.objects.filter(name__icontains="GREAT EGRET").first()
-                            elif "intermediate egret" in primary_species.lower():
-                                species = Species.objects.filter(name__icontains="INTERMEDIATE EGRET").first()
-                            elif "cattle egret" in primary_species.lower():
-                                species = Species.objects.filter(name__icontains="CATTLE EGRET").first()
-                            else:
-                                raise Species.DoesNotExist
-                            
-                            if species:
-                                validated_species_name = species.name
-                                print(f"DEBUG: Found species via flexible matching - {validated_species_name}")
-                            else:
-                                raise Species.DoesNotExist
-                        except Species.DoesNotExist:
-                            messages.error(
-                                request,
-                                f"❌ Species '{primary_species}' is not registered in the fauna management system. Please add it first."
-                            )
-                            return redirect("image_processing:allocate")
-                    except Species.MultipleObjectsReturned:
-                        species = Species.objects.filter(
-                            models.Q(name__icontains=primary_species) |
-                            models.Q(scientific_name__icontains=primary_species) |
-                            models.Q(name__iexact=primary_species) |
-                            models.Q(scientific_name__iexact=primary_species)
-                        ).first()
-                        validated_species_name = species.name if species.name else primary_species
-                        print(f"DEBUG: Multiple species found, using: {validated_species_name}")
-
-                    # Single species case
-                    species_counts[validated_species_name] = result.total_detections
-
-            # Create CensusObservation records for each species
-            created_observations = []
-            for species_name, total_count in species_counts.items():
-                try:
-                    # Check if we already have an observation for this species on this date
-                    observation, obs_created = CensusObservation.objects.get_or_create(
-                        census=census,
-                        species_name=species_name,
+            try:
+                with transaction.atomic():
+                    # Get or create census record
+                    census, created = Census.objects.get_or_create(
+                        month=census_month,
+                        census_date=observation_date,
                         defaults={
-                            'count': total_count,
-                            'family': 'Ardeidae',  # Heron/egret family
+                            'lead_observer': request.user,
                         }
                     )
+                    summary = allocate_batch(
+                        [(result, census) for result in results], allocated_by=request.user
+                    )
+            except UnregisteredSpeciesError as e:
+                for species_name in e.species_names:
+                    messages.error(
+                        request,
+                        f"❌ Species '{species_name}' is not registered in the fauna management system. Please add it first."
+                    )
+                return redirect("image_processing:allocate")
 
-                    if not obs_created:
-                        # Update existing observation count
-                        old_count = observation.count
-                        observation.count += total_count
-                        observation.save()
-                        print(f"DEBUG: Updated CensusObservation - Species: {species_name}, Old count: {old_count}, New count: {observation.count}")
-                    else:
-                        print(f"DEBUG: Created CensusObservation - Species: {species_name}, Count: {observation.count}")
-
-                    created_observations.append((species_name, total_count, obs_created))
-
-                except Exception as e:
-                    print(f"ERROR: Failed to create CensusObservation for {species_name} - {e}")
-
-            print(f"DEBUG: Created {len(created_observations)} CensusObservation records")
-            for species_name, count, was_created in created_observations:
-                print(f"  - {species_name}: {count} birds ({'CREATED' if was_created else 'UPDATED'})")
-
-            # The census totals will be automatically updated via the CensusObservation save() method
-            print(f"DEBUG: Census ID {census.id} - Before save: Birds: {census.total_birds}, Species: {census.total_species}")
-
-            # Refresh census from database to see updated totals
-            census.refresh_from_db()
-            print(f"DEBUG: Census ID {census.id} - After refresh: Birds: {census.total_birds}, Species: {census.total_species}")
-
-            # Create allocation history record for tracking (temporarily disabled until migration is applied)
-            # from apps.locations.models import AllocationHistory
-            # AllocationHistory.objects.create(
-            #     processing_result=result,
-            #     census=census_observation,
-            #     allocated_by=request.user,
-            #     bird_count=result.final_count,
-            #     site=site,
-            #     observation_date=observation_date,
-            #     notes=f"Allocated via image processing - {result.image_upload.title}"
-            # )
-
-            # Update processing result status to show it's been allocated
-            result.allocate_to_census(site=site, census=census, allocated_by=request.user)
-
-            # Log the allocation activity
-            UserActivity.log_activity(
-                user=request.user,
-                activity_type=UserActivity.ActivityType.CENSUS_ADDED,
-                description=f"Allocated image processing result to census: {result.image_upload.title} -> {site.name} ({census_year.year} {census_month.get_month_display()})",
-                ip_address=request.META.get('REMOTE_ADDR'),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                metadata={
-                    'processing_result_id': str(result.id),
-                    'image_title': result.image_upload.title,
-                    'site_id': str(site.id),
-                    'site_name': site.name,
-                    'census_id': str(census.id),
-                    'census_date': str(census.census_date),
-                    'species_allocated': list(species_counts.keys()),
-                    'total_birds': sum(species_counts.values()),
-                    'allocation_details': {
-                        'year': census_year.year,
-                        'month': census_month.month,
-                        'month_display': census_month.get_month_display(),
+            month_label = f"{census_year.year} {census_month.get_month_display()}"
+            activities = []
+            for result, _census in summary.allocated:
+                species_counts = summary.species_per_result[result.pk]
+
+                # Log the allocation activity (one insert for the whole batch below)
+                activities.append(UserActivity(
+                    user=request.user,
+                    activity_type=UserActivity.ActivityType.CENSUS_ADDED,
+                    description=f"Allocated image processing result to census: {result.image_upload.title} -> {site.name} ({month_label})",
+                    ip_address=request.META.get('REMOTE_ADDR'),
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    severity=UserActivity.Severity.INFO,  # log_activity() default
+                    metadata={
+                        'processing_result_id': str(result.id),
+                        'image_title': result.image_upload.title,
+                        'site_id': str(site.id),
+                        'site_name': site.name,
+                        'census_id': str(census.id),
+                        'census_date': str(census.census_date),
+                        'species_allocated': list(species_counts.keys()),
+                        'total_birds': sum(species_counts.values()),
+                        'allocation_details': {
+                            'year': census_year.year,
+                            'month': census_month.month,
+                            'month_display': census_month.get_month_display(),
+                        }
                     }
-                }
-            )
-
-            # Create success message with species details
-            species_details = []
-            for species_name, count in species_counts.items():
-                species_details.append(f"{count} {species_name}")
-            
-            species_summary = ", ".join(species_details)
-            
-            messages.success(
-                request,
-                f"✅ Successfully allocated '{result.image_upload.title}' ({species_summary}) to census record at {site.name} - {census_year.year} {census_month.get_month_display()}"
-            )
+                ))
+            UserActivity.objects.bulk_create(activities)
+
+            if len(summary.allocated) == 1:
+                result = summary.allocated[0][0]
+                species_summary = ", ".join(
+                    f"{count} {species_name}"
+                    for species_name, count in summary.species_per_result[result.pk].items()
+                )
+                messages.success(
+                    request,
+                    f"✅ Successfully allocated '{result.image_upload.title}' ({species_summary}) to census record at {site.name} - {month_label}"
+                )
+            else:
+                messages.success(
+                    request,
+                    f"✅ Successfully allocated {len(summary.allocated)} results ({summary.total_birds} birds) to census record at {site.name} - {month_label}"
+                )
+            if summary.skipped:
+                messages.warning(
+                    request,
+                    f"⚠️ Skipped {len(summary.skipped)} result{'s' if len(summary.skipped) != 1 else ''} that had already been allocated."
+                )
 
             return redirect("image_processing:allocate")
 
@@ -1087,46 +1006,15 @@ class ImageListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["current_stage"] = self.request.GET.get("stage", "all")
-        if self.request.user.role in ['SUPERADMIN', 'ADMIN']:
-            context["stage_counts"] = {
-                "all": ImageUpload.objects.all().count(),
-                "captured": ImageUpload.objects.filter(
-                    upload_status='CAPTURED'
-                ).count(),
-                "clarified": ImageUpload.objects.filter(
-                    upload_status='CLARIFIED'
-                ).count(),
-                "organized": ImageUpload.objects.filter(
-                    upload_status='ORGANIZED'
-                ).count(),
-                "reflected": ProcessingResult.objects.filter(
-                    review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.REJECTED, ReviewDecision.OVERRIDDEN]
-                ).count(),
-                "engaged": ProcessingResult.objects.filter(
-                    review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.OVERRIDDEN]
-                ).count(),
-            }
-        else:
-            context["stage_counts"] = {
-                "all": ImageUpload.objects.filter(uploaded_by=self.request.user).count(),
-                "captured": ImageUpload.objects.filter(
-                    uploaded_by=self.request.user, upload_status='CAPTURED'
-                ).count(),
-                "clarified": ImageUpload.objects.filter(
-                    uploaded_by=self.request.user, upload_status='CLARIFIED'
-                ).count(),
-                "organized": ImageUpload.objects.filter(
-                    uploaded_by=self.request.user, upload_status='ORGANIZED'
-                ).count(),
-                "reflected": ProcessingResult.objects.filter(
-                    image_upload__uploaded_by=self.request.user,
-                    review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.REJECTED, ReviewDecision.OVERRIDDEN]
-                ).count(),
-                "engaged": ProcessingResult.objects.filter(
-                    image_upload__uploaded_by=self.request.user,
-                    review_decision__in=[ReviewDecision.APPROVED, ReviewDecision.OVERRIDDEN]
-                ).count(),
-            }
+        counts = get_stage_counts(self.request.user)
+        context["stage_counts"] = {
+            "all": counts["all"],
+            "captured": counts["captured"],
+            "clarified": counts["clarified"],
+            "organized": counts["organized"],
+            "reflected": counts["approved"] + counts["rejected"] + counts["overridden"],
+            "engaged": counts["approved"] + counts["overridden"],
+        }
         return context
 
 
@@ -1138,65 +1026,138 @@ def model_selection(request):
     # Get available models from the models directory
     import os
     from django.conf import settings
-    
+    from .inference_daemon import InferenceClient, InferenceDaemonUnavailable, get_daemon_config
+    from .model_registry import get_model_registry, get_selected_model_path, select_model
+    from .models import QuantizedModelVariant
+    from .quantization import get_quantization_config
+
     models_dir = os.path.join(settings.BASE_DIR, "models")
     available_models = []
-    
+
     if os.path.exists(models_dir):
-        for model_name in os.listdir(models_dir):
+        for model_name in sorted(os.listdir(models_dir)):
             model_path = os.path.join(models_dir, model_name)
             if os.path.isdir(model_path):
                 # Check for model files
                 model_files = [f for f in os.listdir(model_path) if f.endswith(('.pt', '.pth', '.onnx'))]
                 if model_files:
+                    weights = sorted(f for f in model_files if f.endswith('.pt')) or sorted(model_files)
                     available_models.append({
                         'name': model_name,
                         'files': model_files,
-                        'path': model_path
+                        'path': model_path,
+                        'model_file': os.path.join(model_path, weights[0]),
                     })
-    
-    # Get current active model (you might store this in settings or database)
-    current_model = getattr(settings, 'ACTIVE_BIRD_MODEL', 'egret_500_model')
-    
+
+    if request.method == "POST":
+        if request.user.role not in ['SUPERADMIN', 'ADMIN']:
+            messages.error(request, "❌ Only administrators can switch the active model.")
+            return redirect("image_processing:model_selection")
+
+        model = next((m for m in available_models if m['name'] == request.POST.get("model_name")), None)
+        if model is None:
+            messages.error(request, "❌ Unknown model selected.")
+        else:
+            # Workers warm the model in the background and swap atomically once ready
+            select_model(model['model_file'])
+            messages.success(
+                request,
+                f"✅ Switching to '{model['name']}'. The model is warmed up in the background and "
+                f"takes over detection as soon as it is ready."
+            )
+        return redirect("image_processing:model_selection")
+
+    # Loaded models with load time and memory: the shared daemon's when it runs,
+    # otherwise this worker's
+    daemon_config = get_daemon_config()
+    loaded_models, registry_source = None, "this worker"
+    if daemon_config["ENABLED"]:
+        try:
+            loaded_models = InferenceClient(daemon_config["SOCKET_PATH"], timeout=2).get_registry_stats()
+            registry_source = "inference daemon"
+        except InferenceDaemonUnavailable:
+            loaded_models = None
+    if loaded_models is None:
+        loaded_models = get_model_registry().stats()
+
+    # Get current active model: the one selected here, else the configured default
+    selected_path = get_selected_model_path()
+    current_model = next(
+        (m['name'] for m in available_models if m['model_file'] == selected_path),
+        getattr(settings, 'ACTIVE_BIRD_MODEL', 'egret_500_model'),
+    )
+    for model in available_models:
+        model['stats'] = next((s for s in loaded_models if s['path'] == model['model_file']), None)
+
     context = {
         "title": "Model Management",
         "available_models": available_models,
         "current_model": current_model,
+        "loaded_models": loaded_models,
+        "registry_source": registry_source,
+        "memory_budget": get_model_registry().memory_budget_bytes,
+        "quantized_variants": QuantizedModelVariant.objects.all()[:10],
+        "int8_on_cpu": get_quantization_config()["USE_INT8_ON_CPU"],
     }
-    
+
     return render(request, "image_processing/model_selection.html", context)
 
 
 @login_required
 def benchmark_models(request):
     """
-    Model Benchmarking: Test and compare AI model performance
+    Model Benchmarking: measured performance of each model and backend
+    (recorded by ``python manage.py benchmark_models``)
     """
-    # Get model performance data (this would come from your benchmarking system)
-    model_performance = [
-        {
-            'name': 'egret_500_model',
-            'accuracy': 0.6828,
-            'precision': 0.6791,
-            'recall': 0.6099,
-            'f1_score': 0.6428,
-            'inference_time': 0.0134,
-            'status': 'active'
-        },
-        {
-            'name': 'yolov8n_birds',
-            'accuracy': 0.87,
-            'precision': 0.84,
-            'recall': 0.82,
-            'f1_score': 0.83,
-            'inference_time': 0.08,
-            'status': 'available'
-        }
-    ]
-    
+    from django.conf import settings
+    from .benchmarking import get_benchmark_config
+    from .model_registry import get_selected_model_path
+    from .models import ModelBenchmarkRun
+
+    runs = list(ModelBenchmarkRun.objects.all()[:200])
+
+    # Latest successful run per model file and backend
+    latest = {}
+    for run in runs:
+        if run.status == ModelBenchmarkRun.Status.SUCCESS:
+            latest.setdefault((run.model_name, run.model_path, run.backend), run)
+
+    selected_path = get_selected_model_path()
+    active_name = getattr(settings, 'ACTIVE_BIRD_MODEL', 'egret_500_model')
+    model_performance = sorted(latest.values(), key=lambda r: (r.model_name, r.backend))
+    for run in model_performance:
+        run.is_active = run.model_path == selected_path if selected_path else run.model_name == active_name
+
+    batch_sizes = sorted({size for run in model_performance for size, _ in run.throughput_by_batch})
+    for run in model_performance:
+        throughput = dict(run.throughput_by_batch)
+        run.throughput_row = [throughput.get(size) for size in batch_sizes]
+
     context = {
         "title": "Model Benchmarking",
         "model_performance": model_performance,
+        "batch_sizes": batch_sizes,
+        "recent_runs": runs[:20],
+        "fixture_dir": get_benchmark_config()["FIXTURE_DIR"],
     }
-    
+
     return render(request, "image_processing/benchmark.html", context)
+
+
+@login_required
+def pipeline_metrics(request):
+    """
+    Rolling per-stage timing histograms of the detection pipeline plus the
+    inference queue wait and utilization, as JSON or in the Prometheus text
+    format (?format=prometheus)
+    """
+    from .inference_daemon import get_admission_stats
+
+    if request.user.role not in ['SUPERADMIN', 'ADMIN']:
+        return JsonResponse({"error": "Administrator access required"}, status=403)
+
+    histograms = pipeline_histograms()
+    admission = get_admission_stats()
+    if request.GET.get("format") == "prometheus":
+        return HttpResponse(prometheus_exposition(histograms, admission), content_type="text/plain; version=0.0.4")
+    return JsonResponse(dict(histograms, admission=admission))
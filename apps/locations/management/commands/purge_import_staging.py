@@ -0,0 +1,21 @@
+"""
+Management command to purge expired census import staging files.
+
+Staged workbooks are also purged opportunistically on each new upload; run this
+from a scheduler to reclaim space when imports are infrequent.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.locations.utils.import_staging import get_import_staging_store
+
+
+class Command(BaseCommand):
+    help = 'Delete staged census import workbooks older than CENSUS_IMPORT_STAGING_TTL'
+
+    def handle(self, *args, **options):
+        store = get_import_staging_store()
+        removed = store.purge_expired()
+        self.stdout.write(
+            self.style.SUCCESS(f"Removed {removed} expired staging file(s) from {store.root}")
+        )
@@ -0,0 +1,33 @@
+"""
+Management command to repair the site/date keys copied onto census observations.
+
+CensusObservation stores site, year, month and census date so analytics and
+exports avoid joining through census, month and year. Normal writes keep
+them consistent; run this after raw SQL fixes or bulk edits of census
+records, or with --check from a scheduler to detect drift.
+
+    python manage.py repair_observation_keys
+    python manage.py repair_observation_keys --check
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.locations.utils.observation_keys import repair_observation_keys, stale_observations
+
+
+class Command(BaseCommand):
+    help = 'Re-copy site, year, month and census date onto census observations where they are stale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report stale observations (exits with an error if any are found)')
+
+    def handle(self, *args, **options):
+        stale = stale_observations().count()
+        if options['check']:
+            if stale:
+                raise CommandError(f"{stale} census observation(s) have stale site/date keys")
+            self.stdout.write(self.style.SUCCESS('All census observation keys are consistent'))
+            return
+        repaired = repair_observation_keys() if stale else 0
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} census observation(s)"))
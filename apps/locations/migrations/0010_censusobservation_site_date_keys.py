@@ -0,0 +1,64 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:44
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def copy_census_keys(apps, schema_editor):
+    """Fill the new site/date keys from census -> month -> year, one UPDATE for all rows"""
+    Census = apps.get_model('locations', 'Census')
+    CensusObservation = apps.get_model('locations', 'CensusObservation')
+
+    def from_census(source):
+        return Subquery(Census.objects.filter(pk=OuterRef('census_id')).values(source)[:1])
+
+    CensusObservation.objects.update(
+        site_id=from_census('month__year__site_id'),
+        year=from_census('month__year__year'),
+        month=from_census('month__month'),
+        census_date=from_census('census_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0009_add_allocation_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='censusobservation',
+            name='census_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='censusobservation',
+            name='month',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='censusobservation',
+            name='site',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='census_observations', to='locations.site'),
+        ),
+        migrations.AddField(
+            model_name='censusobservation',
+            name='year',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(copy_census_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='censusobservation',
+            index=models.Index(fields=['site', 'species', 'census_date', 'count'], name='loc_obs_site_species_date'),
+        ),
+        migrations.AddIndex(
+            model_name='censusobservation',
+            index=models.Index(fields=['species', 'census_date', 'count'], name='loc_obs_species_date'),
+        ),
+        migrations.AddIndex(
+            model_name='censusobservation',
+            index=models.Index(fields=['site', 'year', 'month'], name='loc_obs_site_year_month'),
+        ),
+    ]
@@ -376,6 +376,15 @@ class Census(models.Model):
         print(f"DEBUG: Census.save() - {action} census record ID: {self.id}, Date: {self.census_date}, Birds: {self.total_birds}, Species: {self.total_species}")
         super().save(*args, **kwargs)
 
+    def observation_keys(self):
+        """Site/date keys copied onto this census's observations (see CensusObservation)"""
+        return {
+            "site_id": self.month.year.site_id,
+            "year": self.month.year.year,
+            "month": self.month.month,
+            "census_date": self.census_date,
+        }
+
     def get_observations(self):
         """Get all bird observations for this census"""
         return CensusObservation.objects.filter(census=self)
@@ -457,6 +466,21 @@ class CensusObservation(models.Model):
     family = models.CharField(max_length=100, blank=True, help_text="Bird family (optional)")
     count = models.PositiveIntegerField(validators=[MinValueValidator(1)])
 
+    # Copies of census -> month -> year -> site keys so analytics, totals and
+    # exports filter and group without the four-table join. Kept in step by
+    # save(), the signals below and ``manage.py repair_observation_keys``
+    site = models.ForeignKey(
+        Site,
+        on_delete=models.CASCADE,
+        related_name="census_observations",
+        null=True,
+        blank=True,
+        db_index=False,  # Leading column of the composite index below
+    )
+    year = models.PositiveSmallIntegerField(null=True, blank=True)
+    month = models.PositiveSmallIntegerField(null=True, blank=True)
+    census_date = models.DateField(null=True, blank=True)
+
     # Additional notes removed - behavior_notes field deleted
 
     is_archived = models.BooleanField(default=False, help_text="Archive observation instead of deleting")
@@ -469,13 +493,29 @@ class CensusObservation(models.Model):
         ordering = ["species_name"]
         verbose_name = "Census Observation"
         verbose_name_plural = "Census Observations"
+        indexes = [
+            # count as trailing key so per-site/per-species totals are index-only scans
+            models.Index(fields=["site", "species", "census_date", "count"], name="loc_obs_site_species_date"),
+            models.Index(fields=["species", "census_date", "count"], name="loc_obs_species_date"),
+            models.Index(fields=["site", "year", "month"], name="loc_obs_site_year_month"),
+        ]
 
     def __str__(self):
         return f"{self.species.name if self.species else self.species_name} - {self.count} birds"
 
+    def sync_census_keys(self):
+        """Copy the site/date keys from the census (bulk_create callers pass census.observation_keys())"""
+        if self.census_id:
+            for field, value in self.census.observation_keys().items():
+                setattr(self, field, value)
+
     def save(self, *args, **kwargs):
         """Override save to update census totals"""
         print(f"DEBUG: Saving CensusObservation - Species: {self.species_name if self.species_name else 'Unknown'}, Count: {self.count}")
+        self.sync_census_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"site", "year", "month", "census_date"}
         super().save(*args, **kwargs)
         # Update census totals after saving
         if self.census:
@@ -503,3 +543,30 @@ def update_census_year_summary(sender, instance, **kwargs):
     """Update year summary when month records change"""
     if instance.year:
         instance.year.update_summary()
+
+
+_KEY_SOURCE_FIELDS = {
+    Census: {"month", "month_id", "census_date"},
+    CensusMonth: {"year", "year_id", "month"},
+    CensusYear: {"site", "site_id", "year"},
+}
+
+
+@receiver(post_save, sender=Census)
+@receiver(post_save, sender=CensusMonth)
+@receiver(post_save, sender=CensusYear)
+def sync_observation_keys(sender, instance, created, update_fields=None, **kwargs):
+    """Re-copy site/date keys onto observations when a census, month or year is moved or re-dated"""
+    if created or (update_fields is not None and not _KEY_SOURCE_FIELDS[sender] & set(update_fields)):
+        return  # Nothing observed yet, or only summary fields were saved (the usual case)
+    if sender is Census:
+        observations = CensusObservation.objects.filter(census=instance)
+        keys = instance.observation_keys()
+    elif sender is CensusMonth:
+        observations = CensusObservation.objects.filter(census__month=instance)
+        keys = {"site_id": instance.year.site_id, "year": instance.year.year, "month": instance.month}
+    else:
+        observations = CensusObservation.objects.filter(census__month__year=instance)
+        keys = {"site_id": instance.site_id, "year": instance.year}
+    # Only rows that differ are written, so a plain re-save costs one UPDATE matching nothing
+    observations.exclude(**keys).update(**keys)
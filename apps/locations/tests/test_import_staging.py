@@ -0,0 +1,92 @@
+"""
+Test cases for the census import staging store
+
+Run tests with:
+    python manage.py test apps.locations.tests.test_import_staging
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from apps.locations.utils.import_staging import ImportStagingError, ImportStagingStore
+
+
+class ImportStagingStoreTestCase(SimpleTestCase):
+    """Test staging, lookup and expiry of uploaded workbooks"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = ImportStagingStore(root=self.root, ttl=60)
+        self.user = SimpleNamespace(pk=1)
+        self.other_user = SimpleNamespace(pk=2)
+        self.preview = {'sites': ['DAGA'], 'species': ['Little Egret'], 'total_birds': 12}
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _upload(self, content=b'workbook-bytes'):
+        return SimpleUploadedFile('DAGA_2024.xlsx', content)
+
+    def test_stage_returns_token_and_round_trips(self):
+        """Staged file and preview can be read back with the token"""
+        token = self.store.stage(self._upload(), self.preview, self.user, 'DAGA_2024.xlsx')
+
+        self.assertEqual(len(token), 64)
+        staged = self.store.get_preview(token, self.user)
+        self.assertEqual(staged['preview'], self.preview)
+        self.assertEqual(staged['filename'], 'DAGA_2024.xlsx')
+
+        with self.store.open_workbook(token, self.user) as fh:
+            self.assertEqual(fh.read(), b'workbook-bytes')
+            self.assertEqual(fh.name, 'DAGA_2024.xlsx')
+
+    def test_same_content_same_token(self):
+        """Re-uploading identical content reuses the same staging entry"""
+        first = self.store.stage(self._upload(), self.preview, self.user, 'a.xlsx')
+        second = self.store.stage(self._upload(), self.preview, self.user, 'b.xlsx')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(os.listdir(self.root)), 2)
+
+    def test_other_user_cannot_read_staged_import(self):
+        """Tokens are bound to the uploading user"""
+        token = self.store.stage(self._upload(), self.preview, self.user, 'a.xlsx')
+
+        with self.assertRaises(ImportStagingError):
+            self.store.get_preview(token, self.other_user)
+
+    def test_invalid_token_rejected(self):
+        """Malformed tokens never touch the filesystem"""
+        with self.assertRaises(ImportStagingError):
+            self.store.get_preview('../../etc/passwd', self.user)
+        with self.assertRaises(ImportStagingError):
+            self.store.get_preview(None, self.user)
+
+    def test_discard_removes_files(self):
+        """Discarding a staged import removes both workbook and metadata"""
+        token = self.store.stage(self._upload(), self.preview, self.user, 'a.xlsx')
+        self.store.discard(token)
+
+        self.assertEqual(os.listdir(self.root), [])
+        with self.assertRaises(ImportStagingError):
+            self.store.get_preview(token, self.user)
+
+    def test_purge_expired(self):
+        """Entries older than the TTL are purged, fresh ones are kept"""
+        old_token = self.store.stage(self._upload(b'old'), self.preview, self.user, 'old.xlsx')
+        fresh_token = self.store.stage(self._upload(b'fresh'), self.preview, self.user, 'fresh.xlsx')
+
+        past = time.time() - 120
+        for suffix in ('.xlsx', '.json'):
+            os.utime(os.path.join(self.root, old_token + suffix), (past, past))
+
+        self.assertEqual(self.store.purge_expired(), 2)
+        self.assertEqual(self.store.get_preview(fresh_token, self.user)['filename'], 'fresh.xlsx')
+        with self.assertRaises(ImportStagingError):
+            self.store.get_preview(old_token, self.user)
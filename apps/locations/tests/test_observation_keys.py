@@ -0,0 +1,76 @@
+"""
+Test cases for the site/date keys denormalized onto census observations
+
+Run tests with:
+    python manage.py test apps.locations.tests.test_observation_keys
+"""
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.fauna.models import Species
+from apps.locations.models import Census, CensusMonth, CensusObservation, CensusYear, Site
+from apps.locations.utils.observation_keys import repair_observation_keys, stale_observations
+
+
+User = get_user_model()
+
+
+class ObservationKeysTestCase(TestCase):
+    """Keys follow their census on write and are repaired after out-of-band edits"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            employee_id="TEST101", username="keysuser", password="testpass123", role="ADMIN"
+        )
+        self.site = Site.objects.create(name="Keys Site", site_type="WETLAND", status="active", created_by=self.user)
+        self.other_site = Site.objects.create(name="Other Site", site_type="WETLAND", status="active", created_by=self.user)
+        self.species = Species.objects.create(name="Little Egret", scientific_name="Egretta garzetta", iucn_status="LC")
+        self.year = CensusYear.objects.create(site=self.site, year=2024)
+        self.month = CensusMonth.objects.create(year=self.year, month=3)
+        self.census = Census.objects.create(month=self.month, census_date=date(2024, 3, 10))
+        self.observation = CensusObservation.objects.create(
+            census=self.census, species=self.species, species_name="Little Egret", count=12
+        )
+
+    def keys(self):
+        self.observation.refresh_from_db()
+        return (self.observation.site_id, self.observation.year, self.observation.month, self.observation.census_date)
+
+    def test_keys_are_copied_and_follow_the_census(self):
+        """Creating copies the keys; re-dating a census or moving a year updates them"""
+        self.assertEqual(self.keys(), (self.site.pk, 2024, 3, date(2024, 3, 10)))
+
+        self.census.census_date = date(2024, 3, 17)
+        self.census.save()
+        self.assertEqual(self.keys()[3], date(2024, 3, 17))
+
+        self.year.site = self.other_site
+        self.year.year = 2023
+        self.year.save()
+        self.assertEqual(self.keys()[:2], (self.other_site.pk, 2023))
+        self.assertFalse(stale_observations().exists())
+
+    def test_repair_fixes_out_of_band_edits(self):
+        """Queryset updates bypass the signals; the repair command re-copies the keys"""
+        Census.objects.filter(pk=self.census.pk).update(census_date=date(2024, 3, 24))
+        CensusObservation.objects.filter(pk=self.observation.pk).update(site=None)
+        self.assertEqual(stale_observations().count(), 1)
+
+        with self.assertRaises(CommandError):
+            call_command('repair_observation_keys', '--check')
+        self.assertEqual(repair_observation_keys(), 1)
+        self.assertEqual(self.keys(), (self.site.pk, 2024, 3, date(2024, 3, 24)))
+        call_command('repair_observation_keys', '--check')
+
+    def test_family_totals_api_filters_on_stored_site(self):
+        """The totals API reads the site key from the observation itself"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('locations:family_totals_api', args=[self.site.pk]))
+        self.assertEqual(response.json()['total_birds'], 12)
+        response = self.client.get(reverse('locations:family_totals_api', args=[self.other_site.pk]))
+        self.assertEqual(response.json()['total_birds'], 0)
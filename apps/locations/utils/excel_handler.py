@@ -11,6 +11,7 @@ from typing import Dict, List, Tuple
 
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 
@@ -688,6 +689,33 @@ class CensusExcelHandler:
             results['info_messages'].append(f"Detected months: {available_months}")
             results['info_messages'].append(f"Importing months: {months_to_import}")
 
+            # Species by lower-cased common and scientific name, loaded once
+            # (same match as name__iexact | scientific_name__iexact ... first())
+            species_lookup = {}
+            for candidate in Species.objects.select_related('family'):
+                for key in (candidate.name, candidate.scientific_name):
+                    if key:
+                        species_lookup.setdefault(key.lower(), candidate)
+            sites_by_name = {}
+            families_by_name = {}
+
+            def get_family(family_name):
+                """BirdFamily.get_or_create by name, once per family per import"""
+                bird_family = families_by_name.get(family_name.lower())
+                if bird_family is not None:
+                    return bird_family, False
+                bird_family, created = BirdFamily.objects.get_or_create(
+                    name__iexact=family_name,
+                    defaults={
+                        'name': family_name,
+                        'display_name': family_name.title(),
+                        'category': 'WATER_BIRDS',  # Default category
+                        'is_active': True
+                    }
+                )
+                families_by_name[family_name.lower()] = bird_family
+                return bird_family, created
+
             # Read data rows starting from detected data start row
             data_start_row = structure['data_start_row'] or 8
             for row_num, row in enumerate(ws.iter_rows(min_row=data_start_row, values_only=True), start=data_start_row):
@@ -763,23 +791,12 @@ class CensusExcelHandler:
                     continue
                 
                 # Find or validate species (create if not exists for import)
-                species = Species.objects.filter(
-                    Q(name__iexact=species_name) |
-                    Q(scientific_name__iexact=species_name)
-                ).first()
+                species = species_lookup.get(species_name.lower())
 
                 # If species exists but has no family, try to assign one
                 if species and not species.family and family_name:
                     try:
-                        bird_family, created = BirdFamily.objects.get_or_create(
-                            name__iexact=family_name,
-                            defaults={
-                                'name': family_name,
-                                'display_name': family_name.title(),
-                                'category': 'WATER_BIRDS',  # Default category
-                                'is_active': True
-                            }
-                        )
+                        bird_family, created = get_family(family_name)
                         species.family = bird_family
                         species.save(update_fields=['family'])
                         if created:
@@ -795,15 +812,7 @@ class CensusExcelHandler:
                         # Find or create BirdFamily for this species
                         bird_family = None
                         if family_name:
-                            bird_family, created = BirdFamily.objects.get_or_create(
-                                name__iexact=family_name,
-                                defaults={
-                                    'name': family_name,
-                                    'display_name': family_name.title(),
-                                    'category': 'WATER_BIRDS',  # Default category
-                                    'is_active': True
-                                }
-                            )
+                            bird_family, created = get_family(family_name)
                             if created:
                                 results['info_messages'].append(f"Created new family '{family_name}'")
                         
@@ -814,6 +823,7 @@ class CensusExcelHandler:
                             family=bird_family,  # Link to BirdFamily
                             iucn_status='LC'  # Default to Least Concern
                         )
+                        species_lookup.setdefault(species_name.lower(), species)
                         results['created_species'] = results.get('created_species', 0) + 1
                     except Exception as e:
                         results['errors'].append(
@@ -830,19 +840,22 @@ class CensusExcelHandler:
                 if site_coordinates and site_name in site_coordinates:
                     site_coords = site_coordinates[site_name]
                 
-                site, created = Site.objects.get_or_create(
-                    name__iexact=site_name,
-                    defaults={
-                        'name': site_name,
-                        'status': 'active',
-                        'coordinates': site_coords,
-                        'description': f'Site created during import from Excel data'
-                    }
-                )
-                if created:
-                    results['info_messages'].append(
-                        f"Created new site '{site_name}' automatically"
+                site = sites_by_name.get(site_name.lower())
+                if site is None:
+                    site, created = Site.objects.get_or_create(
+                        name__iexact=site_name,
+                        defaults={
+                            'name': site_name,
+                            'status': 'active',
+                            'coordinates': site_coords,
+                            'description': f'Site created during import from Excel data'
+                        }
                     )
+                    sites_by_name[site_name.lower()] = site
+                    if created:
+                        results['info_messages'].append(
+                            f"Created new site '{site_name}' automatically"
+                        )
 
                 # Process monthly counts for detected months
                 monthly_data = []
@@ -957,18 +970,24 @@ class CensusExcelHandler:
                     if created:
                         results['created_census'] += 1
                     
+                    # Existing observations of this census by species, one query
+                    observations_by_species = {}
+                    for existing in CensusObservation.objects.filter(census=census):
+                        observations_by_species.setdefault(existing.species_id, existing)
+                    to_create, to_update = [], {}
+                    keys = census.observation_keys()
+                    
                     # Add observations
                     for obs_data in census_data['observations']:
                         # Check for duplicates
-                        existing = CensusObservation.objects.filter(
-                            census=census,
-                            species=obs_data['species']
-                        ).first()
+                        existing = observations_by_species.get(obs_data['species'].pk)
                         
                         if existing:
                             # Update count instead of creating duplicate
                             existing.count += obs_data['count']
-                            existing.save()
+                            if not existing._state.adding:
+                                existing.updated_at = timezone.now()
+                                to_update[existing.pk] = existing
                             results['errors'].append(
                                 f"Row {obs_data['row_num']}: Duplicate observation for "
                                 f"{obs_data['species_name']} in {obs_data['month_name']} - "
@@ -976,14 +995,22 @@ class CensusExcelHandler:
                             )
                         else:
                             # Store family information in the family field
-                            CensusObservation.objects.create(
+                            observation = CensusObservation(
                                 census=census,
                                 species=obs_data['species'],
                                 species_name=obs_data['species_name'],
                                 family=obs_data.get('family', ''),  # Use family from obs_data
-                                count=obs_data['count']
+                                count=obs_data['count'],
+                                **keys,  # bulk_create skips save()
                             )
+                            observations_by_species[obs_data['species'].pk] = observation
+                            to_create.append(observation)
                             results['created_observations'] += 1
+                    
+                    # Bulk writes bypass save() and the rollup signals: roll up once per census
+                    CensusObservation.objects.bulk_create(to_create)
+                    CensusObservation.objects.bulk_update(list(to_update.values()), ['count', 'updated_at'])
+                    census.update_totals()
             
             return results
             
@@ -1012,44 +1039,43 @@ class CensusExcelHandler:
             cell.fill = header_fill
             cell.font = header_font
         
-        # Build query
-        observations = CensusObservation.objects.select_related(
-            'census__month__year__site',
-            'species'
-        ).all()
+        # Build query (site/year/month/date are stored on the observation)
+        observations = CensusObservation.objects.values(
+            'site__name', 'species_name', 'year', 'month', 'count'
+        )
         
         # Apply filters
         if filters:
             if filters.get('site_id'):
                 observations = observations.filter(
-                    census__month__year__site_id=filters['site_id']
+                    site_id=filters['site_id']
                 )
             if filters.get('year'):
                 observations = observations.filter(
-                    census__month__year__year=filters['year']
+                    year=filters['year']
                 )
             if filters.get('month'):
                 observations = observations.filter(
-                    census__month__month=filters['month']
+                    month=filters['month']
                 )
             if filters.get('start_date'):
                 observations = observations.filter(
-                    census__census_date__gte=filters['start_date']
+                    census_date__gte=filters['start_date']
                 )
             if filters.get('end_date'):
                 observations = observations.filter(
-                    census__census_date__lte=filters['end_date']
+                    census_date__lte=filters['end_date']
                 )
         
         # Group observations by site, species, and year for family-grouped export
         species_data = {}
         
-        for obs in observations.order_by('census__month__year__site__name', 'species_name', 'census__month__year__year', 'census__month__month'):
-            site_name = obs.census.month.year.site.name
-            species_name = obs.species_name
-            year = obs.census.month.year.year
-            month = obs.census.month.month
-            count = obs.count
+        for obs in observations.order_by('site__name', 'species_name', 'year', 'month'):
+            site_name = obs['site__name']
+            species_name = obs['species_name']
+            year = obs['year']
+            month = obs['month']
+            count = obs['count']
             
             # Create key for grouping
             key = (site_name, species_name, year)
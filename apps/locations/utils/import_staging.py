@@ -0,0 +1,174 @@
+"""
+Server-side staging for census workbook imports
+AGENTS.md §3 File Organization - Utility module for the import flow
+
+The import flow spans three requests (upload -> preview -> confirm). Instead of
+round-tripping the workbook through the session as base64, the raw file and its
+parsed preview are written to a staging directory keyed by the SHA-256 of the
+uploader and file content. The session only carries that key as a token.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.files import File
+
+
+DEFAULT_STAGING_TTL = 6 * 60 * 60  # 6 hours
+
+
+class ImportStagingError(Exception):
+    """Raised when a staged import is missing, expired or not owned by the user"""
+    pass
+
+
+class ImportStagingStore:
+    """
+    Disk-backed staging area for uploaded census workbooks.
+
+    Each staged upload is stored as two files under the staging directory:
+    ``<token>.xlsx`` with the raw workbook and ``<token>.json`` with the parsed
+    preview, original filename, owner and creation time. Entries older than the
+    TTL are purged opportunistically on every new upload and by the
+    ``purge_import_staging`` management command.
+    """
+
+    WORKBOOK_SUFFIX = ".xlsx"
+    META_SUFFIX = ".json"
+
+    def __init__(self, root=None, ttl: Optional[int] = None):
+        self.root = Path(root or getattr(
+            settings, "CENSUS_IMPORT_STAGING_DIR", Path(settings.BASE_DIR) / "temp" / "census_import_staging"
+        ))
+        self.ttl = ttl if ttl is not None else getattr(settings, "CENSUS_IMPORT_STAGING_TTL", DEFAULT_STAGING_TTL)
+
+    def _workbook_path(self, token: str) -> Path:
+        return self.root / f"{token}{self.WORKBOOK_SUFFIX}"
+
+    def _meta_path(self, token: str) -> Path:
+        return self.root / f"{token}{self.META_SUFFIX}"
+
+    @staticmethod
+    def _is_valid_token(token) -> bool:
+        return (
+            isinstance(token, str)
+            and len(token) == 64
+            and all(c in "0123456789abcdef" for c in token)
+        )
+
+    def stage(self, uploaded_file, preview: Dict, user, filename: str) -> str:
+        """
+        Stream the uploaded workbook to disk while hashing it and store the
+        parsed preview next to it. Returns the token to keep in the session.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+
+        # The owner is folded into the hash so two users staging the same
+        # workbook never share (and overwrite) one entry
+        digest = hashlib.sha256(f"{getattr(user, 'pk', '')}:".encode())
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            uploaded_file.seek(0)
+            with os.fdopen(fd, "wb") as tmp:
+                chunks = uploaded_file.chunks() if hasattr(uploaded_file, "chunks") else iter(
+                    lambda: uploaded_file.read(64 * 1024), b""
+                )
+                for chunk in chunks:
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            token = digest.hexdigest()
+            # Identical content is stored once; a re-upload just refreshes the entry
+            os.replace(tmp_path, self._workbook_path(token))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            uploaded_file.seek(0)
+
+        meta = {
+            "filename": filename,
+            "user_id": str(user.pk) if user is not None else None,
+            "created_at": time.time(),
+            "preview": preview,
+        }
+        meta_tmp = self._meta_path(token).with_suffix(".json.part")
+        with open(meta_tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, default=str)
+        os.replace(meta_tmp, self._meta_path(token))
+
+        return token
+
+    def _load_meta(self, token: str, user) -> Dict:
+        if not self._is_valid_token(token):
+            raise ImportStagingError("Invalid import token")
+
+        meta_path = self._meta_path(token)
+        if not meta_path.exists() or not self._workbook_path(token).exists():
+            raise ImportStagingError("Staged import not found or already processed")
+
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+
+        if self._is_expired(meta.get("created_at", 0)):
+            self.discard(token)
+            raise ImportStagingError("Staged import has expired. Please upload the file again.")
+
+        if user is not None and meta.get("user_id") != str(user.pk):
+            raise ImportStagingError("Staged import belongs to another user")
+
+        return meta
+
+    def get_preview(self, token: str, user) -> Dict:
+        """Return the parsed preview and original filename of a staged import"""
+        meta = self._load_meta(token, user)
+        return {"preview": meta["preview"], "filename": meta["filename"]}
+
+    def open_workbook(self, token: str, user) -> File:
+        """Open the staged workbook as a Django File carrying the original filename"""
+        meta = self._load_meta(token, user)
+        return File(open(self._workbook_path(token), "rb"), name=meta["filename"])
+
+    def discard(self, token: str) -> None:
+        """Remove a staged import (after a successful import or on expiry)"""
+        if not self._is_valid_token(token):
+            return
+        for path in (self._workbook_path(token), self._meta_path(token)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _is_expired(self, created_at: float, now: Optional[float] = None) -> bool:
+        now = now if now is not None else time.time()
+        return now - created_at > self.ttl
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Delete staged imports (and stray partial writes) older than the TTL"""
+        if not self.root.exists():
+            return 0
+
+        now = now if now is not None else time.time()
+        removed = 0
+        for path in self.root.iterdir():
+            if not path.is_file():
+                continue
+            try:
+                if self._is_expired(path.stat().st_mtime, now):
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+def get_import_staging_store() -> ImportStagingStore:
+    """Return a staging store configured from settings"""
+    return ImportStagingStore()
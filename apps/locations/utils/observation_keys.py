@@ -0,0 +1,39 @@
+"""
+Consistency checks for the site/date keys denormalized onto CensusObservation
+AGENTS.md §3 File Organization - Utility module for census data maintenance
+
+CensusObservation carries copies of census.month.year.site_id, the census
+year and month and census.census_date so analytics, totals and exports can
+filter and group on one table using the composite indexes. Writes keep them
+in step (CensusObservation.save, the bulk allocation path and the census /
+month / year signals); anything that bypasses those (raw SQL, queryset
+update() of a census) is found and fixed here.
+"""
+
+from django.db.models import F, OuterRef, Q, Subquery
+
+from apps.locations.models import Census, CensusObservation
+
+# Observation field -> lookup on Census it is copied from
+KEY_SOURCES = {
+    "site_id": "month__year__site_id",
+    "year": "month__year__year",
+    "month": "month__month",
+    "census_date": "census_date",
+}
+
+
+def stale_observations():
+    """Observations whose copied keys are missing or differ from their census"""
+    stale = Q()
+    for field, source in KEY_SOURCES.items():
+        stale |= Q(**{f"{field}__isnull": True}) | ~Q(**{field: F(f"census__{source}")})
+    return CensusObservation.objects.filter(stale)
+
+
+def repair_observation_keys() -> int:
+    """Re-copy the keys of every stale observation in one UPDATE; returns the rows fixed"""
+    return stale_observations().update(**{
+        field: Subquery(Census.objects.filter(pk=OuterRef("census_id")).values(source)[:1])
+        for field, source in KEY_SOURCES.items()
+    })
@@ -19,21 +19,20 @@ def family_grouped_view(request, site_id, year=None, month=None):
     """
     site = get_object_or_404(Site, id=site_id)
     
-    # Build query for observations
+    # Build query for observations (site/year/month are stored on the observation)
     observations = CensusObservation.objects.filter(
-        census__month__year__site=site
-    ).select_related(
-        'census__month__year',
-        'species'
-    ).order_by('census__month__year__year', 'census__month__month', 'species_name')
+        site=site
+    ).only(
+        'species_name', 'family', 'count', 'year', 'month'
+    ).order_by('year', 'month', 'species_name')
     
     # Apply filters
     if year:
         year_obj = get_object_or_404(CensusYear, site=site, year=year)
-        observations = observations.filter(census__month__year=year_obj)
+        observations = observations.filter(year=year_obj.year)
         if month:
             month_obj = get_object_or_404(CensusMonth, year=year_obj, month=month)
-            observations = observations.filter(census__month=month_obj)
+            observations = observations.filter(month=month_obj.month)
     
     # Group observations by family (use the family field from the model)
     family_data = {}
@@ -76,7 +75,7 @@ def family_grouped_view(request, site_id, year=None, month=None):
         family_data[family_name]['total_observations'] += 1
         
         # Track by month
-        month_key = f"{obs.census.month.year.year}-{obs.census.month.month:02d}"
+        month_key = f"{obs.year}-{obs.month:02d}"
         if month_key not in family_data[family_name]['months']:
             family_data[family_name]['months'][month_key] = 0
         family_data[family_name]['months'][month_key] += obs.count
@@ -139,64 +138,48 @@ def site_totals_view(request, site_id):
     """
     site = get_object_or_404(Site, id=site_id)
     
-    # Get all observations for this site
-    observations = CensusObservation.objects.filter(
-        census__month__year__site=site
-    ).select_related(
-        'census__month__year',
-        'species'
-    )
+    # All observations for this site, grouped in SQL on the stored site/year/month keys
+    observations = CensusObservation.objects.filter(site=site)
     
     # Calculate yearly totals
     yearly_data = {}
-    for obs in observations:
-        year = obs.census.month.year.year
-        if year not in yearly_data:
-            yearly_data[year] = {
-                'total_birds': 0,
-                'total_species': set(),
-                'total_observations': 0,
-                'months': {}
-            }
-        
-        yearly_data[year]['total_birds'] += obs.count
-        yearly_data[year]['total_species'].add(obs.species_name)
-        yearly_data[year]['total_observations'] += 1
-        
-        # Monthly breakdown within year
-        month = obs.census.month.month
-        if month not in yearly_data[year]['months']:
-            yearly_data[year]['months'][month] = {
-                'total_birds': 0,
-                'species': set(),
-                'observations': 0
-            }
-        
-        yearly_data[year]['months'][month]['total_birds'] += obs.count
-        yearly_data[year]['months'][month]['species'].add(obs.species_name)
-        yearly_data[year]['months'][month]['observations'] += 1
-    
-    # Convert sets to counts for JSON serialization
-    for year_data in yearly_data.values():
-        year_data['total_species'] = len(year_data['total_species'])
-        for month_data in year_data['months'].values():
-            month_data['species'] = len(month_data['species'])
+    for row in observations.values('year').annotate(
+        total_birds=Sum('count'),
+        total_species=Count('species_name', distinct=True),
+        total_observations=Count('id'),
+    ).order_by('year'):
+        yearly_data[row['year']] = {
+            'total_birds': row['total_birds'],
+            'total_species': row['total_species'],
+            'total_observations': row['total_observations'],
+            'months': {}
+        }
+    
+    # Monthly breakdown within year
+    for row in observations.values('year', 'month').annotate(
+        total_birds=Sum('count'),
+        species=Count('species_name', distinct=True),
+        observations=Count('id'),
+    ).order_by('year', 'month'):
+        yearly_data[row['year']]['months'][row['month']] = {
+            'total_birds': row['total_birds'],
+            'species': row['species'],
+            'observations': row['observations']
+        }
+    
+    # Get species totals (top species and the distinct species count)
+    species_counts = dict(
+        observations.values_list('species_name').annotate(total=Sum('count')).order_by()
+    )
     
     # Calculate overall site totals
     site_totals = {
         'total_years': len(yearly_data),
         'total_birds': sum(year_data['total_birds'] for year_data in yearly_data.values()),
-        'total_species': len(set(obs.species_name for obs in observations)),
-        'total_observations': observations.count(),
+        'total_species': len(species_counts),
+        'total_observations': sum(year_data['total_observations'] for year_data in yearly_data.values()),
     }
     
-    # Get top species
-    species_counts = {}
-    for obs in observations:
-        if obs.species_name not in species_counts:
-            species_counts[obs.species_name] = 0
-        species_counts[obs.species_name] += obs.count
-    
     top_species = sorted(species_counts.items(), key=lambda x: x[1], reverse=True)[:10]
     
     context = {
@@ -219,7 +202,7 @@ def family_totals_api(request, site_id):
     
     # Get observations
     observations = CensusObservation.objects.filter(
-        census__month__year__site=site
+        site=site
     ).values('species_name').annotate(
         total_count=Sum('count'),
         observation_count=Count('id')
@@ -17,9 +17,17 @@ from django.core.paginator import Paginator
 
 from .models import Site, CensusYear, CensusMonth, Census, CensusObservation
 from .utils.excel_handler import CensusExcelHandler, ExcelImportError
+from .utils.import_staging import ImportStagingError, get_import_staging_store
 from apps.fauna.models import Species
 
 
+def _discard_staged_import(request):
+    """Drop the staged workbook referenced by the session, if any"""
+    token = request.session.pop('import_token', None)
+    if token:
+        get_import_staging_store().discard(token)
+
+
 @login_required
 def census_import_export_hub(request):
     """
@@ -101,19 +109,14 @@ def import_census_data(request):
             # Preview data first (don't import yet)
             preview_results = CensusExcelHandler.preview_import(excel_file, request.user)
             
-            # Store file content as base64 string for session storage
-            import base64
-            excel_file.seek(0)  # Reset file pointer
-            file_content = excel_file.read()
-            file_content_b64 = base64.b64encode(file_content).decode('utf-8')
-            
-            # Store preview results in session (without file object)
-            preview_results['file_content_b64'] = file_content_b64
+            # Stage the workbook and parsed preview on the server; the session
+            # only keeps the content-hash token
             preview_results['detected_structure'] = structure  # Store detected structure
             preview_results.pop('file_data', None)  # Remove the file object
-            
-            request.session['import_preview'] = preview_results
-            request.session['import_filename'] = excel_file.name
+            _discard_staged_import(request)
+            request.session['import_token'] = get_import_staging_store().stage(
+                excel_file, preview_results, request.user, excel_file.name
+            )
             
             return redirect('locations:import_preview')
             
@@ -144,12 +147,15 @@ def import_preview(request):
     Step 2: Show preview of what will be imported
     Allow user to confirm before actually importing
     """
-    preview_data = request.session.get('import_preview')
-    filename = request.session.get('import_filename', 'Unknown file')
-    
-    if not preview_data:
+    try:
+        staged = get_import_staging_store().get_preview(request.session.get('import_token'), request.user)
+    except ImportStagingError:
+        request.session.pop('import_token', None)
         messages.error(request, "No import preview found. Please upload a file first.")
         return redirect('locations:import_census_data')
+
+    preview_data = staged['preview']
+    filename = staged['filename']
     
     # Check which sites already exist
     from apps.locations.models import Site
@@ -174,10 +180,12 @@ def confirm_import(request):
     if request.method != 'POST':
         return redirect('locations:import_census_data')
     
-    preview_data = request.session.get('import_preview')
-    filename = request.session.get('import_filename', 'Unknown file')
-    
-    if not preview_data:
+    token = request.session.get('import_token')
+    staging = get_import_staging_store()
+    try:
+        staging.get_preview(token, request.user)
+    except ImportStagingError:
+        request.session.pop('import_token', None)
         messages.error(request, "No import preview found. Please upload a file first.")
         return redirect('locations:import_census_data')
     
@@ -198,27 +206,10 @@ def confirm_import(request):
                 site_coordinates[site_name] = f"{lat}, {lng}"
     
     try:
-        # Recreate file object from stored base64 content
-        import base64
-        from django.core.files.uploadedfile import InMemoryUploadedFile
-        from io import BytesIO
-        
-        file_content_b64 = preview_data['file_content_b64']
-        file_content = base64.b64decode(file_content_b64.encode('utf-8'))
-        file_buffer = BytesIO(file_content)
-        
-        # Create a new InMemoryUploadedFile object
-        recreated_file = InMemoryUploadedFile(
-            file_buffer,
-            None,
-            filename,
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            len(file_content),
-            None
-        )
-        
-        # Re-import with actual data creation (pass year and coordinates)
-        results = CensusExcelHandler.import_from_excel(recreated_file, request.user, import_year, site_coordinates)
+        # Re-open the staged workbook and import with actual data creation
+        # (pass year and coordinates)
+        with staging.open_workbook(token, request.user) as staged_file:
+            results = CensusExcelHandler.import_from_excel(staged_file, request.user, import_year, site_coordinates)
         
         # Show results
         if results['successful'] > 0:
@@ -244,12 +235,15 @@ def confirm_import(request):
         request.session['import_ai_matches'] = results.get('ai_matches', 0)
         request.session['import_created_species'] = results.get('created_species', 0)
         
-        # Clear preview data
-        request.session.pop('import_preview', None)
-        request.session.pop('import_filename', None)
+        # Clear staged import
+        _discard_staged_import(request)
 
         return redirect('locations:import_results')
         
+    except ImportStagingError as e:
+        request.session.pop('import_token', None)
+        messages.error(request, f"Import failed: {str(e)}")
+        return redirect('locations:import_census_data')
     except ExcelImportError as e:
         messages.error(request, f"Import failed: {str(e)}")
         return redirect('locations:import_preview')
@@ -304,7 +304,8 @@ class UserActivity(models.Model):
     user_agent = models.TextField(blank=True, null=True)
     severity = models.CharField(max_length=20, choices=Severity.choices, default=Severity.MEDIUM)
     metadata = models.JSONField(default=dict, blank=True)  # Store additional data
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: buffered audit writes keep the time the event happened
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ["-timestamp"]
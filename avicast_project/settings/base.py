@@ -111,6 +111,15 @@ DATABASES = {
     "default": env.db("DATABASE_URL", default="sqlite:///db.sqlite3"),
 }
 
+# Opt-in SQLite profile applied to every new connection: WAL journal,
+# synchronous=NORMAL, busy timeout, mmap, page cache, in-memory temp store and
+# a periodic PRAGMA optimize (apps/common/utils/sqlite_profile.py).
+# Compare with ``manage.py benchmark_sqlite``
+SQLITE_PROFILE = {
+    "ENABLED": env.bool("SQLITE_PROFILE", default=False),
+    "BUSY_TIMEOUT_MS": env.int("SQLITE_BUSY_TIMEOUT_MS", default=5000),
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -151,6 +160,10 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Census import staging (uploaded workbooks kept between preview and confirm)
+CENSUS_IMPORT_STAGING_DIR = BASE_DIR / "temp" / "census_import_staging"
+CENSUS_IMPORT_STAGING_TTL = env.int("CENSUS_IMPORT_STAGING_TTL", default=6 * 60 * 60)  # seconds
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -182,6 +195,141 @@ AXES_LOCKOUT_CALLABLE = "axes.lockout.database_lockout"
 # Fix for session_hash constraint issue - disable access logging
 AXES_ACCESS_LOG_ENABLE = False
 
+# Audit logging (AuditLoggingMiddleware). Events are buffered in process and
+# written in batches by a background thread; set AUDIT_LOG_ASYNC=False to
+# write each event synchronously (e.g. in tests)
+AUDIT_LOG_SINK = {
+    "ASYNC": env.bool("AUDIT_LOG_ASYNC", default=True),
+    "BATCH_SIZE": 100,
+    "FLUSH_INTERVAL": 2.0,  # seconds
+    "MAX_QUEUE_SIZE": 10000,
+}
+
+# Shared inference daemon (manage.py run_inference_daemon). When enabled, web
+# workers send images to the daemon over a Unix socket instead of loading their
+# own YOLO model; detection falls back to the in-process model when the daemon
+# is not running
+INFERENCE_DAEMON = {
+    "ENABLED": env.bool("INFERENCE_DAEMON_ENABLED", default=False),
+    "SOCKET_PATH": env("INFERENCE_DAEMON_SOCKET", default=str(BASE_DIR / "temp" / "inference.sock")),
+    "MAX_BATCH_SIZE": env.int("INFERENCE_DAEMON_MAX_BATCH_SIZE", default=8),
+    "MAX_BATCH_WAIT_MS": 10,
+    "TIMEOUT": 120.0,  # seconds
+    "FALLBACK_IN_PROCESS": True,
+}
+
+# Process-wide detection model registry: loaded models are shared per
+# (path, backend, device) and least recently used ones are unloaded beyond the
+# memory budget
+BIRD_MODEL_REGISTRY = {
+    "MEMORY_BUDGET_MB": env.int("BIRD_MODEL_MEMORY_BUDGET_MB", default=2048),
+    "BACKEND": "ultralytics",
+}
+
+# Sliced inference for high-resolution colony photos (apps/image_processing/tiling.py).
+# MODE: "off", "adaptive" (tile only for small coarse boxes or large images) or "always"
+BIRD_DETECTION_TILING = {
+    "MODE": env("BIRD_DETECTION_TILING", default="off"),
+    "TILE_SIZE": 640,
+    "OVERLAP": 0.2,
+    "MAX_TILES": 48,
+    "SIZE_THRESHOLD": 4000,
+    "SMALL_BOX_PX": 24,
+    "NMS_IOU": 0.45,
+}
+
+# Model benchmarking (python manage.py benchmark_models): fixture images and
+# measurement settings; results are shown on the Model Benchmarking page
+BIRD_MODEL_BENCHMARK = {
+    "FIXTURE_DIR": env("BIRD_MODEL_BENCHMARK_FIXTURES", default=str(BASE_DIR / "benchmark_fixtures")),
+    "MAX_FIXTURES": 32,
+    "BATCH_SIZES": [1, 4, 8, 16],
+    "WARM_ITERATIONS": 50,
+    "THROUGHPUT_IMAGES": 64,
+    "IMAGE_SIZE": 640,
+}
+
+# INT8 quantized CPU variants (python manage.py quantize_model): a variant is
+# only served if mAP@0.5 and every species' recall on the labeled holdout stay
+# within the tolerances of the FP32 model
+BIRD_MODEL_QUANTIZATION = {
+    "USE_INT8_ON_CPU": env.bool("BIRD_MODEL_INT8_ON_CPU", default=False),
+    "METHOD": env("BIRD_MODEL_QUANTIZATION_METHOD", default="onnx"),
+    "HOLDOUT_DIR": env("BIRD_MODEL_HOLDOUT_DIR", default=str(BASE_DIR / "benchmark_fixtures" / "holdout")),
+    "MAP_TOLERANCE": 0.02,
+    "RECALL_TOLERANCE": 0.05,
+    "IOU_THRESHOLD": 0.5,
+    "EVAL_CONFIDENCE": 0.01,
+}
+
+# Inference concurrency: PyTorch/OpenCV threads per model replica (process)
+# and admission control in front of the model. REPLICAS is the number of
+# processes holding a model on this host (web workers, or 1 with the daemon);
+# python manage.py benchmark_concurrency finds the best split
+INFERENCE_CONCURRENCY = {
+    "CPU_CORES": env.int("INFERENCE_CPU_CORES", default=0) or None,
+    "REPLICAS": env.int("INFERENCE_REPLICAS", default=0) or None,
+    "THREADS_PER_REPLICA": env.int("INFERENCE_THREADS", default=0) or None,
+    "INTEROP_THREADS": 1,
+    "OPENCV_THREADS": 1,
+    "SLOTS": 1,
+    "MAX_QUEUE": env.int("INFERENCE_MAX_QUEUE", default=32),
+    "QUEUE_TIMEOUT": 60.0,
+}
+
+# Detection pipeline stage timings: histograms over the most recent results
+# (System Monitoring page and /image-processing/metrics/pipeline/)
+PIPELINE_TIMING = {
+    "ROLLING_WINDOW": env.int("PIPELINE_TIMING_WINDOW", default=500),
+    "CACHE_SECONDS": 30,
+}
+
+# Uploaded files are hashed (SHA-256) while they stream in; the hash keys the
+# detection result cache
+FILE_UPLOAD_HANDLERS = [
+    "apps.common.utils.upload_hashing.HashingMemoryFileUploadHandler",
+    "apps.common.utils.upload_hashing.HashingTemporaryFileUploadHandler",
+]
+
+# Bulk upload of many images or ZIP archives per request: files are streamed to
+# storage and hashed while written, then queued for detection as one batch
+BULK_UPLOAD = {
+    "MAX_FILES": env.int("BULK_UPLOAD_MAX_FILES", default=1000),
+    "MAX_FILE_SIZE": 50 * 1024 * 1024,
+    "PROCESS_IN_BACKGROUND": env.bool("BULK_UPLOAD_PROCESS_IN_BACKGROUND", default=True),
+}
+DATA_UPLOAD_MAX_NUMBER_FILES = BULK_UPLOAD["MAX_FILES"]
+
+# Reflect stage review queue: keyset page size and bulk action limit
+REVIEW_QUEUE = {
+    "PAGE_SIZE": env.int("REVIEW_QUEUE_PAGE_SIZE", default=20),
+    "MAX_BULK_RESULTS": 500,
+}
+
+# Detection result cache keyed by image content, model, threshold and
+# preprocessing version. PERCEPTUAL_HASH also flags near-duplicate uploads
+DETECTION_CACHE = {
+    "ENABLED": env.bool("DETECTION_CACHE_ENABLED", default=True),
+    "PERCEPTUAL_HASH": env.bool("DETECTION_CACHE_PERCEPTUAL_HASH", default=False),
+    "NEAR_DUPLICATE_DISTANCE": 6,
+}
+
+# Raw (pre-threshold) detections kept per result so a new confidence threshold
+# can be applied to stored results with ``manage.py rethreshold_results``
+DETECTION_RETHRESHOLD = {
+    "STORE_RAW": env.bool("DETECTION_STORE_RAW", default=True),
+    "RAW_CONFIDENCE_FLOOR": 0.05,
+    "NMS_IOU": 0.45,
+}
+
+# Query-count / query-plan regression suite (apps/common/test_performance.py).
+# Set PERF_REPORT_DIR to keep one JSON report per run; run against PostgreSQL by
+# pointing DATABASE_URL at it
+PERFORMANCE_SUITE = {
+    "REPORT_DIR": env("PERF_REPORT_DIR", default=None),
+    "TIME_FACTOR": env.float("PERF_TIME_FACTOR", default=1.0),
+}
+
 # Cache configuration for rate limiting (fallback to file-based cache)
 CACHES = {
     "default": {
@@ -21,6 +21,8 @@ django.setup()
 from django.core.management import call_command
 from django.conf import settings
 
+from apps.common.utils.sqlite_profile import remove_database_files
+
 
 class SimpleRestore:
     def __init__(self):
@@ -61,24 +63,33 @@ class SimpleRestore:
             with zipfile.ZipFile(backup_file, 'r') as zipf:
                 zipf.extractall(temp_dir)
             
-            # Find database backup
+            # Find database backup: a SQLite snapshot (manage.py backup_database)
+            # or a JSON dump
+            db_snapshots = list(temp_dir.glob("database_*.sqlite3"))
             db_files = list(temp_dir.glob("database_*.json"))
-            if db_files:
-                print(f"[DB] Restoring database from {db_files[0].name}...")
+            if db_snapshots or db_files:
+                print(f"[DB] Restoring database from {(db_snapshots or db_files)[0].name}...")
                 
-                # Delete existing database
+                # Delete existing database together with its -wal/-shm files:
+                # a leftover WAL would be replayed into the restored database
                 db_path = Path(settings.DATABASES['default']['NAME'])
-                if db_path.exists():
-                    db_path.unlink()
-                    print(f"[DB] Deleted existing database: {db_path}")
-                
-                # Run migrations
-                call_command('migrate', interactive=False)
-                print("[DB] Database schema migrated")
+                remove_database_files(db_path)
+                print(f"[DB] Deleted existing database: {db_path}")
                 
-                # Load data
-                call_command('loaddata', str(db_files[0]), verbosity=0)
-                print("[OK] Database restored successfully")
+                if db_snapshots:
+                    import shutil
+                    shutil.copy2(db_snapshots[0], db_path)
+                    # Bring an older snapshot up to the current schema
+                    call_command('migrate', interactive=False)
+                    print("[OK] Database restored successfully")
+                else:
+                    # Run migrations
+                    call_command('migrate', interactive=False)
+                    print("[DB] Database schema migrated")
+                    
+                    # Load data
+                    call_command('loaddata', str(db_files[0]), verbosity=0)
+                    print("[OK] Database restored successfully")
             
             # Find media backup
             media_files = list(temp_dir.glob("media_*.zip"))